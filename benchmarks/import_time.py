@@ -0,0 +1,171 @@
+"""Benchmark cold-start import time of `open_mre` modules.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, and the
+cumulative import time reported for the module is recorded. Results can be saved
+as JSON and compared against a previous run to catch regressions, e.g. when a new
+dependency ends up imported at the top level.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --json after.json --baseline before.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+DEFAULT_MODULES = [
+    "open_mre",
+    "open_mre.main",
+    "open_mre.batch",
+    "open_mre.state",
+    "open_mre.models",
+    "open_mre.tools",
+    "open_mre.tools.daytona_sandbox",
+    "open_mre.tools.pypi_checker",
+    "open_mre.coordinator",
+]
+
+# Regressions smaller than this are treated as noise, whatever the tolerance
+MIN_REGRESSION_MS = 20.0
+
+
+def measure_import(module: str) -> float:
+    """Import `module` in a fresh interpreter.
+
+    Args:
+        module: Dotted module name.
+
+    Returns:
+        Cumulative import time of the module, in milliseconds.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines look like `import time: <self us> | <cumulative us> | <indented name>`;
+    # the requested module's own line is the unindented one
+    for line in completed.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+            return int(fields[1]) / 1000
+    msg = f"No import time reported for {module}"
+    raise RuntimeError(msg)
+
+
+def run(modules: list[str], repeat: int) -> dict[str, dict[str, float]]:
+    """Measure every module `repeat` times.
+
+    Args:
+        modules: Dotted module names.
+        repeat: Number of fresh interpreters per module.
+
+    Returns:
+        Median, min, and max import time (ms) per module.
+    """
+    results: dict[str, dict[str, float]] = {}
+    for module in modules:
+        # Warm-up run, so bytecode compilation is not counted
+        measure_import(module)
+        samples = [measure_import(module) for _ in range(repeat)]
+        results[module] = {
+            "median_ms": round(statistics.median(samples), 1),
+            "min_ms": round(min(samples), 1),
+            "max_ms": round(max(samples), 1),
+        }
+    return results
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """Compare median import times against a baseline.
+
+    Args:
+        results: Results of the current run.
+        baseline: Results of a previous run.
+        tolerance: Allowed relative slowdown (e.g. `0.25` for 25%).
+
+    Returns:
+        A description of each module that regressed.
+    """
+    regressions: list[str] = []
+    for module, current in results.items():
+        previous = baseline.get(module)
+        if previous is None:
+            continue
+        before, after = previous["median_ms"], current["median_ms"]
+        if after - before > max(before * tolerance, MIN_REGRESSION_MS):
+            regressions.append(f"{module}: {before:.1f} ms -> {after:.1f} ms")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark.
+
+    Args:
+        argv: Command-line arguments. If `None`, uses `sys.argv`.
+
+    Returns:
+        Exit code (`0`: no regressions, `1`: regressions against the baseline).
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        default=DEFAULT_MODULES,
+        help="Modules to measure (defaults to the main `open_mre` modules)",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=5,
+        help="Fresh interpreters per module (default: 5)",
+    )
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file")
+    parser.add_argument(
+        "--baseline", type=Path, help="Compare against results from a previous run"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown against the baseline (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.modules, args.repeat)
+
+    width = max(len(module) for module in results)
+    print(f"{'module':<{width}}  {'median':>9}  {'min':>9}  {'max':>9}")
+    for module, timing in results.items():
+        print(
+            f"{module:<{width}}  {timing['median_ms']:>6.1f} ms  "
+            f"{timing['min_ms']:>6.1f} ms  {timing['max_ms']:>6.1f} ms"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\nImport time regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
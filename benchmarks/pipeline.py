@@ -0,0 +1,692 @@
+"""Benchmark the validation pipeline offline.
+
+The chat model, the PyPI JSON API, and Daytona are replaced by deterministic
+stand-ins with configurable latency, so throughput can be measured on a laptop with
+no network access or API keys. The issues in a corpus directory are validated at
+several concurrency levels, and per-stage latency (p50/p95), end-to-end latency, and
+throughput are reported for each level.
+
+The stand-ins sit below the project's own code (the chat model client, the HTTP
+layer, and the Daytona SDK), so the agents, tools, and sandbox wrappers run as they
+do in production.
+
+Usage:
+    python benchmarks/pipeline.py
+    python benchmarks/pipeline.py --concurrency 1 8 32 --repeat 8 --json after.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import itertools
+import json
+import re
+import sys
+import threading
+import time
+import types
+import uuid
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    SystemMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+
+from open_mre.agents.version_validator.agent import LOOKUP_RESULTS_HEADER, REPORT_TOOL
+from open_mre.batch import BatchIssue, arun_validation, load_issues
+from open_mre.blobs import InMemoryBlobStore, set_blob_store
+from open_mre.coordinator import clear_coordinator_cache, get_coordinator
+from open_mre.metrics import (
+    NODE_DURATION,
+    PYPI_REQUEST_DURATION,
+    SANDBOX_PHASE_DURATION,
+    collect_metrics,
+    observe,
+)
+from open_mre.models import clear_model_cache
+from open_mre.tools import daytona_sandbox, pypi_checker
+from open_mre.tools.pypi_index import PyPIIndex, set_pypi_index
+
+DEFAULT_CORPUS = Path(__file__).parent / "corpus"
+DEFAULT_CONCURRENCY = [1, 4, 16]
+
+ISSUE_DURATION = "open_mre_benchmark_issue_duration_seconds"
+
+# Latest versions served by the fake PyPI; other packages are not found
+PYPI_RELEASES = {
+    "langchain": "1.0.5",
+    "langchain-anthropic": "1.0.1",
+    "langchain-core": "1.0.4",
+    "langchain-openai": "1.0.2",
+    "langchain-text-splitters": "1.0.0",
+}
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Simulated latency of the external services, in seconds."""
+
+    llm: float = 0.2
+    """Fixed cost of each chat model call."""
+
+    llm_per_1k_tokens: float = 0.05
+    """Additional cost per 1,000 prompt tokens (estimated as 4 characters each)."""
+
+    pypi: float = 0.05
+    """Cost of each PyPI JSON API request."""
+
+    sandbox: float = 0.1
+    """Cost of each sandbox operation (create, write, exec, delete, ...)."""
+
+    install: float = 1.0
+    """Duration of a package installation in the sandbox."""
+
+
+# Chat model
+
+
+def _estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(len(m.text) for m in messages) // 4
+
+
+_FENCED_CODE = re.compile(r"```(?:python|py)\n(.*?)```", re.DOTALL)
+_PINNED = re.compile(r"\b(langchain[\w-]*)==([\w.]+)")
+_IMPORTED = re.compile(r"^\s*(?:from|import)\s+(langchain\w*)", re.MULTILINE)
+
+
+def _packages(issue: str) -> dict[str, str | None]:
+    """Map each LangChain package mentioned in an issue to its pinned version."""
+    packages: dict[str, str | None] = {
+        name.replace("_", "-"): None for name in _IMPORTED.findall(issue)
+    }
+    packages.update(_PINNED.findall(issue))
+    return packages
+
+
+def _version_reply(messages: Sequence[BaseMessage]) -> AIMessage:
+    """Reply like the version validator's model: look up packages, then report."""
+    # The issue is in the shared system prompt prefix
+    issue = next(m.text for m in messages if isinstance(m, SystemMessage))
+    packages = _packages(issue)
+    last = str(messages[-1].content)
+
+    if packages and not last.startswith(LOOKUP_RESULTS_HEADER):
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "check_pypi_versions",
+                    "args": {"package_names": list(packages)},
+                    "id": "call_0",
+                }
+            ],
+        )
+
+    # Whether packages are outdated is worked out by the agent, not reported
+    python_version = re.search(r"python (\d+\.\d+)", issue, re.IGNORECASE)
+    report = {
+        "python_version": python_version.group(1) if python_version else None,
+        "packages": [
+            {"name": name, "user_version": version}
+            for name, version in packages.items()
+        ],
+        "version_notes": [],
+    }
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": REPORT_TOOL, "args": report, "id": "call_report"}],
+    )
+
+
+def _reply(messages: Sequence[BaseMessage]) -> AIMessage:
+    """Answer like the real model would, based on which agent is asking."""
+    system_prompt = next((m.text for m in messages if isinstance(m, SystemMessage)), "")
+    prompt = str(messages[-1].content)
+
+    if "version validation specialist" in system_prompt:
+        return _version_reply(messages)
+    if "code extraction specialist" in system_prompt:
+        needs_mre = not _FENCED_CODE.search(system_prompt)
+        return AIMessage(
+            content=f"ADDITIONAL_CODE: none\nNOTES: none\n"
+            f"NEEDS_MRE: {str(needs_mre).lower()}"
+        )
+    if "behavior analysis specialist" in system_prompt:
+        return AIMessage(
+            content="""EXPECTED_BEHAVIOR: The call succeeds
+ACTUAL_BEHAVIOR: The call fails as described in the issue
+ANALYSIS_NOTES: Reproducible from the provided snippet
+MISSING_INFO: false
+MISSING_DETAILS: none"""
+        )
+    if "code execution specialist" in system_prompt:
+        code = _FENCED_CODE.search(prompt)
+        return AIMessage(content=code.group(1) if code else "print('no code')")
+    if "technical report writer" in system_prompt:
+        return AIMessage(content="# Validation Report\n\nReproduced as described.")
+    return AIMessage(content="")
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers each agent deterministically after a delay."""
+
+    latency: float
+    seconds_per_1k_tokens: float
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake"
+
+    def _result(self, messages: list[BaseMessage]) -> tuple[ChatResult, float]:
+        input_tokens = _estimate_tokens(messages)
+        message = _reply(messages)
+        output_tokens = len(str(message.content)) // 4
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        delay = self.latency + self.seconds_per_1k_tokens * input_tokens / 1000
+        return ChatResult(generations=[ChatGeneration(message=message)]), delay
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result, delay = self._result(messages)
+        time.sleep(delay)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result, delay = self._result(messages)
+        await asyncio.sleep(delay)
+        return result
+
+    def bind_tools(
+        self,
+        tools: Sequence[Any],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable[Any, Any]:
+        """Return the model itself, since `_reply` decides when to call tools."""
+        return self
+
+
+# PyPI
+
+
+def _pypi_response(request: httpx.Request) -> httpx.Response:
+    package = request.url.path.split("/")[2]
+    if package not in PYPI_RELEASES:
+        return httpx.Response(404, json={"message": "Not Found"}, request=request)
+    return httpx.Response(
+        200, json={"info": {"version": PYPI_RELEASES[package]}}, request=request
+    )
+
+
+def _fake_pypi_clients(
+    latency: float,
+) -> tuple[Callable[[], httpx.Client], Callable[[], httpx.AsyncClient]]:
+    """Build stand-ins for the PyPI checker's shared client getters."""
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        time.sleep(latency)
+        return _pypi_response(request)
+
+    async def ahandle(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return _pypi_response(request)
+
+    client = httpx.Client(transport=httpx.MockTransport(handle))
+    return (
+        lambda: client,
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(ahandle)),
+    )
+
+
+# Daytona
+
+
+class _FakeCloud:
+    """Sandboxes shared by every fake Daytona client, like the real service."""
+
+    def __init__(self, latency: Latency) -> None:
+        self.latency = latency
+        self.sandboxes: dict[str, types.SimpleNamespace] = {}
+        self.lock = threading.Lock()
+
+    def create(self) -> types.SimpleNamespace:
+        sandbox = types.SimpleNamespace(
+            id=f"sandbox-{uuid.uuid4().hex[:8]}", state="started", installs={}
+        )
+        with self.lock:
+            self.sandboxes[sandbox.id] = sandbox
+        return sandbox
+
+    def get(self, sandbox_id: str) -> types.SimpleNamespace:
+        with self.lock:
+            return self.sandboxes[sandbox_id]
+
+    def delete(self, sandbox_id: str) -> None:
+        with self.lock:
+            self.sandboxes.pop(sandbox_id, None)
+
+    def exec_result(self, command: str) -> tuple[float, types.SimpleNamespace]:
+        """Delay and response of `process.exec`."""
+        if command.startswith("pip install"):
+            return self.latency.install, types.SimpleNamespace(
+                result="Successfully installed", exit_code=0
+            )
+        return self.latency.sandbox, types.SimpleNamespace(result="ok\n", exit_code=0)
+
+    def install_status(
+        self, sandbox: types.SimpleNamespace, command_id: str
+    ) -> types.SimpleNamespace:
+        started = sandbox.installs[command_id]
+        done = time.monotonic() - started >= self.latency.install
+        return types.SimpleNamespace(exit_code=0 if done else None)
+
+
+class _FakeProcess:
+    def __init__(self, cloud: _FakeCloud, sandbox: types.SimpleNamespace) -> None:
+        self._cloud = cloud
+        self._sandbox = sandbox
+
+    def exec(self, command: str, timeout: int | None = None) -> Any:
+        delay, response = self._cloud.exec_result(command)
+        time.sleep(delay)
+        return response
+
+    def create_session(self, session_id: str) -> None:
+        time.sleep(self._cloud.latency.sandbox)
+
+    def execute_session_command(self, session_id: str, request: Any) -> Any:
+        time.sleep(self._cloud.latency.sandbox)
+        command_id = uuid.uuid4().hex
+        self._sandbox.installs[command_id] = time.monotonic()
+        return types.SimpleNamespace(cmd_id=command_id)
+
+    def get_session_command(self, session_id: str, command_id: str) -> Any:
+        time.sleep(self._cloud.latency.sandbox)
+        return self._cloud.install_status(self._sandbox, command_id)
+
+    def get_session_command_logs(self, session_id: str, command_id: str) -> Any:
+        time.sleep(self._cloud.latency.sandbox)
+        return types.SimpleNamespace(
+            stdout="Successfully installed", stderr="", output=""
+        )
+
+
+class _AsyncFakeProcess:
+    def __init__(self, cloud: _FakeCloud, sandbox: types.SimpleNamespace) -> None:
+        self._cloud = cloud
+        self._sandbox = sandbox
+
+    async def exec(self, command: str, timeout: int | None = None) -> Any:  # noqa: ASYNC109
+        delay, response = self._cloud.exec_result(command)
+        await asyncio.sleep(delay)
+        return response
+
+    async def create_session(self, session_id: str) -> None:
+        await asyncio.sleep(self._cloud.latency.sandbox)
+
+    async def execute_session_command(self, session_id: str, request: Any) -> Any:
+        await asyncio.sleep(self._cloud.latency.sandbox)
+        command_id = uuid.uuid4().hex
+        self._sandbox.installs[command_id] = time.monotonic()
+        return types.SimpleNamespace(cmd_id=command_id)
+
+    async def get_session_command(self, session_id: str, command_id: str) -> Any:
+        await asyncio.sleep(self._cloud.latency.sandbox)
+        return self._cloud.install_status(self._sandbox, command_id)
+
+    async def get_session_command_logs(self, session_id: str, command_id: str) -> Any:
+        await asyncio.sleep(self._cloud.latency.sandbox)
+        return types.SimpleNamespace(
+            stdout="Successfully installed", stderr="", output=""
+        )
+
+
+def _fake_daytona_sdk(latency: Latency) -> types.SimpleNamespace:
+    """Build a stand-in for the `daytona` module backed by an in-memory cloud."""
+    cloud = _FakeCloud(latency)
+
+    def sync_sandbox(state: types.SimpleNamespace) -> types.SimpleNamespace:
+        def delete() -> None:
+            time.sleep(latency.sandbox)
+            cloud.delete(state.id)
+
+        return types.SimpleNamespace(
+            id=state.id,
+            state=state.state,
+            process=_FakeProcess(cloud, state),
+            start=lambda: None,
+            delete=delete,
+        )
+
+    def async_sandbox(state: types.SimpleNamespace) -> types.SimpleNamespace:
+        async def start() -> None:
+            await asyncio.sleep(latency.sandbox)
+
+        async def delete() -> None:
+            await asyncio.sleep(latency.sandbox)
+            cloud.delete(state.id)
+
+        return types.SimpleNamespace(
+            id=state.id,
+            state=state.state,
+            process=_AsyncFakeProcess(cloud, state),
+            start=start,
+            delete=delete,
+        )
+
+    class Daytona:
+        def __init__(self, config: Any) -> None:
+            pass
+
+        def create(self, params: Any = None) -> types.SimpleNamespace:
+            time.sleep(latency.sandbox)
+            return sync_sandbox(cloud.create())
+
+        def get(self, sandbox_id: str) -> types.SimpleNamespace:
+            time.sleep(latency.sandbox)
+            return sync_sandbox(cloud.get(sandbox_id))
+
+    class AsyncDaytona:
+        def __init__(self, config: Any) -> None:
+            pass
+
+        async def create(self, params: Any = None) -> types.SimpleNamespace:
+            await asyncio.sleep(latency.sandbox)
+            return async_sandbox(cloud.create())
+
+        async def get(self, sandbox_id: str) -> types.SimpleNamespace:
+            await asyncio.sleep(latency.sandbox)
+            return async_sandbox(cloud.get(sandbox_id))
+
+        async def close(self) -> None:
+            pass
+
+    return types.SimpleNamespace(
+        Daytona=Daytona,
+        AsyncDaytona=AsyncDaytona,
+        DaytonaConfig=lambda api_key, api_url: types.SimpleNamespace(
+            api_key=api_key, api_url=api_url
+        ),
+        SessionExecuteRequest=types.SimpleNamespace,
+        CreateSandboxFromSnapshotParams=types.SimpleNamespace,
+    )
+
+
+@contextlib.contextmanager
+def offline_backends(
+    latency: Latency, pypi_index: PyPIIndex | None = None
+) -> Iterator[FakeChatModel]:
+    """Route the chat model, PyPI, and Daytona to the stand-ins.
+
+    Args:
+        latency: Simulated latency of the services.
+        pypi_index: Offline PyPI index to check versions against, instead of the
+            simulated PyPI.
+
+    Yields:
+        The fake chat model.
+    """
+    model = FakeChatModel(
+        latency=latency.llm, seconds_per_1k_tokens=latency.llm_per_1k_tokens
+    )
+    sdk = _fake_daytona_sdk(latency)
+    get_client, get_async_client = _fake_pypi_clients(latency.pypi)
+    clear_model_cache()
+    clear_coordinator_cache()
+    set_blob_store(InMemoryBlobStore())
+    set_pypi_index(pypi_index)
+    try:
+        with (
+            patch("open_mre.models.init_chat_model", return_value=model),
+            patch.object(pypi_checker, "_get_client", get_client),
+            patch.object(pypi_checker, "_get_async_client", get_async_client),
+            patch.object(daytona_sandbox, "_daytona_sdk", return_value=sdk),
+            patch.object(daytona_sandbox, "DAYTONA_AVAILABLE", new=True),
+            patch.dict("os.environ", {"DAYTONA_API_KEY": "benchmark"}),
+        ):
+            yield model
+    finally:
+        clear_model_cache()
+        clear_coordinator_cache()
+        set_blob_store(None)
+        set_pypi_index(None)
+
+
+# Benchmark
+
+
+def _percentiles(series: dict[str, Any]) -> dict[str, float]:
+    return {"p50": series["p50"], "p95": series["p95"]}
+
+
+async def run_level(issues: list[BatchIssue], concurrency: int) -> dict[str, Any]:
+    """Validate `issues` with at most `concurrency` in flight.
+
+    Args:
+        issues: The issues to validate.
+        concurrency: Maximum number of issues validated at once.
+
+    Returns:
+        Throughput and latency results for this level.
+    """
+    coordinator = get_coordinator()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def validate(issue: BatchIssue) -> None:
+        async with semaphore:
+            thread_id = str(uuid.uuid4())
+            started = time.perf_counter()
+            await arun_validation(
+                coordinator, issue, auto_approve_keys=True, thread_id=thread_id
+            )
+            observe(ISSUE_DURATION, time.perf_counter() - started)
+            await coordinator.checkpointer.adelete_thread(thread_id)  # type: ignore[union-attr]
+
+    with collect_metrics() as registry:
+        started = time.perf_counter()
+        await asyncio.gather(*(validate(issue) for issue in issues))
+        wall_seconds = time.perf_counter() - started
+
+    summary = registry.summary()["summaries"]
+    stages = {
+        series["labels"]["node"]: _percentiles(series)
+        for series in summary.get(NODE_DURATION, [])
+        if "/" not in series["labels"]["node"] and series["labels"]["status"] == "ok"
+    }
+    external = {
+        f"sandbox.{series['labels']['phase']}": _percentiles(series)
+        for series in summary.get(SANDBOX_PHASE_DURATION, [])
+    }
+    for series in summary.get(PYPI_REQUEST_DURATION, []):
+        external["pypi.request"] = _percentiles(series)
+    (end_to_end,) = summary[ISSUE_DURATION]
+    return {
+        "concurrency": concurrency,
+        "issues": len(issues),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(len(issues) / wall_seconds, 3),
+        "end_to_end": _percentiles(end_to_end),
+        "stages": stages,
+        "external": external,
+    }
+
+
+def run(
+    issues: list[BatchIssue],
+    concurrency_levels: list[int],
+    latency: Latency,
+    pypi_index: PyPIIndex | None = None,
+) -> list[dict[str, Any]]:
+    """Benchmark every concurrency level against the offline backends.
+
+    Args:
+        issues: The issues to validate at each level.
+        concurrency_levels: Concurrency levels to measure.
+        latency: Simulated latency of the services.
+        pypi_index: Offline PyPI index to check versions against, instead of the
+            simulated PyPI.
+
+    Returns:
+        Results per concurrency level.
+    """
+    with offline_backends(latency, pypi_index):
+        return [
+            asyncio.run(run_level(issues, concurrency))
+            for concurrency in concurrency_levels
+        ]
+
+
+def _print_table(
+    title: str,
+    results: list[dict[str, Any]],
+    rows: Callable[[dict[str, Any]], dict[str, dict[str, float]]],
+) -> None:
+    names = sorted({name for result in results for name in rows(result)})
+    if not names:
+        return
+    width = max(len(name) for name in names)
+    header = "".join(f"  {'c=' + str(r['concurrency']):>17}" for r in results)
+    print(f"\n{title:<{width}}{header}")
+    print(f"{'':<{width}}" + "  {:>8} {:>8}".format("p50", "p95") * len(results))
+    for name in names:
+        cells = []
+        for result in results:
+            stats = rows(result).get(name)
+            cells.append(
+                f"  {stats['p50']:>7.2f}s {stats['p95']:>7.2f}s"
+                if stats
+                else f"  {'-':>8} {'-':>8}"
+            )
+        print(f"{name:<{width}}{''.join(cells)}")
+
+
+def _expand(issues: list[BatchIssue], repeat: int) -> list[BatchIssue]:
+    return [
+        BatchIssue(
+            issue_id=f"{issue.issue_id}-{i}", content=issue.content, source=issue.source
+        )
+        for i, issue in itertools.product(range(repeat), issues)
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark.
+
+    Args:
+        argv: Command-line arguments. If `None`, uses `sys.argv`.
+
+    Returns:
+        Exit code.
+    """
+    defaults = Latency()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=DEFAULT_CORPUS,
+        help="Directory of *.md issues, or a JSONL file (default: benchmarks/corpus)",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=DEFAULT_CONCURRENCY,
+        help="Concurrency levels to measure (default: 1 4 16)",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=4,
+        help="Copies of the corpus validated at each level (default: 4)",
+    )
+    for field_name, help_text in (
+        ("llm", "fixed cost of each chat model call"),
+        ("llm_per_1k_tokens", "chat model cost per 1,000 prompt tokens"),
+        ("pypi", "cost of each PyPI request"),
+        ("sandbox", "cost of each sandbox operation"),
+        ("install", "duration of a package installation"),
+    ):
+        parser.add_argument(
+            f"--{field_name.replace('_', '-')}-latency",
+            dest=field_name,
+            type=float,
+            default=getattr(defaults, field_name),
+            help=f"Seconds: {help_text} (default: {getattr(defaults, field_name)})",
+        )
+    parser.add_argument(
+        "--pypi-index",
+        type=Path,
+        help=(
+            "Check versions against this offline PyPI index (see `open-mre "
+            "pypi-index`) instead of the simulated PyPI"
+        ),
+    )
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    latency = Latency(
+        llm=args.llm,
+        llm_per_1k_tokens=args.llm_per_1k_tokens,
+        pypi=args.pypi,
+        sandbox=args.sandbox,
+        install=args.install,
+    )
+    issues = _expand(load_issues(args.corpus), args.repeat)
+    pypi_index = PyPIIndex.load(args.pypi_index) if args.pypi_index else None
+    results = run(issues, args.concurrency, latency, pypi_index)
+
+    print(f"{len(issues)} issues per level, latency: {asdict(latency)}\n")
+    print(f"{'concurrency':>11}  {'wall':>8}  {'issues/s':>8}  {'p50':>8}  {'p95':>8}")
+    for result in results:
+        print(
+            f"{result['concurrency']:>11}  {result['wall_seconds']:>7.2f}s  "
+            f"{result['throughput_per_second']:>8.2f}  "
+            f"{result['end_to_end']['p50']:>7.2f}s  "
+            f"{result['end_to_end']['p95']:>7.2f}s"
+        )
+    _print_table("stage", results, lambda result: result["stages"])
+    _print_table("external call", results, lambda result: result["external"])
+
+    if args.json:
+        args.json.write_text(
+            json.dumps({"latency": asdict(latency), "results": results}, indent=2)
+            + "\n"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
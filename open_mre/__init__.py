@@ -1,12 +1,45 @@
 """Open MRE - Automated MRE validation system for repository issues."""
 
-from open_mre.coordinator import create_coordinator, create_default_state
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from open_mre.state import MREValidationState, PackageInfo, ValidationResult
 
+if TYPE_CHECKING:
+    from open_mre.coordinator import (
+        create_coordinator,
+        create_default_state,
+        get_coordinator,
+    )
+
+# The coordinator imports every agent along with LangChain and LangGraph, so it is
+# only loaded when one of its exports is first accessed
+_EXPORT_MODULES = {
+    "create_coordinator": "open_mre.coordinator",
+    "create_default_state": "open_mre.coordinator",
+    "get_coordinator": "open_mre.coordinator",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORT_MODULES.get(name)
+    if module is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
+
+
 __all__ = [
     "MREValidationState",
     "PackageInfo",
     "ValidationResult",
     "create_coordinator",
     "create_default_state",
+    "get_coordinator",
 ]
@@ -6,8 +6,8 @@ expected vs actual behavior and detect if API keys are needed.
 
 from typing import Annotated, Any
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.graph.state import CompiledStateGraph
@@ -17,7 +17,15 @@ from open_mre.agents.behavior_analyst.schemas import (
     BehaviorAnalystInput,
     BehaviorAnalystOutput,
 )
-from open_mre.prompts import BEHAVIOR_ANALYST_SYSTEM_PROMPT
+from open_mre.blobs import load_blob
+from open_mre.line_protocol import LineProtocolParser, StopEarly
+from open_mre.models import (
+    ainvoke_with_escalation,
+    get_agent_models,
+    invoke_with_escalation,
+    shares_prompt_cache,
+)
+from open_mre.prompts import BEHAVIOR_ANALYST_SYSTEM_PROMPT, build_messages
 
 # Known API providers and their indicators
 API_PROVIDER_PATTERNS = {
@@ -108,44 +116,25 @@ def detect_api_providers(code_snippets: list[str]) -> list[str]:
     return sorted(detected)
 
 
-def create_behavior_analyst_agent() -> CompiledStateGraph[Any, Any]:
-    """Create the behavior analyst agent subgraph.
+def _build_messages(state: AgentState) -> list[BaseMessage]:
+    """Build the behavior analysis prompt."""
+    code_snippets = state.get("code_snippets", [])
 
-    Returns:
-        A compiled `StateGraph` that analyzes issue behavior.
-    """
-    # TODO: migrate to use provider (native) structured output?
-    model = init_chat_model(model="claude-sonnet-4-5")
+    # Detect API providers from code
+    detected_providers = detect_api_providers(code_snippets)
 
-    def analyze_behavior(state: AgentState) -> dict[str, Any]:
-        """Analyze the issue and code to understand behavior."""
-        issue_content = state["issue_content"]
-        code_snippets = state.get("code_snippets", [])
-        version_notes = state.get("version_notes", [])
-
-        # Detect API providers from code
-        detected_providers = detect_api_providers(code_snippets)
-        requires_api_keys = len(detected_providers) > 0
-
-        # Use LLM to analyze behavior
-        code_block = (
-            "\n\n".join([f"```python\n{s}\n```" for s in code_snippets])
-            if code_snippets
-            else "No code provided"
-        )
+    # Use LLM to analyze behavior
+    code_block = (
+        "\n\n".join([f"```python\n{s}\n```" for s in code_snippets])
+        if code_snippets
+        else "No code provided"
+    )
 
-        system_message = SystemMessage(content=BEHAVIOR_ANALYST_SYSTEM_PROMPT)
-        human_message = HumanMessage(
-            content=f"""Analyze this GitHub issue and its code to understand:
+    task = f"""Analyze the GitHub issue above and its code to understand:
 1. What behavior the user expects
 2. What behavior the user is actually observing
 3. Any critical missing information
 
-GitHub Issue:
----
-{issue_content}
----
-
 Extracted Code:
 {code_block}
 
@@ -157,86 +146,153 @@ ACTUAL_BEHAVIOR: <what the user reports is happening>
 ANALYSIS_NOTES: <observations about the issue, separated by semicolons>
 MISSING_INFO: <true if critical info is missing, false otherwise>
 MISSING_DETAILS: <what specific info is missing, if any>"""
+
+    return build_messages(
+        load_blob(state["issue_content"]),
+        BEHAVIOR_ANALYST_SYSTEM_PROMPT,
+        task,
+        cache=shares_prompt_cache("behavior_analyst"),
+    )
+
+
+def _new_parser() -> LineProtocolParser:
+    """Read the response until all fields are in, or no details can be missing."""
+    return LineProtocolParser(
+        (
+            "EXPECTED_BEHAVIOR",
+            "ACTUAL_BEHAVIOR",
+            "ANALYSIS_NOTES",
+            "MISSING_INFO",
+            "MISSING_DETAILS",
+        ),
+        # Missing details only matter if critical information is missing
+        stop_when=lambda fields: (
+            fields.get("MISSING_INFO", "").lower() == "false"
+            and {"EXPECTED_BEHAVIOR", "ACTUAL_BEHAVIOR", "ANALYSIS_NOTES"}
+            <= fields.keys()
+        ),
+    )
+
+
+def _is_usable(response: BaseMessage) -> bool:
+    """Check that the response has the expected and actual behavior fields."""
+    content = response.content if isinstance(response.content, str) else ""
+    lines = [line.strip() for line in content.splitlines()]
+    return all(
+        any(line.startswith(field) for line in lines)
+        for field in ("EXPECTED_BEHAVIOR:", "ACTUAL_BEHAVIOR:", "MISSING_INFO:")
+    )
+
+
+def _parse_response(state: AgentState, response: BaseMessage) -> dict[str, Any]:
+    """Parse the behavior analysis response into agent results."""
+    version_notes = state.get("version_notes", [])
+    detected_providers = detect_api_providers(state.get("code_snippets", []))
+    requires_api_keys = len(detected_providers) > 0
+
+    # TODO: use .content_blocks?
+    content = response.content if isinstance(response.content, str) else ""
+
+    # Parse the response
+    expected_behavior = None
+    actual_behavior = None
+    analysis_notes: list[str] = []
+    missing_info = False
+    missing_details = None
+
+    for raw_line in content.strip().split("\n"):
+        line = raw_line.strip()
+        if line.startswith("EXPECTED_BEHAVIOR:"):
+            expected_behavior = line.replace("EXPECTED_BEHAVIOR:", "").strip()
+            if expected_behavior.lower() in ("none", "not specified", "unclear"):
+                expected_behavior = None
+        elif line.startswith("ACTUAL_BEHAVIOR:"):
+            actual_behavior = line.replace("ACTUAL_BEHAVIOR:", "").strip()
+            if actual_behavior.lower() in ("none", "not specified", "unclear"):
+                actual_behavior = None
+        elif line.startswith("ANALYSIS_NOTES:"):
+            notes_str = line.replace("ANALYSIS_NOTES:", "").strip()
+            if notes_str:
+                analysis_notes = [n.strip() for n in notes_str.split(";") if n.strip()]
+        elif line.startswith("MISSING_INFO:"):
+            value = line.replace("MISSING_INFO:", "").strip().lower()
+            missing_info = value == "true"
+        elif line.startswith("MISSING_DETAILS:"):
+            missing_details = line.replace("MISSING_DETAILS:", "").strip()
+            if missing_details.lower() in ("none", "n/a"):
+                missing_details = None
+
+    # Add note about API providers
+    if detected_providers:
+        analysis_notes.append(
+            f"Code uses API providers: {', '.join(detected_providers)}"
         )
 
-        response = model.invoke(input=[system_message, human_message])
-        # TODO: use .content_blocks?
-        content = response.content if isinstance(response.content, str) else ""
-
-        # Parse the response
-        expected_behavior = None
-        actual_behavior = None
-        analysis_notes: list[str] = []
-        missing_info = False
-        missing_details = None
-
-        for raw_line in content.strip().split("\n"):
-            line = raw_line.strip()
-            if line.startswith("EXPECTED_BEHAVIOR:"):
-                expected_behavior = line.replace("EXPECTED_BEHAVIOR:", "").strip()
-                if expected_behavior.lower() in ("none", "not specified", "unclear"):
-                    expected_behavior = None
-            elif line.startswith("ACTUAL_BEHAVIOR:"):
-                actual_behavior = line.replace("ACTUAL_BEHAVIOR:", "").strip()
-                if actual_behavior.lower() in ("none", "not specified", "unclear"):
-                    actual_behavior = None
-            elif line.startswith("ANALYSIS_NOTES:"):
-                notes_str = line.replace("ANALYSIS_NOTES:", "").strip()
-                if notes_str:
-                    analysis_notes = [
-                        n.strip() for n in notes_str.split(";") if n.strip()
-                    ]
-            elif line.startswith("MISSING_INFO:"):
-                value = line.replace("MISSING_INFO:", "").strip().lower()
-                missing_info = value == "true"
-            elif line.startswith("MISSING_DETAILS:"):
-                missing_details = line.replace("MISSING_DETAILS:", "").strip()
-                if missing_details.lower() in ("none", "n/a"):
-                    missing_details = None
-
-        # Add note about API providers
-        if detected_providers:
-            analysis_notes.append(
-                f"Code uses API providers: {', '.join(detected_providers)}"
+    # Determine if we should terminate and draft a comment
+    draft_comment = None
+    should_terminate = False
+
+    if missing_info and missing_details:
+        should_terminate = True
+        comment_parts = [
+            "Hi, I'm an automated bot that helps triage issues.",
+            "",
+            "I noticed that some critical information is missing from your issue "
+            "that prevents us from fully understanding the reported behavior.",
+            "",
+            f"Specifically: {missing_details}",
+            "",
+            "Please edit your issue to include this information.",
+        ]
+
+        # Add version-related notes if any
+        if version_notes:
+            comment_parts.extend(
+                ["", "Additionally:"] + [f"- {note}" for note in version_notes]
             )
 
-        # Determine if we should terminate and draft a comment
-        draft_comment = None
-        should_terminate = False
-
-        if missing_info and missing_details:
-            should_terminate = True
-            comment_parts = [
-                "Hi, I'm an automated bot that helps triage issues.",
-                "",
-                "I noticed that some critical information is missing from your issue "
-                "that prevents us from fully understanding the reported behavior.",
-                "",
-                f"Specifically: {missing_details}",
-                "",
-                "Please edit your issue to include this information.",
-            ]
-
-            # Add version-related notes if any
-            if version_notes:
-                comment_parts.extend(
-                    ["", "Additionally:"] + [f"- {note}" for note in version_notes]
-                )
-
-            draft_comment = "\n".join(comment_parts)
-
-        return {
-            "expected_behavior": expected_behavior,
-            "actual_behavior": actual_behavior,
-            "analysis_notes": analysis_notes,
-            "requires_api_keys": requires_api_keys,
-            "detected_api_providers": detected_providers,
-            "draft_comment": draft_comment,
-            "should_terminate": should_terminate,
-        }
+        draft_comment = "\n".join(comment_parts)
+
+    return {
+        "expected_behavior": expected_behavior,
+        "actual_behavior": actual_behavior,
+        "analysis_notes": analysis_notes,
+        "requires_api_keys": requires_api_keys,
+        "detected_api_providers": detected_providers,
+        "draft_comment": draft_comment,
+        "should_terminate": should_terminate,
+    }
+
+
+def create_behavior_analyst_agent() -> CompiledStateGraph[Any, Any]:
+    """Create the behavior analyst agent subgraph.
+
+    Returns:
+        A compiled `StateGraph` that analyzes issue behavior.
+    """
+    # TODO: migrate to use provider (native) structured output?
+    models = [
+        StopEarly(model, _new_parser) for model in get_agent_models("behavior_analyst")
+    ]
+
+    def analyze_behavior(state: AgentState) -> dict[str, Any]:
+        """Analyze the issue and code to understand behavior."""
+        response = invoke_with_escalation(
+            "behavior_analyst", models, _build_messages(state), accept=_is_usable
+        )
+        return _parse_response(state, response)
+
+    async def aanalyze_behavior(state: AgentState) -> dict[str, Any]:
+        """Async version of `analyze_behavior`."""
+        response = await ainvoke_with_escalation(
+            "behavior_analyst", models, _build_messages(state), accept=_is_usable
+        )
+        return _parse_response(state, response)
 
     builder = StateGraph(AgentState)
-    builder.add_node("analyze_behavior", analyze_behavior)
+    builder.add_node(
+        "analyze_behavior", RunnableLambda(analyze_behavior, afunc=aanalyze_behavior)
+    )
     builder.add_edge(START, "analyze_behavior")
     builder.add_edge("analyze_behavior", END)
 
@@ -2,13 +2,19 @@
 
 This agent extracts code snippets from inbound issues that could serve as
 Minimal Reproducible Examples (MREs).
+
+Issues whose fenced code is already a well-formed script (see
+`is_complete_fenced_code`) are handled without calling the model; the model is
+only asked about ambiguous cases, such as code outside fences or fenced blocks
+that do not parse.
 """
 
+import ast
 import re
 from typing import Annotated, Any
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.graph.state import CompiledStateGraph
@@ -18,7 +24,15 @@ from open_mre.agents.code_extractor.schemas import (
     CodeExtractorInput,
     CodeExtractorOutput,
 )
-from open_mre.prompts import CODE_EXTRACTOR_SYSTEM_PROMPT
+from open_mre.blobs import load_blob
+from open_mre.line_protocol import LineProtocolParser, StopEarly
+from open_mre.models import (
+    ainvoke_with_escalation,
+    get_agent_models,
+    invoke_with_escalation,
+    shares_prompt_cache,
+)
+from open_mre.prompts import CODE_EXTRACTOR_SYSTEM_PROMPT, build_messages
 
 
 class AgentState(TypedDict):
@@ -50,6 +64,56 @@ def extract_fenced_code_blocks(content: str) -> list[str]:
     return [match.strip() for match in matches if match.strip()]
 
 
+# Lines outside fenced blocks that look like Python code the model should recover
+_UNFENCED_CODE = re.compile(
+    r"^(?:\s*>>>\s|\s*import\s+\w|\s*from\s+[\w.]+\s+import\s"
+    r"|\s*def\s+\w+\s*\(|\s*class\s+\w+\s*[(:]|\s*@\w|(?: {4}|\t)\S)",
+    re.MULTILINE,
+)
+
+_FENCED_BLOCK = re.compile(r"^\s*```.*?^\s*```", re.DOTALL | re.MULTILINE)
+
+_DEFINITIONS = (
+    ast.Import,
+    ast.ImportFrom,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+)
+
+
+def _has_unfenced_code(content: str) -> bool:
+    """Check whether the issue has code-like lines outside fenced blocks."""
+    return bool(_UNFENCED_CODE.search(_FENCED_BLOCK.sub("", content)))
+
+
+def is_complete_fenced_code(content: str, snippets: list[str]) -> bool:
+    """Check whether the fenced code alone is a well-formed script.
+
+    That is the case when every fenced block parses as Python, the blocks import
+    something and run something at the top level (rather than only defining
+    functions or classes), and there is no code-like text outside the fences.
+
+    Args:
+        content: The markdown content of the issue.
+        snippets: The fenced code blocks found in `content`.
+
+    Returns:
+        Whether the snippets can be used as is, without asking the model.
+    """
+    if not snippets:
+        return False
+    statements: list[ast.stmt] = []
+    for snippet in snippets:
+        try:
+            statements.extend(ast.parse(snippet).body)
+        except (SyntaxError, ValueError):
+            return False
+    has_imports = any(isinstance(s, ast.Import | ast.ImportFrom) for s in statements)
+    runs_code = any(not isinstance(s, _DEFINITIONS) for s in statements)
+    return has_imports and runs_code and not _has_unfenced_code(content)
+
+
 def _format_fenced_snippets(snippets: list[str]) -> str:
     """Format fenced snippets for display in LLM prompt.
 
@@ -64,48 +128,21 @@ def _format_fenced_snippets(snippets: list[str]) -> str:
     return "\n".join(f"```python\n{s}\n```" for s in snippets)
 
 
-def create_code_extractor_agent() -> CompiledStateGraph[Any, Any]:
-    """Create the code extractor agent subgraph.
-
-    Returns:
-        A compiled `StateGraph` that extracts code from issues.
-    """
-    model = init_chat_model(model="claude-sonnet-4-5")
-
-    def extract_code(state: AgentState) -> dict[str, Any]:
-        """Extract code snippets from the issue content."""
-        # TODO: migrate to use provider (native) structured output?
-        issue_content = state["issue_content"]
-        version_notes = state.get("version_notes", [])
-
-        # First, try to extract fenced code blocks directly
-        fenced_snippets = extract_fenced_code_blocks(issue_content)
-
-        extraction_notes: list[str] = []
-        code_snippets: list[str] = []
+def _build_messages(state: AgentState) -> list[BaseMessage]:
+    """Build the code extraction prompt."""
+    # TODO: migrate to use provider (native) structured output?
+    issue_content = load_blob(state["issue_content"])
 
-        if fenced_snippets:
-            code_snippets = fenced_snippets
-            extraction_notes.append(
-                f"Found {len(fenced_snippets)} fenced code block(s)"
-            )
-        else:
-            extraction_notes.append("No fenced code blocks found")
+    # First, try to extract fenced code blocks directly
+    fenced_snippets = extract_fenced_code_blocks(issue_content)
 
-        # Use LLM to help identify any missed code or provide analysis
-        system_message = SystemMessage(content=CODE_EXTRACTOR_SYSTEM_PROMPT)
-        human_message = HumanMessage(
-            content=f"""Analyze this GitHub issue for code snippets that could be used
+    # Use LLM to help identify any missed code or provide analysis
+    task = f"""Analyze the GitHub issue above for code snippets that could be used
 to reproduce the reported behavior.
 
 I already found these fenced code blocks:
 {_format_fenced_snippets(fenced_snippets)}
 
-GitHub Issue:
----
-{issue_content}
----
-
 Please:
 1. Identify any additional code that might be in the issue but not properly fenced
 2. Note if the code appears to be a complete MRE or if pieces are missing
@@ -115,71 +152,167 @@ Respond in this format:
 ADDITIONAL_CODE: <code if found, or "none">
 NOTES: <observations about the code, separated by semicolons>
 NEEDS_MRE: <true/false>"""
-        )
 
-        response = model.invoke(input=[system_message, human_message])
-        # TODO: migrate to use .content_blocks?
-        content = response.content if isinstance(response.content, str) else ""
-
-        # Parse the response
-        additional_code = None
-        needs_mre = False
-
-        for raw_line in content.strip().split("\n"):
-            line = raw_line.strip()
-            if line.startswith("ADDITIONAL_CODE:"):
-                code_part = line.replace("ADDITIONAL_CODE:", "").strip()
-                if code_part.lower() != "none" and code_part:
-                    additional_code = code_part
-            elif line.startswith("NOTES:"):
-                notes_str = line.replace("NOTES:", "").strip()
-                if notes_str:
-                    extraction_notes.extend(
-                        [n.strip() for n in notes_str.split(";") if n.strip()]
-                    )
-            elif line.startswith("NEEDS_MRE:"):
-                value = line.replace("NEEDS_MRE:", "").strip().lower()
-                needs_mre = value == "true"
-
-        # If LLM found additional code, add it
-        if additional_code:
-            code_snippets.append(additional_code)
-            extraction_notes.append("LLM identified additional unfenced code")
-
-        # Determine if we should terminate and draft a comment
-        draft_comment = None
-        should_terminate = False
-
-        if not code_snippets or needs_mre:
-            should_terminate = True
-            # Build draft comment
-            comment_parts = [
-                "Hi, I'm an automated bot that helps triage issues.",
-                "",
-                "I noticed you did not provide a minimal reproducible example (MRE) "
-                "in your issue. To help maintainers investigate the issue, we need "
-                "a code snippet that reproduces the behavior you are reporting.",
-                "",
-                "Please edit your issue to include a code example.",
-            ]
-
-            # Add version-related notes if any
-            if version_notes:
-                comment_parts.extend(
-                    ["", "Additionally:"] + [f"- {note}" for note in version_notes]
+    return build_messages(
+        issue_content,
+        CODE_EXTRACTOR_SYSTEM_PROMPT,
+        task,
+        cache=shares_prompt_cache("code_extractor"),
+    )
+
+
+def _new_parser() -> LineProtocolParser:
+    """Read the response until all fields are in, or an MRE is known to be needed."""
+    return LineProtocolParser(
+        ("ADDITIONAL_CODE", "NOTES", "NEEDS_MRE"),
+        stop_when=lambda fields: fields.get("NEEDS_MRE", "").lower() == "true",
+    )
+
+
+def _is_usable(response: BaseMessage) -> bool:
+    """Check that the response answers whether an MRE is needed."""
+    content = response.content if isinstance(response.content, str) else ""
+    return any(
+        line.strip().replace(" ", "").lower() in ("needs_mre:true", "needs_mre:false")
+        for line in content.splitlines()
+    )
+
+
+def _parse_response(state: AgentState, response: BaseMessage) -> dict[str, Any]:
+    """Parse the code extraction response into agent results."""
+    # TODO: migrate to use .content_blocks?
+    content = response.content if isinstance(response.content, str) else ""
+
+    # Parse the response
+    additional_code = None
+    needs_mre = False
+    model_notes: list[str] = []
+
+    for raw_line in content.strip().split("\n"):
+        line = raw_line.strip()
+        if line.startswith("ADDITIONAL_CODE:"):
+            code_part = line.replace("ADDITIONAL_CODE:", "").strip()
+            if code_part.lower() != "none" and code_part:
+                additional_code = code_part
+        elif line.startswith("NOTES:"):
+            notes_str = line.replace("NOTES:", "").strip()
+            if notes_str:
+                model_notes.extend(
+                    [n.strip() for n in notes_str.split(";") if n.strip()]
                 )
+        elif line.startswith("NEEDS_MRE:"):
+            value = line.replace("NEEDS_MRE:", "").strip().lower()
+            needs_mre = value == "true"
+
+    return _results(
+        state,
+        model_notes=model_notes,
+        additional_code=additional_code,
+        needs_mre=needs_mre,
+    )
 
-            draft_comment = "\n".join(comment_parts)
 
-        return {
-            "code_snippets": code_snippets,
-            "extraction_notes": extraction_notes,
-            "draft_comment": draft_comment,
-            "should_terminate": should_terminate,
-        }
+def _results(
+    state: AgentState,
+    *,
+    model_notes: list[str],
+    additional_code: str | None = None,
+    needs_mre: bool = False,
+) -> dict[str, Any]:
+    """Combine the fenced code blocks with the model's findings (if any)."""
+    version_notes = state.get("version_notes", [])
+    fenced_snippets = extract_fenced_code_blocks(load_blob(state["issue_content"]))
+
+    extraction_notes: list[str] = []
+    code_snippets: list[str] = []
+
+    if fenced_snippets:
+        code_snippets = fenced_snippets
+        extraction_notes.append(f"Found {len(fenced_snippets)} fenced code block(s)")
+    else:
+        extraction_notes.append("No fenced code blocks found")
+    extraction_notes.extend(model_notes)
+
+    # If LLM found additional code, add it
+    if additional_code:
+        code_snippets.append(additional_code)
+        extraction_notes.append("LLM identified additional unfenced code")
+
+    # Determine if we should terminate and draft a comment
+    draft_comment = None
+    should_terminate = False
+
+    if not code_snippets or needs_mre:
+        should_terminate = True
+        # Build draft comment
+        comment_parts = [
+            "Hi, I'm an automated bot that helps triage issues.",
+            "",
+            "I noticed you did not provide a minimal reproducible example (MRE) "
+            "in your issue. To help maintainers investigate the issue, we need "
+            "a code snippet that reproduces the behavior you are reporting.",
+            "",
+            "Please edit your issue to include a code example.",
+        ]
+
+        # Add version-related notes if any
+        if version_notes:
+            comment_parts.extend(
+                ["", "Additionally:"] + [f"- {note}" for note in version_notes]
+            )
+
+        draft_comment = "\n".join(comment_parts)
+
+    return {
+        "code_snippets": code_snippets,
+        "extraction_notes": extraction_notes,
+        "draft_comment": draft_comment,
+        "should_terminate": should_terminate,
+    }
+
+
+def _fast_path_results(state: AgentState) -> dict[str, Any] | None:
+    """Get the results without the model if the fenced code is complete."""
+    issue_content = load_blob(state["issue_content"])
+    if not is_complete_fenced_code(
+        issue_content, extract_fenced_code_blocks(issue_content)
+    ):
+        return None
+    return _results(
+        state, model_notes=["Fenced code parses as a complete Python script"]
+    )
+
+
+def create_code_extractor_agent() -> CompiledStateGraph[Any, Any]:
+    """Create the code extractor agent subgraph.
+
+    Returns:
+        A compiled `StateGraph` that extracts code from issues.
+    """
+    models = [
+        StopEarly(model, _new_parser) for model in get_agent_models("code_extractor")
+    ]
+
+    def extract_code(state: AgentState) -> dict[str, Any]:
+        """Extract code snippets from the issue content."""
+        if (results := _fast_path_results(state)) is not None:
+            return results
+        response = invoke_with_escalation(
+            "code_extractor", models, _build_messages(state), accept=_is_usable
+        )
+        return _parse_response(state, response)
+
+    async def aextract_code(state: AgentState) -> dict[str, Any]:
+        """Async version of `extract_code`."""
+        if (results := _fast_path_results(state)) is not None:
+            return results
+        response = await ainvoke_with_escalation(
+            "code_extractor", models, _build_messages(state), accept=_is_usable
+        )
+        return _parse_response(state, response)
 
     builder = StateGraph(AgentState)
-    builder.add_node("extract_code", extract_code)
+    builder.add_node("extract_code", RunnableLambda(extract_code, afunc=aextract_code))
     builder.add_edge(START, "extract_code")
     builder.add_edge("extract_code", END)
 
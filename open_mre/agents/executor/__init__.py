@@ -1,5 +1,5 @@
 """Executor agent subgraph."""
 
-from open_mre.agents.executor.agent import create_executor_agent
+from open_mre.agents.executor.agent import create_executor_agent, packages_to_install
 
-__all__ = ["create_executor_agent"]
+__all__ = ["create_executor_agent", "packages_to_install"]
@@ -4,34 +4,52 @@ This agent prepares code for execution, runs it in a Daytona sandbox,
 and captures the results.
 """
 
+import ast
 from typing import Annotated, Any
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.graph.state import CompiledStateGraph
 from typing_extensions import TypedDict
 
+from open_mre.agents.executor.cache import get_hydration_cache, hydration_key
 from open_mre.agents.executor.schemas import ExecutorInput, ExecutorOutput
-from open_mre.prompts import EXECUTOR_SYSTEM_PROMPT
-from open_mre.state import PackageInfo
+from open_mre.blobs import load_blob, store_blob
+from open_mre.models import (
+    ainvoke_with_escalation,
+    get_agent_model_config,
+    get_agent_models,
+    invoke_with_escalation,
+    shares_prompt_cache,
+)
+from open_mre.prompts import EXECUTOR_SYSTEM_PROMPT, build_messages
+from open_mre.state import PackageInfo, SandboxHandle
 from open_mre.tools.daytona_sandbox import (
     DAYTONA_AVAILABLE,
     ExecutionResult,
+    adiscard_sandbox,
+    aexecute_in_sandbox,
+    discard_sandbox,
     execute_in_sandbox,
 )
 
+# Sandbox execution timeout in seconds
+EXECUTION_TIMEOUT = 120
+
 
 class AgentState(TypedDict):
     """Internal state for the executor agent."""
 
     messages: Annotated[list[BaseMessage], add_messages]
+    issue_content: str
     code_snippets: list[str]
     packages: list[PackageInfo]
     approved_api_keys: dict[str, str]
     expected_behavior: str | None
     actual_behavior: str | None
+    sandbox: SandboxHandle | None
 
     # Results
     execution_output: str | None
@@ -40,36 +58,50 @@ class AgentState(TypedDict):
     execution_notes: list[str]
 
 
-def create_executor_agent() -> CompiledStateGraph[Any, Any]:
-    """Create the executor agent subgraph.
+def packages_to_install(packages: list[PackageInfo]) -> list[str]:
+    """Build the pip requirement list for the sandbox.
+
+    Args:
+        packages: Packages detected during version validation.
 
     Returns:
-        A compiled `StateGraph` that executes code in a sandbox.
+        Requirement strings, pinned to the user's version where known.
     """
-    model = init_chat_model(model="claude-sonnet-4-5")
-
-    def hydrate_code(state: AgentState) -> dict[str, Any]:
-        """Prepare the code for execution by adding necessary boilerplate."""
-        code_snippets = state.get("code_snippets", [])
-        packages = state.get("packages", [])
-        expected_behavior = state.get("expected_behavior")
-        actual_behavior = state.get("actual_behavior")
-
-        if not code_snippets:
-            return {
-                "hydrated_code": None,
-                "execution_notes": ["No code snippets to execute"],
-            }
-
-        # Combine code snippets
-        combined_code = "\n\n".join(code_snippets)
-
-        # Get package names for context
-        package_names = [p["name"] for p in packages if p.get("name")]
-
-        system_message = SystemMessage(content=EXECUTOR_SYSTEM_PROMPT)
-        human_message = HumanMessage(
-            content=f"""Prepare this code for execution in a sandboxed environment.
+    requirements: list[str] = []
+    for pkg in packages:
+        name = pkg.get("name")
+        version = pkg.get("user_version") or pkg.get("latest_version")
+        if name:
+            if version:
+                requirements.append(f"{name}=={version}")
+            else:
+                requirements.append(name)
+
+    # Always include core langchain packages
+    # TODO: hydrate with more?
+    core_packages = ["langchain", "langchain-core"]
+    for core_pkg in core_packages:
+        if core_pkg not in [p.split("==")[0] for p in requirements]:
+            requirements.append(core_pkg)
+
+    return requirements
+
+
+def _build_messages(state: AgentState) -> list[BaseMessage]:
+    """Build the code hydration prompt."""
+    code_snippets = state.get("code_snippets", [])
+    packages = state.get("packages", [])
+    expected_behavior = state.get("expected_behavior")
+    actual_behavior = state.get("actual_behavior")
+
+    # Combine code snippets
+    combined_code = "\n\n".join(code_snippets)
+
+    # Get package names for context
+    package_names = [p["name"] for p in packages if p.get("name")]
+
+    task = f"""Prepare this code from the GitHub issue above for execution in a
+sandboxed environment.
 
 The code should:
 1. Have all necessary imports
@@ -87,103 +119,245 @@ Expected behavior: {expected_behavior or "Not specified"}
 Actual behavior: {actual_behavior or "Not specified"}
 
 Return ONLY the hydrated Python code, nothing else. Do not include markdown fences."""
-        )
 
-        response = model.invoke(input=[system_message, human_message])
-        # TODO: use .content_blocks?
-        hydrated_code = response.content if isinstance(response.content, str) else ""
+    return build_messages(
+        load_blob(state.get("issue_content", "")),
+        EXECUTOR_SYSTEM_PROMPT,
+        task,
+        cache=shares_prompt_cache("executor"),
+    )
 
-        # Clean up the response - remove any markdown fences if present
-        hydrated_code = hydrated_code.strip()
-        hydrated_code = hydrated_code.removeprefix("```python")
-        hydrated_code = hydrated_code.removeprefix("```")
-        hydrated_code = hydrated_code.removesuffix("```")
-        hydrated_code = hydrated_code.strip()
 
+def _hydrated_code(response: BaseMessage) -> str:
+    """Get the code from the model response, without markdown fences."""
+    # TODO: use .content_blocks?
+    hydrated_code = response.content if isinstance(response.content, str) else ""
+
+    # Clean up the response - remove any markdown fences if present
+    hydrated_code = hydrated_code.strip()
+    hydrated_code = hydrated_code.removeprefix("```python")
+    hydrated_code = hydrated_code.removeprefix("```")
+    hydrated_code = hydrated_code.removesuffix("```")
+    return hydrated_code.strip()
+
+
+def _is_usable(response: BaseMessage) -> bool:
+    """Check that the response is Python code that compiles."""
+    hydrated_code = _hydrated_code(response)
+    if not hydrated_code:
+        return False
+    try:
+        ast.parse(hydrated_code)
+    except (SyntaxError, ValueError):
+        return False
+    return True
+
+
+def _parse_response(response: BaseMessage) -> dict[str, Any]:
+    """Parse the hydrated code out of the model response."""
+    hydrated_code = _hydrated_code(response)
+
+    return {
+        "hydrated_code": store_blob(hydrated_code or None),
+        "execution_notes": ["Code hydrated with necessary imports and boilerplate"],
+    }
+
+
+def _cache_key(state: AgentState) -> str | None:
+    """Get the hydration cache key of the state, or `None` without a cache."""
+    if get_hydration_cache() is None:
+        return None
+    return hydration_key(
+        state.get("code_snippets", []),
+        packages_to_install(state.get("packages", [])),
+        state.get("expected_behavior"),
+        state.get("actual_behavior"),
+        get_agent_model_config("executor").model,
+    )
+
+
+def _cached_hydration(key: str | None) -> dict[str, Any] | None:
+    """Get the state update for a cached hydrated script, if there is one."""
+    cache = get_hydration_cache()
+    hydrated_code = cache.get(key) if cache and key else None
+    if hydrated_code is None:
+        return None
+    return {
+        "hydrated_code": store_blob(hydrated_code),
+        "execution_notes": ["Hydrated code reused from cache"],
+    }
+
+
+def _cache_hydration(key: str | None, response: BaseMessage) -> None:
+    """Store the hydrated script of a usable response."""
+    cache = get_hydration_cache()
+    if cache and key and _is_usable(response):
+        cache.put(key, _hydrated_code(response))
+
+
+def _skip_execution(state: AgentState) -> dict[str, Any] | None:
+    """Check whether execution has to be skipped.
+
+    Returns:
+        The state update to return instead of executing, or `None` to execute.
+    """
+    execution_notes = list(state.get("execution_notes", []))
+
+    if not state.get("hydrated_code"):
         return {
-            "hydrated_code": hydrated_code,
-            "execution_notes": ["Code hydrated with necessary imports and boilerplate"],
+            "execution_output": None,
+            "execution_error": "No code to execute",
+            "execution_notes": [*execution_notes, "No code to execute"],
         }
 
-    def execute_code(state: AgentState) -> dict[str, Any]:
-        """Execute the hydrated code in a Daytona sandbox."""
-        hydrated_code = state.get("hydrated_code")
-        packages = state.get("packages", [])
-        approved_api_keys = state.get("approved_api_keys", {})
-        execution_notes = list(state.get("execution_notes", []))
+    # Check if Daytona is available
+    if not DAYTONA_AVAILABLE:
+        return {
+            "execution_output": None,
+            "execution_error": "Daytona SDK not available - cannot execute code",
+            "execution_notes": [
+                *execution_notes,
+                "Daytona SDK not installed - skipping execution",
+            ],
+        }
+
+    return None
+
+
+def _execution_update(
+    state: AgentState,
+    requirements: list[str],
+    outcome: ExecutionResult | Exception,
+) -> dict[str, Any]:
+    """Build the state update from a sandbox execution outcome."""
+    sandbox = state.get("sandbox")
+    execution_notes = list(state.get("execution_notes", []))
+
+    execution_notes.append(f"Installing packages: {requirements}")
+    if sandbox:
+        execution_notes.append(f"Reusing provisioned sandbox {sandbox['sandbox_id']}")
 
-        if not hydrated_code:
+    if isinstance(outcome, Exception):
+        execution_notes.append(f"Execution error: {outcome}")
+        return {
+            "execution_output": None,
+            "execution_error": str(outcome),
+            "execution_notes": execution_notes,
+        }
+
+    if not outcome.success:
+        execution_notes.append(f"Execution failed: {outcome.error_message}")
+        return {
+            "execution_output": store_blob(outcome.stdout or None),
+            "execution_error": outcome.stderr or outcome.error_message,
+            "execution_notes": execution_notes,
+        }
+
+    execution_notes.append("Code executed successfully")
+    return {
+        "execution_output": store_blob(outcome.stdout),
+        "execution_error": None,
+        "execution_notes": execution_notes,
+    }
+
+
+def create_executor_agent() -> CompiledStateGraph[Any, Any]:
+    """Create the executor agent subgraph.
+
+    Returns:
+        A compiled `StateGraph` that executes code in a sandbox.
+    """
+    models = get_agent_models("executor")
+
+    def hydrate_code(state: AgentState) -> dict[str, Any]:
+        """Prepare the code for execution by adding necessary boilerplate."""
+        if not state.get("code_snippets"):
             return {
-                "execution_output": None,
-                "execution_error": "No code to execute",
-                "execution_notes": [*execution_notes, "No code to execute"],
+                "hydrated_code": None,
+                "execution_notes": ["No code snippets to execute"],
             }
 
-        # Check if Daytona is available
-        if not DAYTONA_AVAILABLE:
+        key = _cache_key(state)
+        cached = _cached_hydration(key)
+        if cached is not None:
+            return cached
+
+        response = invoke_with_escalation(
+            "executor", models, _build_messages(state), accept=_is_usable
+        )
+        _cache_hydration(key, response)
+        return _parse_response(response)
+
+    async def ahydrate_code(state: AgentState) -> dict[str, Any]:
+        """Async version of `hydrate_code`."""
+        if not state.get("code_snippets"):
             return {
-                "execution_output": None,
-                "execution_error": "Daytona SDK not available - cannot execute code",
-                "execution_notes": [
-                    *execution_notes,
-                    "Daytona SDK not installed - skipping execution",
-                ],
+                "hydrated_code": None,
+                "execution_notes": ["No code snippets to execute"],
             }
 
+        key = _cache_key(state)
+        cached = _cached_hydration(key)
+        if cached is not None:
+            return cached
+
+        response = await ainvoke_with_escalation(
+            "executor", models, _build_messages(state), accept=_is_usable
+        )
+        _cache_hydration(key, response)
+        return _parse_response(response)
+
+    def execute_code(state: AgentState) -> dict[str, Any]:
+        """Execute the hydrated code in a Daytona sandbox."""
+        sandbox = state.get("sandbox")
+        skipped = _skip_execution(state)
+        if skipped is not None:
+            if sandbox:
+                discard_sandbox(sandbox)
+            return skipped
+
         # Prepare package list for installation
-        packages_to_install: list[str] = []
-        for pkg in packages:
-            name = pkg.get("name")
-            version = pkg.get("user_version") or pkg.get("latest_version")
-            if name:
-                if version:
-                    packages_to_install.append(f"{name}=={version}")
-                else:
-                    packages_to_install.append(name)
-
-        # Always include core langchain packages
-        # TODO: hydrate with more?
-        core_packages = ["langchain", "langchain-core"]
-        for core_pkg in core_packages:
-            if core_pkg not in [p.split("==")[0] for p in packages_to_install]:
-                packages_to_install.append(core_pkg)
-
-        execution_notes.append(f"Installing packages: {packages_to_install}")
+        requirements = packages_to_install(state.get("packages", []))
 
         # Execute in sandbox
         try:
-            result: ExecutionResult = execute_in_sandbox(
-                code=hydrated_code,
-                packages=packages_to_install,
-                env_vars=approved_api_keys,
-                timeout=120,  # 2 minute timeout
+            result = execute_in_sandbox(
+                code=load_blob(state["hydrated_code"]) or "",
+                packages=requirements,
+                env_vars=state.get("approved_api_keys", {}),
+                timeout=EXECUTION_TIMEOUT,
+                handle=sandbox,
             )
+        except Exception as e:
+            return _execution_update(state, requirements, e)
+        return _execution_update(state, requirements, result)
+
+    async def aexecute_code(state: AgentState) -> dict[str, Any]:
+        """Async version of `execute_code`."""
+        sandbox = state.get("sandbox")
+        skipped = _skip_execution(state)
+        if skipped is not None:
+            if sandbox:
+                await adiscard_sandbox(sandbox)
+            return skipped
+
+        requirements = packages_to_install(state.get("packages", []))
 
-            if not result.success:
-                execution_notes.append(f"Execution failed: {result.error_message}")
-                return {
-                    "execution_output": result.stdout or None,
-                    "execution_error": result.stderr or result.error_message,
-                    "execution_notes": execution_notes,
-                }
+        try:
+            result = await aexecute_in_sandbox(
+                code=load_blob(state["hydrated_code"]) or "",
+                packages=requirements,
+                env_vars=state.get("approved_api_keys", {}),
+                timeout=EXECUTION_TIMEOUT,
+                handle=sandbox,
+            )
         except Exception as e:
-            execution_notes.append(f"Execution error: {e}")
-            return {
-                "execution_output": None,
-                "execution_error": str(e),
-                "execution_notes": execution_notes,
-            }
-        else:
-            execution_notes.append("Code executed successfully")
-            return {
-                "execution_output": result.stdout,
-                "execution_error": None,
-                "execution_notes": execution_notes,
-            }
+            return _execution_update(state, requirements, e)
+        return _execution_update(state, requirements, result)
 
     builder = StateGraph(AgentState)
-    builder.add_node("hydrate_code", hydrate_code)
-    builder.add_node("execute_code", execute_code)
+    builder.add_node("hydrate_code", RunnableLambda(hydrate_code, afunc=ahydrate_code))
+    builder.add_node("execute_code", RunnableLambda(execute_code, afunc=aexecute_code))
     builder.add_edge(START, "hydrate_code")
     builder.add_edge("hydrate_code", "execute_code")
     builder.add_edge("execute_code", END)
@@ -205,11 +379,13 @@ def invoke_executor(
     """
     result = agent.invoke(
         input={
+            "issue_content": input_data.get("issue_content", ""),
             "code_snippets": input_data.get("code_snippets", []),
             "packages": input_data.get("packages", []),
             "approved_api_keys": input_data.get("approved_api_keys", {}),
             "expected_behavior": input_data.get("expected_behavior"),
             "actual_behavior": input_data.get("actual_behavior"),
+            "sandbox": input_data.get("sandbox"),
         }
     )
 
@@ -0,0 +1,162 @@
+"""Persistent cache of hydrated scripts.
+
+Hydrating an MRE into a runnable script is one of the longest model outputs in a
+run, and the same MRE is often hydrated again: on re-runs, after resuming from an
+API key approval, and for duplicate reports. The script depends only on the code,
+the packages to install, and the described behavior (not on the rest of the
+issue, which the response cache in `open_mre.llm_cache` keys on), so
+`HydrationCache` reuses scripts keyed on a normalized hash of those.
+
+Enable it with `set_hydration_cache`.
+"""
+
+import hashlib
+import json
+import re
+import textwrap
+from collections.abc import Sequence
+from datetime import timedelta
+from pathlib import Path
+
+from typing_extensions import TypedDict
+
+from open_mre.llm_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, SQLiteCache
+from open_mre.metrics import HYDRATION_CACHE_REQUESTS, increment
+
+# Bump when the hydration prompt changes, so earlier scripts are not reused
+HYDRATION_CACHE_VERSION = 1
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class HydrationCacheStats(TypedDict):
+    """Hydration cache statistics."""
+
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+
+
+def _normalize_code(snippet: str) -> str:
+    """Normalize line endings, indentation, and trailing whitespace."""
+    lines = snippet.replace("\r\n", "\n").split("\n")
+    return textwrap.dedent("\n".join(line.rstrip() for line in lines)).strip()
+
+
+def _normalize_text(text: str | None) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip().lower()
+
+
+def hydration_key(
+    code_snippets: Sequence[str],
+    requirements: Sequence[str],
+    expected_behavior: str | None,
+    actual_behavior: str | None,
+    model: str,
+) -> str:
+    """Compute the cache key of a hydration.
+
+    Args:
+        code_snippets: The code to hydrate, in order.
+        requirements: The packages to install (order does not matter).
+        expected_behavior: The behavior the user expects.
+        actual_behavior: The behavior the user observes.
+        model: The model that hydrates the code.
+
+    Returns:
+        The key.
+    """
+    normalized = {
+        "version": HYDRATION_CACHE_VERSION,
+        "model": model,
+        "code": [_normalize_code(snippet) for snippet in code_snippets],
+        "requirements": sorted(requirement.lower() for requirement in requirements),
+        "expected": _normalize_text(expected_behavior),
+        "actual": _normalize_text(actual_behavior),
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+
+class HydrationCache(SQLiteCache):
+    """Hydrated scripts in a SQLite database, shared across processes."""
+
+    table = "hydrated_code"
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: timedelta | None = DEFAULT_TTL,
+    ) -> None:
+        """Open (creating if needed) a cache database.
+
+        Args:
+            path: Path to the database file.
+            max_bytes: Maximum total size of the stored scripts.
+            ttl: How long a script is reused. `None` to keep scripts until they
+                are evicted.
+        """
+        super().__init__(path, max_bytes=max_bytes, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> str | None:
+        """Get a hydrated script.
+
+        Args:
+            key: The hydration key (see `hydration_key`).
+
+        Returns:
+            The script, or `None` if it is not cached.
+        """
+        script = self._get(key)
+        if script is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        increment(HYDRATION_CACHE_REQUESTS, outcome="miss" if script is None else "hit")
+        return script
+
+    def put(self, key: str, script: str) -> None:
+        """Store a hydrated script.
+
+        Args:
+            key: The hydration key (see `hydration_key`).
+            script: The script.
+        """
+        self._put(key, script)
+
+    def stats(self) -> HydrationCacheStats:
+        """Get the lookups since the cache was opened, and its size.
+
+        Returns:
+            Hits and misses, and the number and total size of stored scripts.
+        """
+        entries, size = self.size()
+        return HydrationCacheStats(
+            hits=self.hits, misses=self.misses, entries=entries, bytes=size
+        )
+
+
+_hydration_cache: HydrationCache | None = None
+
+
+def get_hydration_cache() -> HydrationCache | None:
+    """Get the hydration cache, if one is set.
+
+    Returns:
+        The cache, or `None`.
+    """
+    return _hydration_cache
+
+
+def set_hydration_cache(cache: HydrationCache | None) -> None:
+    """Set the hydration cache used by the executor agent.
+
+    Args:
+        cache: The cache, or `None` to disable caching.
+    """
+    global _hydration_cache  # noqa: PLW0603
+    _hydration_cache = cache
@@ -2,17 +2,19 @@
 
 from typing_extensions import TypedDict
 
-from open_mre.state import PackageInfo
+from open_mre.state import PackageInfo, SandboxHandle
 
 
 class ExecutorInput(TypedDict):
     """Input to the executor agent."""
 
+    issue_content: str
     code_snippets: list[str]
     packages: list[PackageInfo]
     approved_api_keys: dict[str, str]
     expected_behavior: str | None
     actual_behavior: str | None
+    sandbox: SandboxHandle | None  # Provisioned ahead of time by the coordinator
 
 
 class ExecutorOutput(TypedDict):
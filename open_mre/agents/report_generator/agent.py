@@ -6,8 +6,8 @@ based on the analysis and execution results.
 
 from typing import Annotated, Any
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.graph.state import CompiledStateGraph
@@ -17,9 +17,22 @@ from open_mre.agents.report_generator.schemas import (
     ReportGeneratorInput,
     ReportGeneratorOutput,
 )
-from open_mre.prompts import REPORT_GENERATOR_SYSTEM_PROMPT
+from open_mre.blobs import load_blob, store_blob
+from open_mre.models import (
+    ainvoke_with_escalation,
+    get_agent_models,
+    invoke_with_escalation,
+    shares_prompt_cache,
+)
+from open_mre.prompts import (
+    REPORT_GENERATOR_SYSTEM_PROMPT,
+    build_messages,
+    truncate_tokens,
+)
 from open_mre.state import PackageInfo
 
+EXECUTION_OUTPUT_TOKEN_BUDGET = 1000
+
 
 class AgentState(TypedDict):
     """Internal state for the report generator agent."""
@@ -45,73 +58,72 @@ class AgentState(TypedDict):
     reproduction_script: str | None
 
 
-def create_report_generator_agent() -> CompiledStateGraph[Any, Any]:
-    """Create the report generator agent subgraph.
-
-    Returns:
-        A compiled `StateGraph` that generates validation reports.
-    """
-    model = init_chat_model(model="claude-sonnet-4-5")
+def _build_messages(state: AgentState) -> list[BaseMessage]:
+    """Build the report generation prompt."""
+    # Gather all information
+    python_version = state.get("python_version")
+    packages = state.get("packages", [])
+    version_notes = state.get("version_notes", [])
+    code_snippets = state.get("code_snippets", [])
+    extraction_notes = state.get("extraction_notes", [])
+    expected_behavior = state.get("expected_behavior")
+    actual_behavior = state.get("actual_behavior")
+    analysis_notes = state.get("analysis_notes", [])
+    execution_output = load_blob(state.get("execution_output"))
+    execution_error = state.get("execution_error")
+    draft_comments = state.get("draft_comments", [])
+    termination_reason = state.get("termination_reason")
+
+    # Determine execution status
+    if termination_reason:
+        execution_status = f"Not Executed ({termination_reason})"
+    elif execution_output is not None:
+        execution_status = "Success"
+    elif execution_error is not None:
+        execution_status = "Error"
+    else:
+        execution_status = "Not Executed"
+
+    output_str = (
+        truncate_tokens(execution_output, EXECUTION_OUTPUT_TOKEN_BUDGET, keep="both")
+        if execution_output
+        else "None"
+    )
+    error_str = (
+        truncate_tokens(execution_error, EXECUTION_OUTPUT_TOKEN_BUDGET, keep="both")
+        if execution_error
+        else "None"
+    )
 
-    def generate_report(state: AgentState) -> dict[str, Any]:
-        """Generate the validation report and reproduction script."""
-        # Gather all information
-        issue_content = state.get("issue_content", "")
-        python_version = state.get("python_version")
-        packages = state.get("packages", [])
-        version_notes = state.get("version_notes", [])
-        code_snippets = state.get("code_snippets", [])
-        extraction_notes = state.get("extraction_notes", [])
-        expected_behavior = state.get("expected_behavior")
-        actual_behavior = state.get("actual_behavior")
-        analysis_notes = state.get("analysis_notes", [])
-        execution_output = state.get("execution_output")
-        execution_error = state.get("execution_error")
-        hydrated_code = state.get("hydrated_code")
-        draft_comments = state.get("draft_comments", [])
-        termination_reason = state.get("termination_reason")
-
-        # Determine execution status
-        if termination_reason:
-            execution_status = f"Not Executed ({termination_reason})"
-        elif execution_output is not None:
-            execution_status = "Success"
-        elif execution_error is not None:
-            execution_status = "Error"
+    # Format package information
+    package_info = []
+    for pkg in packages:
+        name = pkg.get("name", "Unknown")
+        user_ver = pkg.get("user_version", "not specified")
+        latest_ver = pkg.get("latest_version", "unknown")
+        is_outdated = pkg.get("is_outdated", False)
+        behind = pkg.get("releases_behind")
+        if is_outdated and behind:
+            status = f" (OUTDATED: {behind} release{'s' if behind != 1 else ''} behind)"
         else:
-            execution_status = "Not Executed"
-
-        # Format package information
-        package_info = []
-        for pkg in packages:
-            name = pkg.get("name", "Unknown")
-            user_ver = pkg.get("user_version", "not specified")
-            latest_ver = pkg.get("latest_version", "unknown")
-            is_outdated = pkg.get("is_outdated", False)
             status = " (OUTDATED)" if is_outdated else ""
-            info_line = f"- {name}: {user_ver} (latest: {latest_ver}){status}"
-            package_info.append(info_line)
+        info_line = f"- {name}: {user_ver} (latest: {latest_ver}){status}"
+        package_info.append(info_line)
 
-        package_str = (
-            "\n".join(package_info) if package_info else "- No packages detected"
-        )
+    package_str = "\n".join(package_info) if package_info else "- No packages detected"
 
-        # Format notes
-        all_notes = version_notes + extraction_notes + analysis_notes
-        notes_str = "\n".join([f"- {n}" for n in all_notes]) if all_notes else "- None"
-
-        # Format draft comments
-        comments_str = (
-            "\n\n---\n\n".join(draft_comments) if draft_comments else "None pending"
-        )
+    # Format notes
+    all_notes = version_notes + extraction_notes + analysis_notes
+    notes_str = "\n".join([f"- {n}" for n in all_notes]) if all_notes else "- None"
 
-        # Build context for LLM
-        system_message = SystemMessage(content=REPORT_GENERATOR_SYSTEM_PROMPT)
-        human_message = HumanMessage(
-            content=f"""Generate a validation report for this MRE analysis.
+    # Format draft comments
+    comments_str = (
+        "\n\n---\n\n".join(draft_comments) if draft_comments else "None pending"
+    )
 
-## Original Issue
-{issue_content[:2000]}{"..." if len(issue_content) > 2000 else ""}
+    # Build context for LLM
+    task = f"""Generate a validation report for the MRE analysis of the GitHub issue
+above.
 
 ## Version Information
 - Python: {python_version or "not specified"}
@@ -124,8 +136,8 @@ def create_report_generator_agent() -> CompiledStateGraph[Any, Any]:
 
 ## Execution Results
 - Status: {execution_status}
-- Output: {execution_output or "None"}
-- Error: {execution_error or "None"}
+- Output: {output_str}
+- Error: {error_str}
 
 ## Analysis Notes
 {notes_str}
@@ -140,47 +152,87 @@ The report should help maintainers quickly understand:
 3. What the next steps should be
 
 Keep it concise but thorough."""
+
+    return build_messages(
+        load_blob(state.get("issue_content", "")),
+        REPORT_GENERATOR_SYSTEM_PROMPT,
+        task,
+        cache=shares_prompt_cache("report_generator"),
+    )
+
+
+def _parse_response(state: AgentState, response: BaseMessage) -> dict[str, Any]:
+    """Finalize the report from the model response."""
+    execution_output = state.get("execution_output")
+    execution_error = state.get("execution_error")
+    termination_reason = state.get("termination_reason")
+    draft_comments = state.get("draft_comments", [])
+
+    # TODO: use .content_blocks?
+    report = response.content if isinstance(response.content, str) else ""
+
+    # Determine if issue was reproduced
+    was_reproduced = (
+        execution_output is not None
+        and execution_error is None
+        and not termination_reason
+    )
+
+    # Add reproduction status to report
+    if was_reproduced:
+        report += "\n\n---\n\n**Status: Issue behavior observed in sandbox execution**"
+    elif execution_error:
+        report += (
+            "\n\n---\n\n**Status: Execution produced an error "
+            "(may indicate reproduction of the reported issue)**"
         )
+    else:
+        report += "\n\n---\n\n**Status: Could not reproduce (execution not completed)**"
+
+    # Add draft comments section
+    if draft_comments:
+        report += "\n\n## Pending Comments for Human Review\n\n"
+        for i, comment in enumerate(draft_comments, 1):
+            report += f"### Comment {i}\n\n{comment}\n\n"
+
+    # The reproduction script is the hydrated code, so it shares its blob
+    return {
+        "validation_report": store_blob(report),
+        "reproduction_script": state.get("hydrated_code"),
+    }
 
-        response = model.invoke(input=[system_message, human_message])
-        # TODO: use .content_blocks?
-        report = response.content if isinstance(response.content, str) else ""
 
-        # Determine if issue was reproduced
-        was_reproduced = (
-            execution_output is not None
-            and execution_error is None
-            and not termination_reason
+def _is_usable(response: BaseMessage) -> bool:
+    """Check that the response has report text."""
+    return isinstance(response.content, str) and bool(response.content.strip())
+
+
+def create_report_generator_agent() -> CompiledStateGraph[Any, Any]:
+    """Create the report generator agent subgraph.
+
+    Returns:
+        A compiled `StateGraph` that generates validation reports.
+    """
+    models = get_agent_models("report_generator")
+
+    def generate_report(state: AgentState) -> dict[str, Any]:
+        """Generate the validation report and reproduction script."""
+        response = invoke_with_escalation(
+            "report_generator", models, _build_messages(state), accept=_is_usable
         )
+        return _parse_response(state, response)
 
-        # Add reproduction status to report
-        if was_reproduced:
-            report += (
-                "\n\n---\n\n**Status: Issue behavior observed in sandbox execution**"
-            )
-        elif execution_error:
-            report += (
-                "\n\n---\n\n**Status: Execution produced an error "
-                "(may indicate reproduction of the reported issue)**"
-            )
-        else:
-            report += (
-                "\n\n---\n\n**Status: Could not reproduce (execution not completed)**"
-            )
-
-        # Add draft comments section
-        if draft_comments:
-            report += "\n\n## Pending Comments for Human Review\n\n"
-            for i, comment in enumerate(draft_comments, 1):
-                report += f"### Comment {i}\n\n{comment}\n\n"
-
-        return {
-            "validation_report": report,
-            "reproduction_script": hydrated_code,
-        }
+    async def agenerate_report(state: AgentState) -> dict[str, Any]:
+        """Async version of `generate_report`."""
+        response = await ainvoke_with_escalation(
+            "report_generator", models, _build_messages(state), accept=_is_usable
+        )
+        return _parse_response(state, response)
 
     builder = StateGraph(AgentState)
-    builder.add_node("generate_report", generate_report)
+    builder.add_node(
+        "generate_report", RunnableLambda(generate_report, afunc=agenerate_report)
+    )
     builder.add_edge(START, "generate_report")
     builder.add_edge("generate_report", END)
 
@@ -2,25 +2,67 @@
 
 Analyzes inbound issues to extract and validate version information for Python and
 LangChain-related packages.
+
+Exact versions pasted from `pip freeze`, `langchain_core.sys_info`, or requirement
+lines are parsed directly (see `open_mre.agents.version_validator.parsing`) and
+checked against PyPI without the model. The model is only asked when no versions
+are found that way. Either way, whether a package is outdated (and by how many
+releases) is decided locally from its release history with PEP 440 ordering (see
+`open_mre.agents.version_validator.versions`), not by the model.
+
+By default it runs in a single bounded pass: the model looks up every package
+at once (one `check_pypi_versions` call, resolved concurrently), and then answers
+with a structured `VersionReport` tool call. The lookups are passed back as one
+compact message rather than the raw tool call history, and after `max_tool_rounds`
+rounds of lookups the report is forced. The original open-ended tool loop (one
+`check_pypi_version` call per package), followed by a separate summary call, is
+kept for `single_pass=False`.
 """
 
+import json
+from collections.abc import Mapping, Sequence
 from typing import Annotated, Any, Literal
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    ToolCall,
+    ToolMessage,
+)
+from langchain_core.runnables import Runnable, RunnableLambda
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import add_messages
 from langgraph.graph.state import CompiledStateGraph
 from langgraph.prebuilt import ToolNode
 from typing_extensions import TypedDict
 
+from open_mre.agents.version_validator.parsing import (
+    parse_package_versions,
+    parse_python_version,
+)
 from open_mre.agents.version_validator.schemas import (
+    VersionReport,
     VersionValidatorInput,
     VersionValidatorOutput,
 )
-from open_mre.prompts import VERSION_VALIDATOR_SYSTEM_PROMPT
+from open_mre.agents.version_validator.versions import version_lag
+from open_mre.blobs import load_blob
+from open_mre.line_protocol import LineProtocolParser, StopEarly
+from open_mre.models import (
+    ainvoke_with_escalation,
+    get_agent_models,
+    invoke_with_escalation,
+    messages_for,
+)
+from open_mre.prompts import (
+    VERSION_VALIDATOR_SYSTEM_PROMPT,
+    build_messages,
+)
 from open_mre.state import PackageInfo
-from open_mre.tools import check_pypi_version
+from open_mre.tools import check_pypi_version, check_pypi_versions
+from open_mre.tools.pypi_cache import PyPIMetadata, normalize_name
 
 
 class AgentState(TypedDict):
@@ -29,6 +71,9 @@ class AgentState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
     issue_content: str
 
+    # Exact package versions parsed from the issue
+    pinned_versions: dict[str, str]
+
     # Results to be extracted
     python_version: str | None
     packages: list[PackageInfo]
@@ -37,41 +82,7 @@ class AgentState(TypedDict):
     should_terminate: bool
 
 
-def create_version_validator_agent() -> CompiledStateGraph[Any, Any]:
-    """Create the version validator agent subgraph.
-
-    Returns:
-        A compiled `StateGraph` that validates package versions.
-    """
-    model = init_chat_model(model="claude-sonnet-4-5")
-    tools = [check_pypi_version]
-    model_with_tools = model.bind_tools(tools=tools)
-
-    def call_model(state: AgentState) -> dict[str, Any]:
-        """Call the model to analyze the issue or continue tool loop."""
-        messages = state["messages"]
-        response = model_with_tools.invoke(input=messages)
-        return {"messages": [response]}
-
-    def should_continue(state: AgentState) -> Literal["tools", "extract_results"]:
-        """Determine if we should continue with tools or extract results."""
-        messages = state["messages"]
-        last_message = messages[-1]
-
-        # If the model called tools, continue to tool node
-        if isinstance(last_message, AIMessage) and last_message.tool_calls:
-            return "tools"
-
-        # Otherwise, extract results from the conversation
-        return "extract_results"
-
-    def extract_results(state: AgentState) -> dict[str, Any]:
-        """Extract structured results from the conversation."""
-        # TODO: migrate to use provider (native) structured output
-        #       Is this a case for middleware?
-        messages = state["messages"]
-
-        extraction_prompt = """Based on the analysis above, provide a summary:
+EXTRACTION_PROMPT = """Based on the analysis above, provide a summary:
 
 1. Python version found (or "not specified" if none)
 2. List of packages found with their versions and whether they're outdated
@@ -85,83 +96,333 @@ NOTES: <note1>; <note2>; ...
 DRAFT_COMMENT: <comment or "none">
 SHOULD_TERMINATE: <true if outdated packages found, false otherwise>"""
 
-        extraction_model = init_chat_model(model="claude-sonnet-4-5")
-        extraction_messages = [*messages, HumanMessage(content=extraction_prompt)]
-
-        response = extraction_model.invoke(input=extraction_messages)
-        # TODO: migrate to use .content_blocks?
-        content = response.content if isinstance(response.content, str) else ""
-        lines = content.strip().split("\n")
-
-        python_version = None
-        packages: list[PackageInfo] = []
-        version_notes: list[str] = []
-        draft_comment = None
-        should_terminate = False
-
-        for raw_line in lines:
-            line = raw_line.strip()
-            if line.startswith("PYTHON_VERSION:"):
-                value = line.replace("PYTHON_VERSION:", "").strip()
-                python_version = None if value.lower() == "not specified" else value
-            elif line.startswith("PACKAGES:"):
-                pkg_str = line.replace("PACKAGES:", "").strip()
-                if pkg_str and pkg_str.lower() != "none":
-                    for pkg in pkg_str.split(","):
-                        parts = pkg.strip().split(":")
-                        if len(parts) >= 4:
-                            packages.append(
-                                PackageInfo(
-                                    name=parts[0].strip(),
-                                    user_version=parts[1].strip() or None,
-                                    latest_version=parts[2].strip() or None,
-                                    is_outdated=parts[3].strip().lower() == "true",
-                                )
+
+DEFAULT_MAX_TOOL_ROUNDS = 1
+
+REPORT_TOOL = VersionReport.__name__
+
+# Heads the message that replaces the tool call history in single-pass mode
+LOOKUP_RESULTS_HEADER = "PyPI lookup results (JSON):"
+
+SINGLE_PASS_INSTRUCTIONS = f"""Check every package in one response: call \
+check_pypi_versions once, with all the package names. Once you have the PyPI \
+results (or if there are no packages to check), call {REPORT_TOOL} with your \
+findings."""
+
+
+def _lookup_results(messages: Sequence[BaseMessage]) -> list[dict[str, Any]]:
+    """Collect the results of the PyPI lookups in a conversation."""
+    results: list[dict[str, Any]] = []
+    for message in messages:
+        if not isinstance(message, ToolMessage):
+            continue
+        # `ToolNode` serializes the tools' output as JSON: a result, or a list of
+        # results from `check_pypi_versions`
+        try:
+            output = json.loads(str(message.content))
+        except json.JSONDecodeError:
+            output = {"error": str(message.content)}
+        results.extend(
+            {k: v for k, v in result.items() if v is not None}
+            for result in (output if isinstance(output, list) else [output])
+        )
+    return results
+
+
+def _lookup_metadata(messages: Sequence[BaseMessage]) -> dict[str, PyPIMetadata]:
+    """Collect the PyPI metadata attached to the lookups in a conversation."""
+    metadata: dict[str, PyPIMetadata] = {}
+    for message in messages:
+        # The lookup tools attach the metadata of the packages found, by name
+        if isinstance(message, ToolMessage) and isinstance(message.artifact, dict):
+            metadata.update(
+                (normalize_name(name), package)
+                for name, package in message.artifact.items()
+            )
+    return metadata
+
+
+def _trim_messages(messages: Sequence[BaseMessage]) -> list[BaseMessage]:
+    """Replace the tool call history with a single message listing the results.
+
+    Args:
+        messages: The conversation, starting with the system and issue messages.
+
+    Returns:
+        The system and issue messages, followed by the lookup results (if any).
+    """
+    trimmed = list(messages[:2])
+    results = _lookup_results(messages)
+    if results:
+        trimmed.append(
+            HumanMessage(
+                content=f"{LOOKUP_RESULTS_HEADER}\n"
+                f"{json.dumps(results, separators=(',', ':'))}"
+            )
+        )
+    return trimmed
+
+
+def _tool_rounds(messages: Sequence[BaseMessage]) -> int:
+    """Count the model responses that requested tool calls."""
+    return sum(1 for m in messages if isinstance(m, AIMessage) and m.tool_calls)
+
+
+def _parse_report(response: BaseMessage) -> dict[str, Any]:
+    """Read version results from a `VersionReport` call, or a text summary."""
+    tool_calls = response.tool_calls if isinstance(response, AIMessage) else []
+    report = next((c["args"] for c in tool_calls if c["name"] == REPORT_TOOL), None)
+    if report is None:
+        # Models that answer in text rather than with the tool
+        return _parse_extraction(response)
+
+    # Latest versions and whether packages are outdated are filled in by
+    # `_compare_versions`
+    packages = [
+        PackageInfo(
+            name=str(package.get("name", "")),
+            user_version=package.get("user_version") or None,
+            latest_version=None,
+            is_outdated=None,
+            releases_behind=None,
+        )
+        for package in report.get("packages") or []
+        if package.get("name")
+    ]
+    return {
+        "python_version": report.get("python_version") or None,
+        "packages": packages,
+        "version_notes": list(report.get("version_notes") or []),
+        "draft_comment": None,
+        "should_terminate": False,
+    }
+
+
+def _has_summary(response: BaseMessage) -> bool:
+    """Check that a text response is in the summary format."""
+    content = response.content if isinstance(response.content, str) else ""
+    lines = [line.strip() for line in content.splitlines()]
+    return all(
+        any(line.startswith(field) for line in lines)
+        for field in ("PYTHON_VERSION:", "PACKAGES:", "SHOULD_TERMINATE:")
+    )
+
+
+def _is_usable(response: BaseMessage) -> bool:
+    """Check that the response requests lookups, reports, or has a summary."""
+    if isinstance(response, AIMessage) and response.tool_calls:
+        return True
+    return _has_summary(response)
+
+
+def _upgrade_comment(outdated: list[PackageInfo], python_version: str | None) -> str:
+    """Draft a comment asking the user to upgrade outdated packages."""
+    versions = [
+        f"`{p['name']}` (you indicated version `{p['user_version']}`, while the "
+        f"latest is `{p['latest_version']}`)"
+        for p in outdated
+    ]
+    noun = "an outdated version" if len(outdated) == 1 else "outdated versions"
+    parts = [
+        (
+            "Hi, I'm an automated bot that helps triage issues. I noticed you are "
+            f"using {noun} of {', '.join(versions[:-1])}"
+            f"{' and ' if len(versions) > 1 else ''}{versions[-1]}. Please upgrade "
+            "to the latest version and confirm if the issue persists."
+        )
+    ]
+    if python_version is None:
+        parts.append(
+            "Also, I noticed you did not specify the Python version you are using. "
+            "It is helpful for maintainers to know this; please edit your issue to "
+            "include this information."
+        )
+    return "\n\n".join(parts)
+
+
+def _compare_versions(
+    results: dict[str, Any],
+    metadata: Mapping[str, PyPIMetadata],
+    python_version: str | None,
+) -> dict[str, Any]:
+    """Decide which packages are outdated, from their release history.
+
+    Args:
+        results: Version results, with the packages and their reported versions.
+        metadata: PyPI metadata of the packages looked up, by normalized name.
+        python_version: The Python version the user reports.
+
+    Returns:
+        The results, with the latest version of each package, whether it is
+        outdated and by how many releases, and whether to terminate.
+    """
+    packages: list[PackageInfo] = []
+    version_notes = list(results["version_notes"])
+    for package in results["packages"]:
+        name, user_version = package["name"], package["user_version"]
+        package_metadata = metadata.get(normalize_name(name))
+        # Without metadata (e.g. a text summary), fall back to the reported latest
+        latest_version = (
+            package_metadata["latest_version"]
+            if package_metadata
+            else package["latest_version"]
+        )
+        lag = version_lag(user_version, latest_version, package_metadata)
+        if lag and lag["yanked"]:
+            version_notes.append(f"{name} {user_version} has been yanked from PyPI")
+        packages.append(
+            PackageInfo(
+                name=name,
+                user_version=user_version,
+                latest_version=latest_version,
+                is_outdated=lag["is_outdated"] if lag else None,
+                releases_behind=lag["releases_behind"] if lag else None,
+            )
+        )
+
+    outdated = [p for p in packages if p["is_outdated"]]
+    draft_comment = None
+    if outdated:
+        draft_comment = results.get("draft_comment") or _upgrade_comment(
+            outdated, python_version
+        )
+    return {
+        **results,
+        "packages": packages,
+        "version_notes": version_notes,
+        "draft_comment": draft_comment,
+        "should_terminate": bool(outdated),
+    }
+
+
+def _lookup_call(state: AgentState) -> ToolCall:
+    """Build the call looking up the parsed packages, so that it returns metadata."""
+    return ToolCall(
+        name=check_pypi_versions.name,
+        args={"package_names": list(state["pinned_versions"])},
+        id="parsed_versions",
+        type="tool_call",
+    )
+
+
+def _checked_results(state: AgentState, message: ToolMessage) -> dict[str, Any]:
+    """Build the results from parsed versions and their PyPI lookups."""
+    packages: list[PackageInfo] = []
+    version_notes: list[str] = []
+    for (name, user_version), lookup in zip(
+        state["pinned_versions"].items(), _lookup_results([message]), strict=True
+    ):
+        if lookup.get("error"):
+            version_notes.append(f"Could not check {name} on PyPI: {lookup['error']}")
+        packages.append(
+            PackageInfo(
+                name=name,
+                user_version=user_version,
+                latest_version=lookup.get("latest_version"),
+                is_outdated=None,
+                releases_behind=None,
+            )
+        )
+    python_version = state.get("python_version")
+    if python_version is None:
+        version_notes.insert(0, "Python version not specified")
+
+    results = {"packages": packages, "version_notes": version_notes}
+    return _compare_versions(results, _lookup_metadata([message]), python_version)
+
+
+def _parse_extraction(response: BaseMessage) -> dict[str, Any]:
+    """Parse the summary response into structured version results."""
+    # TODO: migrate to use .content_blocks?
+    content = response.content if isinstance(response.content, str) else ""
+    lines = content.strip().split("\n")
+
+    python_version = None
+    packages: list[PackageInfo] = []
+    version_notes: list[str] = []
+    draft_comment = None
+    should_terminate = False
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        if line.startswith("PYTHON_VERSION:"):
+            value = line.replace("PYTHON_VERSION:", "").strip()
+            python_version = None if value.lower() == "not specified" else value
+        elif line.startswith("PACKAGES:"):
+            pkg_str = line.replace("PACKAGES:", "").strip()
+            if pkg_str and pkg_str.lower() != "none":
+                for pkg in pkg_str.split(","):
+                    parts = pkg.strip().split(":")
+                    if len(parts) >= 4:
+                        packages.append(
+                            PackageInfo(
+                                name=parts[0].strip(),
+                                user_version=parts[1].strip() or None,
+                                latest_version=parts[2].strip() or None,
+                                is_outdated=parts[3].strip().lower() == "true",
+                                releases_behind=None,
                             )
-            elif line.startswith("NOTES:"):
-                notes_str = line.replace("NOTES:", "").strip()
-                if notes_str and notes_str.lower() != "none":
-                    version_notes = [
-                        n.strip() for n in notes_str.split(";") if n.strip()
-                    ]
-            elif line.startswith("DRAFT_COMMENT:"):
-                comment = line.replace("DRAFT_COMMENT:", "").strip()
-                draft_comment = None if comment.lower() == "none" else comment
-            elif line.startswith("SHOULD_TERMINATE:"):
-                value = line.replace("SHOULD_TERMINATE:", "").strip().lower()
-                should_terminate = value == "true"
+                        )
+        elif line.startswith("NOTES:"):
+            notes_str = line.replace("NOTES:", "").strip()
+            if notes_str and notes_str.lower() != "none":
+                version_notes = [n.strip() for n in notes_str.split(";") if n.strip()]
+        elif line.startswith("DRAFT_COMMENT:"):
+            comment = line.replace("DRAFT_COMMENT:", "").strip()
+            draft_comment = None if comment.lower() == "none" else comment
+        elif line.startswith("SHOULD_TERMINATE:"):
+            value = line.replace("SHOULD_TERMINATE:", "").strip().lower()
+            should_terminate = value == "true"
+
+    return {
+        "python_version": python_version,
+        "packages": packages,
+        "version_notes": version_notes,
+        "draft_comment": draft_comment,
+        "should_terminate": should_terminate,
+    }
+
+
+def create_version_validator_agent(
+    *,
+    single_pass: bool = True,
+    max_tool_rounds: int = DEFAULT_MAX_TOOL_ROUNDS,
+) -> CompiledStateGraph[Any, Any]:
+    """Create the version validator agent subgraph.
 
-        return {
-            "python_version": python_version,
-            "packages": packages,
-            "version_notes": version_notes,
-            "draft_comment": draft_comment,
-            "should_terminate": should_terminate,
-        }
+    Args:
+        single_pass: Whether to look up all packages in parallel and answer with a
+            structured report (see the module docstring). If `False`, run the
+            open-ended tool loop followed by a separate summary call.
+        max_tool_rounds: In single-pass mode, the number of model responses that
+            may request lookups before the report is forced.
+
+    Returns:
+        A compiled `StateGraph` that validates package versions.
+    """
+    # The same clients serve the tool loop (via `bind_tools`) and the extraction
+    models = get_agent_models("version_validator")
+    lookup_tool = check_pypi_versions if single_pass else check_pypi_version
 
     def prepare_prompt(state: AgentState) -> dict[str, Any]:
         """Prepare the initial prompt from the issue content."""
-        issue_content = state["issue_content"]
-
-        system_message = SystemMessage(content=VERSION_VALIDATOR_SYSTEM_PROMPT)
-        human_message = HumanMessage(
-            content=f"""Analyze this GitHub issue and extract version information.
-Use the check_pypi_version tool to verify if LangChain packages are on their
+        task = f"""Analyze the GitHub issue above and extract version information.
+Use the {lookup_tool.name} tool to verify if LangChain packages are on their
 latest versions.
 
-GitHub Issue:
----
-{issue_content}
----
-
 Extract:
 1. Python version (if mentioned)
 2. All LangChain-related packages and their versions
 3. Verify each package version against PyPI"""
-        )
+        if single_pass:
+            task += f"\n\n{SINGLE_PASS_INSTRUCTIONS}"
 
         return {
-            "messages": [system_message, human_message],
+            "messages": build_messages(
+                load_blob(state["issue_content"]),
+                VERSION_VALIDATOR_SYSTEM_PROMPT,
+                task,
+            ),
             "python_version": None,
             "packages": [],
             "version_notes": [],
@@ -169,20 +430,228 @@ Extract:
             "should_terminate": False,
         }
 
+    def parse_versions(state: AgentState) -> dict[str, Any]:
+        """Parse exact versions from the issue, without the model."""
+        issue_content = load_blob(state["issue_content"])
+        return {
+            "pinned_versions": parse_package_versions(issue_content),
+            "python_version": parse_python_version(issue_content),
+        }
+
+    def after_parse(state: AgentState) -> Literal["check_versions", "prepare_prompt"]:
+        """Ask the model only if no package versions were parsed."""
+        return "check_versions" if state["pinned_versions"] else "prepare_prompt"
+
+    def check_versions(state: AgentState) -> dict[str, Any]:
+        """Look up the parsed packages on PyPI, concurrently."""
+        message = check_pypi_versions.invoke(_lookup_call(state))
+        return _checked_results(state, message)
+
+    async def acheck_versions(state: AgentState) -> dict[str, Any]:
+        """Async version of `check_versions`."""
+        message = await check_pypi_versions.ainvoke(_lookup_call(state))
+        return _checked_results(state, message)
+
     builder = StateGraph(AgentState)
+    builder.add_node("parse_versions", parse_versions)
+    builder.add_node(
+        "check_versions", RunnableLambda(check_versions, afunc=acheck_versions)
+    )
     builder.add_node("prepare_prompt", prepare_prompt)
-    builder.add_node("call_model", call_model)
-    builder.add_node("tools", ToolNode(tools))
-    builder.add_node("extract_results", extract_results)
-    builder.add_edge(START, "prepare_prompt")
+    # Both lookup tools, in case a model calls the other one
+    builder.add_node("tools", ToolNode([check_pypi_versions, check_pypi_version]))
+    builder.add_edge(START, "parse_versions")
+    builder.add_conditional_edges("parse_versions", after_parse)
+    builder.add_edge("check_versions", END)
     builder.add_edge("prepare_prompt", "call_model")
-    builder.add_conditional_edges("call_model", should_continue)
     builder.add_edge("tools", "call_model")
-    builder.add_edge("extract_results", END)
+
+    if single_pass:
+        _add_single_pass_nodes(builder, models, max_tool_rounds)
+    else:
+        _add_tool_loop_nodes(builder, models)
 
     return builder.compile()
 
 
+def _add_single_pass_nodes(
+    builder: StateGraph[Any, Any, Any, Any],
+    models: Sequence[BaseChatModel],
+    max_tool_rounds: int,
+) -> None:
+    """Add the bounded lookup-then-report nodes to the agent graph."""
+    models_with_tools: list[Runnable[Any, BaseMessage]] = [
+        model.bind_tools(
+            [check_pypi_versions, VersionReport],
+            tool_choice="any",
+            parallel_tool_calls=True,
+        )
+        for model in models
+    ]
+    models_with_report: list[Runnable[Any, BaseMessage]] = [
+        model.bind_tools([VersionReport], tool_choice=REPORT_TOOL) for model in models
+    ]
+
+    def _models_for(
+        messages: Sequence[BaseMessage],
+    ) -> list[Runnable[Any, BaseMessage]]:
+        if _tool_rounds(messages) >= max_tool_rounds:
+            return models_with_report
+        return models_with_tools
+
+    def call_model(state: AgentState) -> dict[str, Any]:
+        """Call the model to look up packages, or to report the results."""
+        messages = state["messages"]
+        response = invoke_with_escalation(
+            "version_validator",
+            _models_for(messages),
+            _trim_messages(messages),
+            accept=_is_usable,
+        )
+        return {"messages": [response]}
+
+    async def acall_model(state: AgentState) -> dict[str, Any]:
+        """Async version of `call_model`."""
+        messages = state["messages"]
+        response = await ainvoke_with_escalation(
+            "version_validator",
+            _models_for(messages),
+            _trim_messages(messages),
+            accept=_is_usable,
+        )
+        return {"messages": [response]}
+
+    def should_continue(state: AgentState) -> Literal["tools", "extract_results"]:
+        """Run the lookups, unless the model reported (or answered in text).
+
+        The round limit is also enforced here, in case a model ignores the forced
+        tool choice.
+        """
+        messages = state["messages"]
+        last_message = messages[-1]
+        tool_calls = (
+            last_message.tool_calls if isinstance(last_message, AIMessage) else []
+        )
+        called = {call["name"] for call in tool_calls}
+        if (
+            called
+            and REPORT_TOOL not in called
+            and _tool_rounds(messages) <= max_tool_rounds
+        ):
+            return "tools"
+        return "extract_results"
+
+    def extract_results(state: AgentState) -> dict[str, Any]:
+        """Read the model's report, and compare the versions it found."""
+        messages = state["messages"]
+        results = _parse_report(messages[-1])
+        return _compare_versions(
+            results, _lookup_metadata(messages), results["python_version"]
+        )
+
+    builder.add_node("call_model", RunnableLambda(call_model, afunc=acall_model))
+    builder.add_node("extract_results", extract_results)
+    builder.add_conditional_edges("call_model", should_continue)
+    builder.add_edge("extract_results", END)
+
+
+def _add_tool_loop_nodes(
+    builder: StateGraph[Any, Any, Any, Any], models: Sequence[BaseChatModel]
+) -> None:
+    """Add the open-ended tool loop and summary nodes to the agent graph.
+
+    Only the summary call escalates; the loop ends whenever the model stops
+    calling tools.
+    """
+    model_with_tools = models[0].bind_tools(tools=[check_pypi_version])
+    summary_models = [
+        StopEarly(
+            model,
+            lambda: LineProtocolParser(
+                (
+                    "PYTHON_VERSION",
+                    "PACKAGES",
+                    "NOTES",
+                    "DRAFT_COMMENT",
+                    "SHOULD_TERMINATE",
+                )
+            ),
+        )
+        for model in models
+    ]
+
+    def call_model(state: AgentState) -> dict[str, Any]:
+        """Call the model to analyze the issue or continue tool loop."""
+        messages = state["messages"]
+        response = model_with_tools.invoke(
+            input=messages_for(model_with_tools, messages)
+        )
+        return {"messages": [response]}
+
+    async def acall_model(state: AgentState) -> dict[str, Any]:
+        """Async version of `call_model`."""
+        messages = state["messages"]
+        response = await model_with_tools.ainvoke(
+            input=messages_for(model_with_tools, messages)
+        )
+        return {"messages": [response]}
+
+    def should_continue(state: AgentState) -> Literal["tools", "extract_results"]:
+        """Determine if we should continue with tools or extract results."""
+        messages = state["messages"]
+        last_message = messages[-1]
+
+        # If the model called tools, continue to tool node
+        if isinstance(last_message, AIMessage) and last_message.tool_calls:
+            return "tools"
+
+        # Otherwise, extract results from the conversation
+        return "extract_results"
+
+    def extract_results(state: AgentState) -> dict[str, Any]:
+        """Extract structured results from the conversation."""
+        extraction_messages = [
+            *state["messages"],
+            HumanMessage(content=EXTRACTION_PROMPT),
+        ]
+
+        response = invoke_with_escalation(
+            "version_validator",
+            summary_models,
+            extraction_messages,
+            accept=_has_summary,
+        )
+        results = _parse_extraction(response)
+        return _compare_versions(
+            results, _lookup_metadata(state["messages"]), results["python_version"]
+        )
+
+    async def aextract_results(state: AgentState) -> dict[str, Any]:
+        """Async version of `extract_results`."""
+        extraction_messages = [
+            *state["messages"],
+            HumanMessage(content=EXTRACTION_PROMPT),
+        ]
+
+        response = await ainvoke_with_escalation(
+            "version_validator",
+            summary_models,
+            extraction_messages,
+            accept=_has_summary,
+        )
+        results = _parse_extraction(response)
+        return _compare_versions(
+            results, _lookup_metadata(state["messages"]), results["python_version"]
+        )
+
+    builder.add_node("call_model", RunnableLambda(call_model, afunc=acall_model))
+    builder.add_node(
+        "extract_results", RunnableLambda(extract_results, afunc=aextract_results)
+    )
+    builder.add_conditional_edges("call_model", should_continue)
+    builder.add_edge("extract_results", END)
+
+
 def invoke_version_validator(
     agent: CompiledStateGraph[Any, Any], input_data: VersionValidatorInput
 ) -> VersionValidatorOutput:
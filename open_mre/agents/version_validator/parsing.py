@@ -0,0 +1,86 @@
+"""Deterministic extraction of version information from issue text.
+
+Issue templates ask for `pip freeze` or `python -m langchain_core.sys_info` output,
+which can be read exactly rather than by the model. Only packages from the
+LangChain ecosystem (see `ECOSYSTEM_PREFIXES`) are reported.
+"""
+
+import re
+
+from open_mre.tools.pypi_cache import normalize_name
+
+ECOSYSTEM_PREFIXES = ("langchain", "langgraph", "langsmith", "langserve")
+
+_NAME = r"[A-Za-z0-9](?:[\w.-]*[A-Za-z0-9])?"
+_VERSION = r"\d[\w.!+]*"
+
+_REQUIREMENT = rf"({_NAME})(?:\[[^\]]*\])?\s*===?\s*({_VERSION})"
+
+# Listings of the installed packages, which take precedence over install commands
+_INSTALLED_PATTERNS = (
+    # `pip freeze` and requirements files: `langchain-core==1.0.4`
+    re.compile(rf"^\s*{_REQUIREMENT}", re.MULTILINE),
+    # `langchain_core.sys_info`: `> langchain_core: 1.0.4`
+    re.compile(rf"^\s*>\s*({_NAME})\s*:\s*({_VERSION})\s*$", re.MULTILINE),
+    # `pip list`: `langchain-core    1.0.4`
+    re.compile(rf"^\s*({_NAME})[ \t]{{2,}}({_VERSION})\s*$", re.MULTILINE),
+)
+
+# Pins in install commands (e.g. `pip install -U langchain==1.0.0`); elsewhere in
+# prose, a pin may well be a version the user moved away from
+_PIP_INSTALL = re.compile(r"\bpip3?\s+install\b([^\n`]*)")
+_INLINE_REQUIREMENT = re.compile(rf"(?<![\w.-]){_REQUIREMENT}")
+
+# `Python 3.11`, `Python Version: 3.11.7 (main, ...)`, `python==3.12`, paths like
+# `/usr/lib/python3.11/`
+_PYTHON_VERSION = re.compile(
+    r"\bpython(?:\s+version)?\s*[:=]*\s*v?(\d\.\d+(?:\.\d+)?)\b", re.IGNORECASE
+)
+
+
+def parse_package_versions(content: str) -> dict[str, str]:
+    """Find the exact versions of LangChain ecosystem packages in an issue.
+
+    Args:
+        content: The markdown content of the issue.
+
+    Returns:
+        Normalized package names mapped to versions, in order of mention. A package
+        listed more than once keeps its first version, and versions listed as
+        installed (`pip freeze`, `sys_info`, `pip list`) win over `pip install`
+        commands. Other pins in prose are ignored.
+    """
+    # Each pin with its precedence (installed listings first) and position
+    found: list[tuple[int, int, str, str]] = []
+    for pattern in _INSTALLED_PATTERNS:
+        found.extend(
+            (0, match.start(), normalize_name(match[1]), match[2])
+            for match in pattern.finditer(content)
+        )
+    for command in _PIP_INSTALL.finditer(content):
+        found.extend(
+            (1, command.start(1) + match.start(), normalize_name(match[1]), match[2])
+            for match in _INLINE_REQUIREMENT.finditer(command[1])
+        )
+
+    pins: dict[str, tuple[int, str]] = {}
+    for _, position, name, version in sorted(found):
+        if name.startswith(ECOSYSTEM_PREFIXES):
+            pins.setdefault(name, (position, version))
+    return {
+        name: version
+        for name, (_, version) in sorted(pins.items(), key=lambda pin: pin[1][0])
+    }
+
+
+def parse_python_version(content: str) -> str | None:
+    """Find the Python version mentioned in an issue.
+
+    Args:
+        content: The markdown content of the issue.
+
+    Returns:
+        The first Python version mentioned, or `None`.
+    """
+    match = _PYTHON_VERSION.search(content)
+    return match[1] if match else None
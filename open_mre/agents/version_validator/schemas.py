@@ -1,5 +1,7 @@
 """Input/output schemas for the version validator agent."""
 
+from typing import Annotated
+
 from typing_extensions import TypedDict
 
 from open_mre.state import PackageInfo
@@ -19,3 +21,29 @@ class VersionValidatorOutput(TypedDict):
     version_notes: list[str]
     draft_comment: str | None
     should_terminate: bool
+
+
+class ReportedPackage(TypedDict):
+    """A LangChain-related package mentioned in the issue."""
+
+    name: Annotated[str, ..., "Package name, as published on PyPI"]
+    user_version: Annotated[
+        str | None, ..., "Version the user reports, or null if not mentioned"
+    ]
+
+
+class VersionReport(TypedDict):
+    """Report the version information found in the issue.
+
+    Call this once every package has been checked against PyPI. Whether packages
+    are outdated is worked out from the PyPI results, so only report what the issue
+    says.
+    """
+
+    python_version: Annotated[
+        str | None, ..., "Python version the user reports, or null if not mentioned"
+    ]
+    packages: Annotated[list[ReportedPackage], ..., "Every package found"]
+    version_notes: Annotated[
+        list[str], ..., "Notes about missing or ambiguous version information"
+    ]
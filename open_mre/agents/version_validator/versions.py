@@ -0,0 +1,139 @@
+"""Compare reported versions with a package's release history.
+
+Whether a package is outdated is decided here, with PEP 440 ordering, rather than
+by the model. The releases of each package are kept as sorted `Version` arrays, so
+that counting the releases a version is behind is a binary search.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterable
+from functools import lru_cache
+
+from packaging.version import InvalidVersion, Version
+from typing_extensions import TypedDict
+
+from open_mre.tools.pypi_cache import PyPIMetadata
+
+
+def _parse(versions: Iterable[str]) -> list[Version]:
+    """Parse versions, dropping invalid (pre-PEP 440) ones."""
+    parsed: list[Version] = []
+    for version in versions:
+        try:
+            parsed.append(Version(version))
+        except InvalidVersion:
+            continue
+    return parsed
+
+
+class ReleaseHistory:
+    """The installable releases of a package, in PEP 440 order."""
+
+    def __init__(self, releases: Iterable[str], yanked: Iterable[str] = ()) -> None:
+        """Initialize the history.
+
+        Args:
+            releases: Every release of the package, in any order.
+            yanked: The releases that have been yanked.
+        """
+        self.yanked = frozenset(_parse(yanked))
+        # Yanked releases are not counted: pip does not install them
+        self.releases = sorted(v for v in _parse(releases) if v not in self.yanked)
+        self.final_releases = [v for v in self.releases if not v.is_prerelease]
+
+    def releases_after(self, version: Version) -> int:
+        """Count the releases newer than a version.
+
+        Pre-releases only count for users already on a pre-release, who opted in
+        to them.
+
+        Args:
+            version: The version in use.
+
+        Returns:
+            The number of newer releases.
+        """
+        releases = self.releases if version.is_prerelease else self.final_releases
+        return len(releases) - bisect_right(releases, version)
+
+    def is_yanked(self, version: Version) -> bool:
+        """Check whether a version has been yanked.
+
+        Args:
+            version: The version in use.
+
+        Returns:
+            Whether the version has been yanked.
+        """
+        return version in self.yanked
+
+
+@lru_cache(maxsize=256)
+def release_history(
+    releases: tuple[str, ...], yanked: tuple[str, ...] = ()
+) -> ReleaseHistory:
+    """Get the history of a package, parsing each distinct one only once.
+
+    Args:
+        releases: Every release of the package.
+        yanked: The releases that have been yanked.
+
+    Returns:
+        The release history.
+    """
+    return ReleaseHistory(releases, yanked)
+
+
+class VersionLag(TypedDict):
+    """How far a reported version is behind the latest release."""
+
+    is_outdated: bool
+    # `None` when the release history is unknown
+    releases_behind: int | None
+    yanked: bool
+
+
+def version_lag(
+    user_version: str | None,
+    latest_version: str | None,
+    metadata: PyPIMetadata | None = None,
+) -> VersionLag | None:
+    """Compare a reported version with the latest release of its package.
+
+    With the package's release history, a version is outdated when newer releases
+    (excluding yanked ones, and pre-releases unless the version is one) exist.
+    Without it, the version is only compared with `latest_version`.
+
+    Args:
+        user_version: The version the user reports.
+        latest_version: The latest version of the package.
+        metadata: The package's PyPI metadata, if known.
+
+    Returns:
+        The lag, or `None` if either version is unknown or invalid.
+    """
+    if not user_version:
+        return None
+    try:
+        version = Version(user_version)
+    except InvalidVersion:
+        return None
+
+    if metadata and metadata.get("releases"):
+        history = release_history(
+            tuple(metadata["releases"]), tuple(metadata["yanked_versions"])
+        )
+        behind = history.releases_after(version)
+        return VersionLag(
+            is_outdated=behind > 0,
+            releases_behind=behind,
+            yanked=history.is_yanked(version),
+        )
+
+    if not latest_version:
+        return None
+    try:
+        is_outdated = version < Version(latest_version)
+    except InvalidVersion:
+        return None
+    return VersionLag(is_outdated=is_outdated, releases_behind=None, yanked=False)
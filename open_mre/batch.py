@@ -0,0 +1,436 @@
+"""Batch validation of many issues with bounded concurrency."""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from open_mre.blobs import resolve_blobs, scoped_blob_store
+from open_mre.main import (
+    add_cache_arguments,
+    add_model_arguments,
+    configure_caches,
+    configure_models,
+    write_outputs,
+)
+from open_mre.metrics import (
+    collect_metrics,
+    format_token_usage,
+    token_usage,
+    write_metrics,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.graph.state import CompiledStateGraph
+
+    from open_mre.scheduler import Priority
+
+DEFAULT_MAX_CONCURRENCY = 4
+RESULTS_FILENAME = "results.jsonl"
+
+
+@dataclass(frozen=True)
+class BatchIssue:
+    """An issue queued for batch validation."""
+
+    issue_id: str
+    content: str
+    source: str
+
+
+def parse_batch_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line arguments for batch mode.
+
+    Args:
+        argv: Command-line arguments following `batch`.
+
+    Returns:
+        Parsed arguments namespace.
+    """
+    parser = argparse.ArgumentParser(
+        prog="open-mre batch",
+        description="Validate many GitHub issues concurrently.",
+    )
+
+    parser.add_argument(
+        "source",
+        type=Path,
+        help=(
+            "Directory of issue markdown files, or a JSONL file with one issue per line"
+        ),
+    )
+
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        type=Path,
+        default=Path(),
+        help="Directory for per-issue outputs and the aggregated results file",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help=(
+            "Maximum number of issues validated at once "
+            f"(default: {DEFAULT_MAX_CONCURRENCY})"
+        ),
+    )
+
+    parser.add_argument(
+        "--no-execute",
+        action="store_true",
+        help="Skip code execution (analysis only)",
+    )
+
+    parser.add_argument(
+        "--auto-approve-keys",
+        action="store_true",
+        help=(
+            "Automatically approve API key usage; otherwise execution is skipped for "
+            "issues that need API keys"
+        ),
+    )
+
+    add_model_arguments(parser)
+    add_cache_arguments(parser)
+
+    args = parser.parse_args(argv)
+    if args.max_concurrency < 1:
+        parser.error("--max-concurrency must be at least 1")
+    return args
+
+
+def _safe_issue_id(value: str) -> str:
+    """Make an issue identifier safe to use as a directory name."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "-", value).strip("-.") or "issue"
+
+
+def load_issues(source: Path) -> list[BatchIssue]:
+    """Load issues from a directory of markdown files or a JSONL file.
+
+    Directory sources use every `*.md` file (sorted by name), identified by file
+    stem. JSONL sources use one JSON object per line with the issue markdown under
+    `content` or `body` (with an optional `title`), identified by `id` or `number`
+    if present and by line number otherwise.
+
+    Args:
+        source: Path to a directory or a `.jsonl` file.
+
+    Returns:
+        The issues to validate, in source order.
+
+    Raises:
+        TypeError: If a JSONL line is not an object.
+        ValueError: If a JSONL line has no issue content, or issue identifiers are
+            not unique.
+    """
+    issues: list[BatchIssue] = []
+
+    if source.is_dir():
+        issues.extend(
+            BatchIssue(
+                issue_id=_safe_issue_id(path.stem),
+                content=path.read_text(),
+                source=str(path),
+            )
+            for path in sorted(source.glob("*.md"))
+        )
+    else:
+        for line_number, raw_line in enumerate(
+            source.read_text().splitlines(), start=1
+        ):
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                msg = f"{source}:{line_number}: expected a JSON object"
+                raise TypeError(msg)
+
+            content = record.get("content") or record.get("body")
+            if not content:
+                msg = f"{source}:{line_number}: missing 'content' or 'body'"
+                raise ValueError(msg)
+            if record.get("title"):
+                content = f"# {record['title']}\n\n{content}"
+
+            issue_id = record.get("id") or record.get("number") or line_number
+            issues.append(
+                BatchIssue(
+                    issue_id=_safe_issue_id(str(issue_id)),
+                    content=content,
+                    source=f"{source}:{line_number}",
+                )
+            )
+
+    seen: set[str] = set()
+    for issue in issues:
+        if issue.issue_id in seen:
+            msg = f"Duplicate issue id in batch: {issue.issue_id}"
+            raise ValueError(msg)
+        seen.add(issue.issue_id)
+
+    return issues
+
+
+async def arun_validation(
+    coordinator: "CompiledStateGraph[Any, Any]",
+    issue: BatchIssue,
+    *,
+    auto_approve_keys: bool = False,
+    thread_id: str | None = None,
+) -> dict[str, Any]:
+    """Run the validation workflow for one issue without user interaction.
+
+    Batch runs cannot prompt for API keys, so API key approval requests are either
+    auto-approved (with no keys) or declined, which skips execution.
+
+    Args:
+        coordinator: Compiled coordinator graph with a checkpointer.
+        issue: The issue to validate.
+        auto_approve_keys: If `True`, approve API key usage instead of declining.
+        thread_id: Checkpointer thread to run on. A new one is used if not provided.
+
+    Returns:
+        Final state dictionary from the coordinator graph, with blob refs resolved.
+    """
+    from langgraph.types import Command
+
+    from open_mre.coordinator import create_default_state
+
+    config: RunnableConfig = {
+        "configurable": {"thread_id": thread_id or str(uuid.uuid4())},
+        "metadata": {"issue_file": issue.source, "batch_issue_id": issue.issue_id},
+    }
+
+    result = await coordinator.ainvoke(
+        create_default_state(issue_content=issue.content), config
+    )
+
+    # Handle HITL interrupts
+    while True:
+        state = await coordinator.aget_state(config)
+        interrupts = [
+            interrupt for task in state.tasks for interrupt in task.interrupts
+        ]
+        if not interrupts:
+            break
+
+        interrupt_data = interrupts[0].value
+        if interrupt_data.get("type") != "api_key_approval":
+            break
+
+        if auto_approve_keys:
+            approval = {"approved": True, "env_vars": {}}
+        else:
+            approval = {"approved": False, "reason": "Batch mode is non-interactive"}
+
+        result = await coordinator.ainvoke(Command(resume=approval), config)
+
+    return resolve_blobs(result)
+
+
+def _status(result: dict[str, Any]) -> str:
+    """Summarize a final state the same way the single-issue CLI does."""
+    if result.get("execution_error"):
+        return "failed"
+    if result.get("execution_output"):
+        return "complete"
+    if result.get("termination_reason"):
+        return "incomplete"
+    return "analyzed"
+
+
+async def run_batch(
+    issues: list[BatchIssue],
+    output_dir: Path,
+    *,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    auto_approve_keys: bool = False,
+    coordinator: "CompiledStateGraph[Any, Any] | None" = None,
+    priority: "Priority" = "backlog",
+) -> list[dict[str, Any]]:
+    """Validate issues concurrently and write per-issue and aggregated outputs.
+
+    Each issue's outputs go to `output_dir/<issue_id>/`. One record per issue is
+    appended to `output_dir/results.jsonl` as soon as the issue finishes, so partial
+    results survive an interrupted run. Metrics (see `open_mre.metrics`) are written
+    per issue and for the whole batch.
+
+    Args:
+        issues: The issues to validate.
+        output_dir: Directory for outputs.
+        max_concurrency: Maximum number of issues validated at once.
+        auto_approve_keys: If `True`, approve API key usage instead of declining.
+        coordinator: Coordinator graph to use. The process-wide coordinator from
+            `get_coordinator` is used if not provided.
+        priority: Priority of the batch's model calls (see
+            `open_mre.scheduler.llm_priority`). By default, interactive runs in the
+            same process are served first.
+
+    Returns:
+        The results records, in completion order.
+    """
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from open_mre.coordinator import get_coordinator
+    from open_mre.scheduler import llm_priority
+    from open_mre.tools.pypi_checker import aclose_pypi_clients
+
+    if coordinator is None:
+        coordinator = get_coordinator()
+
+    output_dir.mkdir(parents=True, exist_ok=True)  # noqa: ASYNC240
+    results_path = output_dir / RESULTS_FILENAME
+    results_path.write_text("")
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    records: list[dict[str, Any]] = []
+    # Runs that are not persisted (or whose threads are deleted below) need their
+    # payloads only until they finish
+    ephemeral = coordinator.checkpointer is None or isinstance(
+        coordinator.checkpointer, InMemorySaver
+    )
+
+    async def validate(issue: BatchIssue) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            issue_dir = output_dir / issue.issue_id
+            record: dict[str, Any] = {
+                "issue_id": issue.issue_id,
+                "source": issue.source,
+                "output_dir": str(issue_dir),
+            }
+            thread_id = str(uuid.uuid4())
+            scope = scoped_blob_store() if ephemeral else contextlib.nullcontext()
+            try:
+                with collect_metrics() as issue_metrics, llm_priority(priority), scope:
+                    result = await arun_validation(
+                        coordinator,
+                        issue,
+                        auto_approve_keys=auto_approve_keys,
+                        thread_id=thread_id,
+                    )
+            except Exception as e:
+                record.update(status="error", error=str(e))
+            else:
+                write_outputs(result, issue_dir, quiet=True)
+                write_metrics(issue_metrics, issue_dir)
+                record.update(
+                    status=_status(result),
+                    termination_reason=result.get("termination_reason"),
+                    execution_error=result.get("execution_error"),
+                    draft_comment_count=len(result.get("draft_comments", [])),
+                    tokens=token_usage(issue_metrics),
+                )
+            finally:
+                # Keep the shared in-memory checkpointer from growing with the batch
+                if isinstance(coordinator.checkpointer, InMemorySaver):
+                    await coordinator.checkpointer.adelete_thread(thread_id)
+            record["duration_seconds"] = round(time.perf_counter() - started, 3)
+
+        records.append(record)
+        with results_path.open("a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(
+            f"[{len(records)}/{len(issues)}] {issue.issue_id}: {record['status']} "
+            f"({record['duration_seconds']:.1f}s)"
+        )
+
+    try:
+        # Each issue's task inherits this scope, so it aggregates the whole batch
+        with collect_metrics() as batch_metrics:
+            await asyncio.gather(*(validate(issue) for issue in issues))
+    finally:
+        # Close PyPI connections while their event loop is still running
+        await aclose_pypi_clients()
+    write_metrics(batch_metrics, output_dir)
+    print(format_token_usage(token_usage(batch_metrics)))
+    return records
+
+
+def batch_main(argv: list[str] | None = None) -> int:
+    """Entry point for `open-mre batch`.
+
+    Args:
+        argv: Command-line arguments following `batch`.
+
+    Returns:
+        Exit code (`0`: every issue was processed, non-zero: failure).
+    """
+    args = parse_batch_args(argv=argv)
+
+    source: Path = args.source
+    if not source.exists():
+        print(f"Error: Batch source not found: {source}", file=sys.stderr)
+        return 1
+
+    if not args.no_execute and not os.environ.get("DAYTONA_API_KEY"):
+        print(
+            "Error: DAYTONA_API_KEY environment variable is required for code "
+            "execution.\nUse --no-execute to skip execution, or set the "
+            "DAYTONA_API_KEY environment variable.",
+            file=sys.stderr,
+        )
+        return 1
+
+    try:
+        issues = load_issues(source)
+    except (TypeError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if not issues:
+        print(f"Error: No issues found in: {source}", file=sys.stderr)
+        return 1
+
+    try:
+        configure_models(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: Invalid --models file: {e}", file=sys.stderr)
+        return 1
+    try:
+        configure_caches(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"Validating {len(issues)} issue(s) from {source} "
+        f"with up to {args.max_concurrency} at once..."
+    )
+
+    try:
+        records = asyncio.run(
+            run_batch(
+                issues,
+                args.output_dir,
+                max_concurrency=args.max_concurrency,
+                auto_approve_keys=args.auto_approve_keys,
+            )
+        )
+    except KeyboardInterrupt:
+        print("Batch interrupted by user.")
+        return 130
+
+    counts: dict[str, int] = {}
+    for record in records:
+        counts[record["status"]] = counts.get(record["status"], 0) + 1
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"\nBATCH COMPLETE: {summary}")
+    print(f"Results written to: {args.output_dir / RESULTS_FILENAME}")
+
+    return 1 if counts.get("error") else 0
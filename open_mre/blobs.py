@@ -0,0 +1,361 @@
+"""Content-addressed storage for large text fields in graph state.
+
+Issue bodies, execution output, hydrated code, and reports can be hundreds of KB.
+Rather than carrying them in graph state, where the checkpointer serializes them
+again at every step and every subgraph input copies them, state holds a short blob
+ref (`blob:sha256:<digest>`) and each distinct payload is stored once.
+
+`store_blob` and `load_blob` pass through `None` and plain strings unchanged (values
+that are already refs, and values that were never stored, respectively), so agents
+can also be invoked directly with raw text.
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any, TypeGuard, overload
+
+from typing_extensions import override
+
+BLOB_REF_PREFIX = "blob:sha256:"
+
+# Environment variable selecting a directory for the default (file-backed) store
+BLOB_DIR_ENV = "OPEN_MRE_BLOB_DIR"
+
+
+def blob_ref(content: str) -> str:
+    """Compute the ref of a payload.
+
+    Args:
+        content: The payload.
+
+    Returns:
+        The content-addressed ref.
+    """
+    return BLOB_REF_PREFIX + hashlib.sha256(content.encode()).hexdigest()
+
+
+def is_blob_ref(value: object) -> TypeGuard[str]:
+    """Check whether a value is a blob ref.
+
+    Args:
+        value: The value to check.
+
+    Returns:
+        `True` if `value` is a blob ref.
+    """
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+
+class BlobStore(ABC):
+    """Store of text payloads keyed by their content hash."""
+
+    @abstractmethod
+    def put(self, content: str) -> str:
+        """Store a payload (a no-op if it is already stored).
+
+        Args:
+            content: The payload.
+
+        Returns:
+            The payload's ref.
+        """
+
+    @abstractmethod
+    def get(self, ref: str) -> str:
+        """Load a payload.
+
+        Args:
+            ref: The payload's ref.
+
+        Returns:
+            The payload.
+
+        Raises:
+            KeyError: If no payload is stored under `ref`.
+        """
+
+    @abstractmethod
+    def refs(self) -> Iterator[str]:
+        """Iterate over the refs of all stored payloads."""
+
+    @abstractmethod
+    def delete(self, ref: str) -> None:
+        """Delete a payload, if stored.
+
+        Args:
+            ref: The payload's ref.
+        """
+
+
+class InMemoryBlobStore(BlobStore):
+    """Blob store for a single process."""
+
+    def __init__(self) -> None:
+        """Initialize an empty store."""
+        self._blobs: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @override
+    def put(self, content: str) -> str:
+        ref = blob_ref(content)
+        with self._lock:
+            self._blobs.setdefault(ref, content)
+        return ref
+
+    @override
+    def get(self, ref: str) -> str:
+        with self._lock:
+            return self._blobs[ref]
+
+    @override
+    def refs(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._blobs))
+
+    @override
+    def delete(self, ref: str) -> None:
+        with self._lock:
+            self._blobs.pop(ref, None)
+
+
+class FileBlobStore(BlobStore):
+    """Blob store backed by a directory, shareable across processes.
+
+    Payloads are written atomically to `<root>/<digest[:2]>/<digest>`.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the payloads (created if needed).
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, ref: str) -> Path:
+        if not is_blob_ref(ref):
+            msg = f"Not a blob ref: {ref!r}"
+            raise KeyError(msg)
+        digest = ref.removeprefix(BLOB_REF_PREFIX)
+        return self.root / digest[:2] / digest
+
+    @override
+    def put(self, content: str) -> str:
+        ref = blob_ref(content)
+        path = self._path(ref)
+        if path.exists():
+            # Refresh the modification time, which garbage collection checks
+            path.touch()
+            return ref
+
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            Path(tmp_path).replace(path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return ref
+
+    @override
+    def get(self, ref: str) -> str:
+        try:
+            return self._path(ref).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise KeyError(ref) from None
+
+    @override
+    def refs(self) -> Iterator[str]:
+        for path in self.root.glob("??/*"):
+            if not path.name.startswith(".tmp-"):
+                yield BLOB_REF_PREFIX + path.name
+
+    @override
+    def delete(self, ref: str) -> None:
+        self._path(ref).unlink(missing_ok=True)
+
+    def modified_at(self, ref: str) -> float:
+        """Get when a payload was last stored.
+
+        Args:
+            ref: The payload's ref.
+
+        Returns:
+            The payload's modification time, as a POSIX timestamp.
+        """
+        return self._path(ref).stat().st_mtime
+
+
+_store_lock = threading.Lock()
+_store: BlobStore | None = None
+
+_scoped_store: contextvars.ContextVar[BlobStore | None] = contextvars.ContextVar(
+    "open_mre_blob_store", default=None
+)
+
+
+def get_blob_store() -> BlobStore:
+    """Get the blob store of the current run, or else the process-wide one.
+
+    The process-wide store defaults to a `FileBlobStore` in the directory named by
+    `OPEN_MRE_BLOB_DIR`, if set, and to an `InMemoryBlobStore` otherwise.
+
+    Returns:
+        The blob store.
+    """
+    global _store  # noqa: PLW0603
+    if (scoped := _scoped_store.get()) is not None:
+        return scoped
+    with _store_lock:
+        if _store is None:
+            blob_dir = os.environ.get(BLOB_DIR_ENV)
+            _store = FileBlobStore(blob_dir) if blob_dir else InMemoryBlobStore()
+        return _store
+
+
+def set_blob_store(store: BlobStore | None) -> None:
+    """Set the process-wide blob store.
+
+    Runs persisted with a durable checkpointer need a store that outlives the
+    process, such as a `FileBlobStore`.
+
+    Args:
+        store: The blob store, or `None` to restore the default on next use.
+    """
+    global _store  # noqa: PLW0603
+    with _store_lock:
+        _store = store
+
+
+@contextlib.contextmanager
+def scoped_blob_store() -> Iterator[None]:
+    """Keep the payloads stored while the context is active for that long only.
+
+    For runs whose threads are discarded when they finish: if the process-wide
+    store is in memory, the run gets a store of its own, dropped with it, so that
+    the process-wide one does not grow with every run. A durable process-wide store
+    is used as is, and cleaned up by `collect_garbage`.
+
+    Scoping follows `contextvars`, like `open_mre.metrics.collect_metrics`.
+
+    Yields:
+        Nothing.
+    """
+    if not isinstance(get_blob_store(), InMemoryBlobStore):
+        yield
+        return
+    token = _scoped_store.set(InMemoryBlobStore())
+    try:
+        yield
+    finally:
+        _scoped_store.reset(token)
+
+
+@overload
+def store_blob(value: str) -> str: ...
+@overload
+def store_blob(value: None) -> None: ...
+def store_blob(value: str | None) -> str | None:
+    """Store a payload in the process-wide blob store.
+
+    Args:
+        value: The payload. `None` and existing refs are returned unchanged.
+
+    Returns:
+        The payload's ref.
+    """
+    if value is None or is_blob_ref(value):
+        return value
+    return get_blob_store().put(value)
+
+
+@overload
+def load_blob(value: str) -> str: ...
+@overload
+def load_blob(value: None) -> None: ...
+def load_blob(value: str | None) -> str | None:
+    """Resolve a ref from the process-wide blob store.
+
+    Args:
+        value: A ref. `None` and plain strings are returned unchanged.
+
+    Returns:
+        The payload.
+    """
+    if value is None or not is_blob_ref(value):
+        return value
+    return get_blob_store().get(value)
+
+
+def resolve_blobs(state: Mapping[str, Any]) -> dict[str, Any]:
+    """Resolve every top-level ref in a state dictionary.
+
+    Args:
+        state: Graph state (or a state update).
+
+    Returns:
+        A copy of `state` with refs replaced by their payloads.
+    """
+    return {
+        key: load_blob(value) if is_blob_ref(value) else value
+        for key, value in state.items()
+    }
+
+
+def iter_blob_refs(value: object) -> Iterator[str]:
+    """Find the refs nested anywhere in a value.
+
+    Args:
+        value: A value from graph state, e.g. checkpoint channel values.
+
+    Yields:
+        Every ref found.
+    """
+    if is_blob_ref(value):
+        yield value
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from iter_blob_refs(item)
+    elif isinstance(value, list | tuple | set | frozenset):
+        for item in value:
+            yield from iter_blob_refs(item)
+
+
+def collect_garbage(
+    store: FileBlobStore, live_refs: set[str], *, grace_seconds: float = 3600
+) -> list[str]:
+    """Delete payloads that no live state refers to.
+
+    Args:
+        store: The blob store to clean up.
+        live_refs: Refs still referenced (e.g. by retained checkpoints).
+        grace_seconds: Payloads stored more recently than this are kept, since an
+            in-flight run may not have checkpointed its refs yet.
+
+    Returns:
+        Refs of the deleted payloads.
+    """
+    cutoff = time.time() - grace_seconds
+    deleted: list[str] = []
+    for ref in store.refs():
+        if ref in live_refs:
+            continue
+        try:
+            if store.modified_at(ref) >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        store.delete(ref)
+        deleted.append(ref)
+    return deleted
@@ -0,0 +1,176 @@
+"""Callback handler that records graph node and LLM call metrics."""
+
+import time
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langgraph.errors import GraphBubbleUp
+from typing_extensions import override
+
+from open_mre.llm_cache import CACHE_HIT_METADATA_KEY
+from open_mre.metrics import (
+    LLM_CALL_DURATION,
+    LLM_EARLY_STOPS,
+    LLM_TOKENS,
+    NODE_DURATION,
+    increment,
+    observe,
+)
+
+
+def _node_path(metadata: dict[str, Any]) -> str:
+    """Name a node by its path through the (sub)graphs, e.g. `executor/hydrate_code`.
+
+    Args:
+        metadata: Run metadata set by LangGraph.
+
+    Returns:
+        The node path.
+    """
+    checkpoint_ns = metadata.get("langgraph_checkpoint_ns", "")
+    if not checkpoint_ns:
+        return str(metadata.get("langgraph_node", ""))
+    # Namespaces look like `executor:<task id>|hydrate_code:<task id>`
+    return "/".join(part.split(":", 1)[0] for part in checkpoint_ns.split("|"))
+
+
+def _token_counts(usage: dict[str, Any]) -> dict[str, int]:
+    """Split usage metadata into input, output, and prompt cache token counts.
+
+    Args:
+        usage: The message's `usage_metadata`.
+
+    Returns:
+        Token counts by type. `input` includes the `cache_read` (cache hit) and
+        `cache_creation` (cache write) tokens.
+    """
+    details = usage.get("input_token_details") or {}
+    # Anthropic reports cache writes by TTL when it knows them
+    cache_creation = (details.get("cache_creation") or 0) + sum(
+        details.get(key) or 0
+        for key in ("ephemeral_5m_input_tokens", "ephemeral_1h_input_tokens")
+    )
+    return {
+        "input": usage.get("input_tokens") or 0,
+        "output": usage.get("output_tokens") or 0,
+        "cache_read": details.get("cache_read") or 0,
+        "cache_creation": cache_creation,
+    }
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records the duration of every graph node, and LLM latency and token usage.
+
+    Attach it to a graph's config so it is inherited by subgraphs and model calls.
+    """
+
+    # Called on the calling thread, so recording does not wait on an executor
+    run_inline = True
+
+    def __init__(self) -> None:
+        """Initialize the handler."""
+        self._nodes: dict[UUID, tuple[str, float]] = {}
+        self._llm_calls: dict[UUID, tuple[str, str, float]] = {}
+
+    @override
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any] | None,
+        inputs: dict[str, Any],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        # Runs nested inside a node inherit its metadata; the node's own run is the
+        # outermost one named after it
+        node = metadata.get("langgraph_node")
+        if (
+            node is not None
+            and kwargs.get("name") == node
+            and parent_run_id not in self._nodes
+        ):
+            self._nodes[run_id] = (_node_path(metadata), time.perf_counter())
+
+    @override
+    def on_chain_end(
+        self, outputs: dict[str, Any], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._finish_node(run_id, "ok")
+
+    @override
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        # Interrupts (human-in-the-loop pauses) are raised through the graph too
+        status = "interrupted" if isinstance(error, GraphBubbleUp) else "error"
+        self._finish_node(run_id, status)
+
+    def _finish_node(self, run_id: UUID, status: str) -> None:
+        started = self._nodes.pop(run_id, None)
+        if started is not None:
+            node, start = started
+            observe(
+                NODE_DURATION, time.perf_counter() - start, node=node, status=status
+            )
+
+    @override
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or serialized.get("name") or "unknown"
+        self._llm_calls[run_id] = (model, _node_path(metadata), time.perf_counter())
+
+    @override
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish_llm_call(run_id, response)
+
+    def _finish_llm_call(self, run_id: UUID, response: LLMResult) -> None:
+        started = self._llm_calls.pop(run_id, None)
+        if started is None:
+            return
+        model, node, start = started
+        observe(LLM_CALL_DURATION, time.perf_counter() - start, model=model, node=node)
+        for generations in response.generations:
+            for generation in generations:
+                if not isinstance(generation, ChatGeneration):
+                    continue
+                # Responses served from the cache used no tokens this time
+                if generation.message.response_metadata.get(CACHE_HIT_METADATA_KEY):
+                    continue
+                usage = getattr(generation.message, "usage_metadata", None) or {}
+                for token_type, tokens in _token_counts(usage).items():
+                    if tokens:
+                        increment(
+                            LLM_TOKENS, tokens, model=model, node=node, type=token_type
+                        )
+
+    @override
+    def on_llm_error(
+        self,
+        error: BaseException,
+        *,
+        run_id: UUID,
+        response: LLMResult | None = None,
+        **kwargs: Any,
+    ) -> None:
+        # Streams closed early (see `open_mre.line_protocol.StopEarly`) end with
+        # `GeneratorExit`, and report the response streamed until then
+        if isinstance(error, GeneratorExit) and run_id in self._llm_calls:
+            model, node, _ = self._llm_calls[run_id]
+            increment(LLM_EARLY_STOPS, model=model, node=node)
+            self._finish_llm_call(run_id, response or LLMResult(generations=[]))
+            return
+        self._llm_calls.pop(run_id, None)
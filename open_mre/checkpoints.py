@@ -0,0 +1,203 @@
+"""Durable checkpoint storage and retention.
+
+A SQLite checkpointer lets a run survive a crash or Ctrl-C (e.g. during the API key
+approval wait) and be resumed by thread ID. Old threads are pruned and, when any
+were, the remaining ones compacted so the database stays small over long-running
+operation, and blob payloads (see `open_mre.blobs`) that no retained checkpoint
+refers to are deleted.
+"""
+
+import logging
+import sqlite3
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from open_mre.blobs import FileBlobStore, collect_garbage, iter_blob_refs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION = timedelta(days=30)
+
+
+def open_sqlite_checkpointer(path: str | Path) -> SqliteSaver:
+    """Open (creating if needed) a SQLite checkpoint database.
+
+    The connection is shared across threads, which `SqliteSaver` serializes with
+    its own lock.
+
+    Args:
+        path: Path to the database file.
+
+    Returns:
+        A `SqliteSaver` backed by the database.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    checkpointer = SqliteSaver(conn)
+    checkpointer.setup()
+    return checkpointer
+
+
+def latest_checkpoint_times(
+    checkpointer: BaseCheckpointSaver[Any],
+) -> dict[str, datetime]:
+    """Get the time of the latest checkpoint of every thread.
+
+    For a SQLite checkpointer, only each thread's latest checkpoint is read and
+    deserialized; other checkpointers list them all.
+
+    Args:
+        checkpointer: The checkpointer to inspect.
+
+    Returns:
+        Mapping of thread ID to the timestamp of its latest checkpoint.
+    """
+    latest: dict[str, datetime] = {}
+    if isinstance(checkpointer, SqliteSaver):
+        checkpointer.setup()
+        with checkpointer.lock:
+            # SQLite takes the bare columns from the row with the maximum
+            # checkpoint ID, which increases with time
+            rows = checkpointer.conn.execute(
+                """
+                SELECT thread_id, type, checkpoint, MAX(checkpoint_id)
+                FROM checkpoints
+                WHERE checkpoint_ns = ''
+                GROUP BY thread_id
+                """
+            ).fetchall()
+        for thread_id, type_, checkpoint, _ in rows:
+            ts = checkpointer.serde.loads_typed((type_, checkpoint))["ts"]
+            latest[thread_id] = datetime.fromisoformat(ts)
+        return latest
+
+    for checkpoint_tuple in checkpointer.list(None):
+        thread_id = checkpoint_tuple.config["configurable"]["thread_id"]
+        ts = datetime.fromisoformat(checkpoint_tuple.checkpoint["ts"])
+        if thread_id not in latest or ts > latest[thread_id]:
+            latest[thread_id] = ts
+    return latest
+
+
+def prune_threads(
+    checkpointer: BaseCheckpointSaver[Any],
+    *,
+    max_age: timedelta = DEFAULT_RETENTION,
+    now: datetime | None = None,
+) -> list[str]:
+    """Delete threads with no checkpoint newer than `max_age`.
+
+    Args:
+        checkpointer: The checkpointer to prune.
+        max_age: How long a thread is kept after its latest checkpoint.
+        now: Reference time. Defaults to the current time.
+
+    Returns:
+        IDs of the deleted threads.
+    """
+    cutoff = (now or datetime.now(UTC)) - max_age
+    expired = [
+        thread_id
+        for thread_id, ts in latest_checkpoint_times(checkpointer).items()
+        if ts < cutoff
+    ]
+    for thread_id in expired:
+        checkpointer.delete_thread(thread_id)
+    return expired
+
+
+def compact_checkpoints(checkpointer: SqliteSaver) -> None:
+    """Keep only the latest checkpoint of each thread and reclaim disk space.
+
+    Pending writes of the kept checkpoints are preserved, so interrupted threads can
+    still be resumed; only checkpoint history is dropped.
+
+    Args:
+        checkpointer: The SQLite checkpointer to compact.
+    """
+    checkpointer.setup()
+    with checkpointer.lock:
+        conn = checkpointer.conn
+        conn.execute(
+            """
+            DELETE FROM checkpoints
+            WHERE (thread_id, checkpoint_ns, checkpoint_id) NOT IN (
+                SELECT thread_id, checkpoint_ns, MAX(checkpoint_id)
+                FROM checkpoints
+                GROUP BY thread_id, checkpoint_ns
+            )
+            """
+        )
+        conn.execute(
+            """
+            DELETE FROM writes
+            WHERE (thread_id, checkpoint_ns, checkpoint_id) NOT IN (
+                SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints
+            )
+            """
+        )
+        conn.commit()
+        # VACUUM can't run inside a transaction, hence the commit above
+        conn.execute("VACUUM")
+
+
+def live_blob_refs(checkpointer: BaseCheckpointSaver[Any]) -> set[str]:
+    """Find the blob refs that retained checkpoints still point to.
+
+    Every retained checkpoint is deserialized, so `apply_retention` calls this only
+    after pruning and compaction.
+
+    Args:
+        checkpointer: The checkpointer to inspect.
+
+    Returns:
+        Refs found in checkpointed state and pending writes.
+    """
+    refs: set[str] = set()
+    for checkpoint_tuple in checkpointer.list(None):
+        refs.update(iter_blob_refs(checkpoint_tuple.checkpoint["channel_values"]))
+        for _, _, value in checkpoint_tuple.pending_writes or []:
+            refs.update(iter_blob_refs(value))
+    return refs
+
+
+def apply_retention(
+    checkpointer: BaseCheckpointSaver[Any],
+    *,
+    max_age: timedelta = DEFAULT_RETENTION,
+    blob_store: FileBlobStore | None = None,
+    now: datetime | None = None,
+) -> list[str]:
+    """Prune expired threads, then compact the rest if the storage supports it.
+
+    Compaction (which rewrites the whole SQLite file) and blob garbage collection
+    only run when a thread was pruned. Maintenance is skipped, with a warning, while
+    another process has the database locked; it is retried on the next call.
+
+    Args:
+        checkpointer: The checkpointer to maintain.
+        max_age: How long a thread is kept after its latest checkpoint.
+        blob_store: Blob store holding the payloads of the checkpointed threads.
+            Payloads no retained checkpoint refers to are deleted.
+        now: Reference time. Defaults to the current time.
+
+    Returns:
+        IDs of the deleted threads.
+    """
+    expired: list[str] = []
+    try:
+        expired = prune_threads(checkpointer, max_age=max_age, now=now)
+        if not expired:
+            return expired
+        if isinstance(checkpointer, SqliteSaver):
+            compact_checkpoints(checkpointer)
+        if blob_store is not None:
+            collect_garbage(blob_store, live_blob_refs(checkpointer))
+    except sqlite3.OperationalError as e:
+        logger.warning("Skipping checkpoint retention: %s", e)
+    return expired
@@ -4,31 +4,68 @@ This is the parent graph that orchestrates all agent subgraphs
 to validate Minimal Reproducible Examples from GitHub issues.
 """
 
+import functools
+import threading
+from pathlib import Path
 from typing import Any, Literal
 
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
 from open_mre.agents.behavior_analyst import create_behavior_analyst_agent
 from open_mre.agents.code_extractor import create_code_extractor_agent
-from open_mre.agents.executor import create_executor_agent
+from open_mre.agents.executor import create_executor_agent, packages_to_install
 from open_mre.agents.report_generator import create_report_generator_agent
 from open_mre.agents.version_validator import create_version_validator_agent
+from open_mre.blobs import is_blob_ref, load_blob, store_blob
+from open_mre.callbacks import MetricsCallbackHandler
+from open_mre.checkpoints import open_sqlite_checkpointer
 from open_mre.nodes.api_key_check import api_key_check_node
-from open_mre.state import MREValidationState
+from open_mre.state import MREValidationState, StageOutcome
+from open_mre.tools import (
+    adiscard_sandbox,
+    aprovision_sandbox,
+    discard_sandbox,
+    provision_sandbox,
+    sandbox_available,
+)
+
+
+def _append_version_notes(comment: str, version_notes: list[str]) -> str:
+    """Append version-related notes to a draft comment.
+
+    Args:
+        comment: The draft comment.
+        version_notes: Notes from version validation.
+
+    Returns:
+        The draft comment, followed by the version notes (if any).
+    """
+    if not version_notes:
+        return comment
+    return "\n".join(
+        [comment, "", "Additionally:", *(f"- {note}" for note in version_notes)]
+    )
 
 
 def create_coordinator(
-    checkpointer: InMemorySaver | None = None,
+    checkpointer: BaseCheckpointSaver[Any] | str | Path | None = None,
     *,
     use_default_checkpointer: bool = True,
+    resolve_outputs: bool = False,
 ) -> CompiledStateGraph[Any, Any]:
     """Create coordinator graph to orchestrate MRE validation.
 
     Args:
         checkpointer: Checkpointer for persistence and HITL.
 
+            A `str` or `Path` is treated as a SQLite database file (created if
+            needed), so runs survive process restarts and can be resumed by thread
+            ID.
+
             If `None` and `use_default_checkpointer` is `True`, an `InMemorySaver`
             will be created.
 
@@ -41,6 +78,12 @@ def create_coordinator(
             Set to `False` when deploying to LangGraph server, which handles
             persistence automatically.
 
+        resolve_outputs: Whether to replace the blob refs in the final state with
+            their payloads, in a last `resolve_outputs` step.
+
+            Set to `True` when deploying to LangGraph server, whose clients read
+            the final state directly rather than through `resolve_blobs`.
+
     Returns:
         A compiled `StateGraph` that coordinates all agents.
     """
@@ -58,10 +101,12 @@ def create_coordinator(
 
         Reads issue content and outputs attempted Python version and package detection.
 
+        Runs in parallel with `code_extractor`.
+
         Args:
             state: Current state.
 
-                Should start as empty, since this is the first node.
+                Should start as empty, since this is one of the first nodes.
 
         Returns:
             State updates from version validation.
@@ -69,58 +114,110 @@ def create_coordinator(
         result = version_validator.invoke(
             input={"issue_content": state["issue_content"]}
         )
+        return _version_validator_update(result)
+
+    async def aversion_validator_node(state: MREValidationState) -> dict[str, Any]:
+        """Async version of `version_validator_node`."""
+        result = await version_validator.ainvoke(
+            input={"issue_content": state["issue_content"]}
+        )
+        return _version_validator_update(result)
 
-        # Build state update
-        update: dict[str, Any] = {
+    def _version_validator_update(result: dict[str, Any]) -> dict[str, Any]:
+        # Draft comment and termination are deferred to `review_enrichment`, since
+        # this node runs in parallel with `code_extractor`
+        return {
             "python_version": result.get("python_version"),
             "packages": result.get("packages", []),
             "version_notes": result.get("version_notes", []),
+            "enrichment_outcomes": {
+                "version_validator": StageOutcome(
+                    draft_comment=result.get("draft_comment"),
+                    should_terminate=bool(result.get("should_terminate")),
+                )
+            },
         }
 
-        # Handle draft comment
-        draft_comment = result.get("draft_comment")
-        if draft_comment:
-            update["draft_comments"] = [draft_comment]
-
-        # Handle termination
-        if result.get("should_terminate"):
-            update["should_terminate"] = True
-            update["termination_reason"] = "Outdated package versions detected"
-
-        return update
-
     def code_extractor_node(state: MREValidationState) -> dict[str, Any]:
         """Invoke the code extractor agent.
 
         Attempts to extract code snippets from the issue content.
 
+        Runs in parallel with `version_validator`, so version notes are not yet
+        available; `review_enrichment` appends them to the draft comment instead.
+
         Args:
             state: Current state.
 
         Returns:
             State updates from code extraction.
         """
-        result = code_extractor.invoke(
-            input={
-                "issue_content": state["issue_content"],
-                "version_notes": state.get("version_notes", []),
-            }
+        result = code_extractor.invoke(input={"issue_content": state["issue_content"]})
+        return _code_extractor_update(result)
+
+    async def acode_extractor_node(state: MREValidationState) -> dict[str, Any]:
+        """Async version of `code_extractor_node`."""
+        result = await code_extractor.ainvoke(
+            input={"issue_content": state["issue_content"]}
         )
+        return _code_extractor_update(result)
 
-        update = {
+    def _code_extractor_update(result: dict[str, Any]) -> dict[str, Any]:
+        return {
             "code_snippets": result.get("code_snippets", []),
             "extraction_notes": result.get("extraction_notes", []),
+            "enrichment_outcomes": {
+                "code_extractor": StageOutcome(
+                    draft_comment=result.get("draft_comment"),
+                    should_terminate=bool(result.get("should_terminate")),
+                )
+            },
         }
 
-        draft_comment = result.get("draft_comment")
-        if draft_comment:
-            update["draft_comments"] = [draft_comment]
+    def review_enrichment(state: MREValidationState) -> dict[str, Any]:
+        """Join the parallel version validation and code extraction stages.
 
-        if result.get("should_terminate"):
-            update["should_terminate"] = True
-            update["termination_reason"] = "No code snippets found"
+        Outdated package versions take precedence over a missing MRE, matching the
+        order in which the stages used to run sequentially.
 
-        return update
+        Args:
+            state: Current state.
+
+                Contains the outcomes of both enrichment stages.
+
+        Returns:
+            State updates with draft comments and termination decision.
+        """
+        outcomes = state.get("enrichment_outcomes", {})
+        version_outcome = outcomes.get("version_validator")
+        extraction_outcome = outcomes.get("code_extractor")
+
+        draft_comments: list[str] = []
+        if version_outcome and version_outcome["draft_comment"]:
+            draft_comments.append(version_outcome["draft_comment"])
+
+        if version_outcome and version_outcome["should_terminate"]:
+            return {
+                "draft_comments": draft_comments,
+                "should_terminate": True,
+                "termination_reason": "Outdated package versions detected",
+            }
+
+        if extraction_outcome and extraction_outcome["should_terminate"]:
+            if extraction_outcome["draft_comment"]:
+                draft_comments.append(
+                    _append_version_notes(
+                        extraction_outcome["draft_comment"],
+                        state.get("version_notes", []),
+                    )
+                )
+            return {
+                "draft_comments": draft_comments,
+                "should_terminate": True,
+                "termination_reason": "No code snippets found",
+            }
+
+        return {"draft_comments": draft_comments}
 
     def behavior_analyst_node(state: MREValidationState) -> dict[str, Any]:
         """Invoke the behavior analyst agent.
@@ -133,14 +230,22 @@ def create_coordinator(
         Returns:
             State updates from behavior analysis.
         """
-        result = behavior_analyst.invoke(
-            input={
-                "issue_content": state["issue_content"],
-                "code_snippets": state.get("code_snippets", []),
-                "version_notes": state.get("version_notes", []),
-            }
-        )
+        result = behavior_analyst.invoke(input=_behavior_analyst_input(state))
+        return _behavior_analyst_update(result)
+
+    async def abehavior_analyst_node(state: MREValidationState) -> dict[str, Any]:
+        """Async version of `behavior_analyst_node`."""
+        result = await behavior_analyst.ainvoke(input=_behavior_analyst_input(state))
+        return _behavior_analyst_update(result)
+
+    def _behavior_analyst_input(state: MREValidationState) -> dict[str, Any]:
+        return {
+            "issue_content": state["issue_content"],
+            "code_snippets": state.get("code_snippets", []),
+            "version_notes": state.get("version_notes", []),
+        }
 
+    def _behavior_analyst_update(result: dict[str, Any]) -> dict[str, Any]:
         update = {
             "expected_behavior": result.get("expected_behavior"),
             "actual_behavior": result.get("actual_behavior"),
@@ -159,6 +264,35 @@ def create_coordinator(
 
         return update
 
+    def provision_sandbox_node(state: MREValidationState) -> dict[str, Any]:
+        """Speculatively provision the execution sandbox.
+
+        Runs alongside `behavior_analyst` once packages are known, so that sandbox
+        creation overlaps the analysis and the package installation keeps running
+        in the background through the API key approval and code hydration.
+
+        Args:
+            state: Current state.
+
+        Returns:
+            State update with the sandbox handle, if one was provisioned.
+        """
+        if state.get("sandbox") or not sandbox_available():
+            return {}
+
+        handle = provision_sandbox(packages_to_install(state.get("packages", [])))
+        return {"sandbox": handle}
+
+    async def aprovision_sandbox_node(state: MREValidationState) -> dict[str, Any]:
+        """Async version of `provision_sandbox_node`."""
+        if state.get("sandbox") or not sandbox_available():
+            return {}
+
+        handle = await aprovision_sandbox(
+            packages_to_install(state.get("packages", []))
+        )
+        return {"sandbox": handle}
+
     def executor_node(state: MREValidationState) -> dict[str, Any]:
         """Invoke the executor agent.
 
@@ -168,20 +302,32 @@ def create_coordinator(
         Returns:
             State updates from code execution.
         """
-        result = executor.invoke(
-            input={
-                "code_snippets": state.get("code_snippets", []),
-                "packages": state.get("packages", []),
-                "approved_api_keys": state.get("approved_api_keys", {}),
-                "expected_behavior": state.get("expected_behavior"),
-                "actual_behavior": state.get("actual_behavior"),
-            }
-        )
+        result = executor.invoke(input=_executor_input(state))
+        return _executor_update(result)
 
+    async def aexecutor_node(state: MREValidationState) -> dict[str, Any]:
+        """Async version of `executor_node`."""
+        result = await executor.ainvoke(input=_executor_input(state))
+        return _executor_update(result)
+
+    def _executor_input(state: MREValidationState) -> dict[str, Any]:
+        return {
+            "issue_content": state["issue_content"],
+            "code_snippets": state.get("code_snippets", []),
+            "packages": state.get("packages", []),
+            "approved_api_keys": state.get("approved_api_keys", {}),
+            "expected_behavior": state.get("expected_behavior"),
+            "actual_behavior": state.get("actual_behavior"),
+            "sandbox": state.get("sandbox"),
+        }
+
+    def _executor_update(result: dict[str, Any]) -> dict[str, Any]:
+        # The executor always consumes (or discards) the provisioned sandbox
         return {
             "execution_output": result.get("execution_output"),
             "execution_error": result.get("execution_error"),
             "hydrated_code": result.get("hydrated_code"),
+            "sandbox": None,
         }
 
     def report_generator_node(state: MREValidationState) -> dict[str, Any]:
@@ -196,58 +342,64 @@ def create_coordinator(
             State updates containing the final validation report and reproduction
                 script, if generated.
         """
-        result = report_generator.invoke(
-            input={
-                "issue_content": state["issue_content"],
-                "python_version": state.get("python_version"),
-                "packages": state.get("packages", []),
-                "version_notes": state.get("version_notes", []),
-                "code_snippets": state.get("code_snippets", []),
-                "extraction_notes": state.get("extraction_notes", []),
-                "expected_behavior": state.get("expected_behavior"),
-                "actual_behavior": state.get("actual_behavior"),
-                "analysis_notes": state.get("analysis_notes", []),
-                "execution_output": state.get("execution_output"),
-                "execution_error": state.get("execution_error"),
-                "hydrated_code": state.get("hydrated_code"),
-                "draft_comments": state.get("draft_comments", []),
-                "termination_reason": state.get("termination_reason"),
-            }
-        )
+        # Discard a provisioned sandbox that will not be used because the run
+        # terminated before execution
+        sandbox = state.get("sandbox")
+        if sandbox:
+            discard_sandbox(sandbox)
+
+        result = report_generator.invoke(input=_report_generator_input(state))
+        return _report_generator_update(result)
 
+    async def areport_generator_node(state: MREValidationState) -> dict[str, Any]:
+        """Async version of `report_generator_node`."""
+        sandbox = state.get("sandbox")
+        if sandbox:
+            await adiscard_sandbox(sandbox)
+
+        result = await report_generator.ainvoke(input=_report_generator_input(state))
+        return _report_generator_update(result)
+
+    def _report_generator_input(state: MREValidationState) -> dict[str, Any]:
+        return {
+            "issue_content": state["issue_content"],
+            "python_version": state.get("python_version"),
+            "packages": state.get("packages", []),
+            "version_notes": state.get("version_notes", []),
+            "code_snippets": state.get("code_snippets", []),
+            "extraction_notes": state.get("extraction_notes", []),
+            "expected_behavior": state.get("expected_behavior"),
+            "actual_behavior": state.get("actual_behavior"),
+            "analysis_notes": state.get("analysis_notes", []),
+            "execution_output": state.get("execution_output"),
+            "execution_error": state.get("execution_error"),
+            "hydrated_code": state.get("hydrated_code"),
+            "draft_comments": state.get("draft_comments", []),
+            "termination_reason": state.get("termination_reason"),
+        }
+
+    def _report_generator_update(result: dict[str, Any]) -> dict[str, Any]:
         return {
             "validation_report": result.get("validation_report"),
             "reproduction_script": result.get("reproduction_script"),
+            "sandbox": None,
         }
 
     # Conditional edges
 
-    def after_version_validator(
-        state: MREValidationState,
-    ) -> Literal["code_extractor", "report_generator"]:
-        """Route after version validation.
-
-        `'code_extractor'` if continuing execution.
-
-        `'report_generator'` to terminate early if outdated package versions were
-        detected.
-        """
-        if state.get("should_terminate"):
-            return "report_generator"
-        return "code_extractor"
-
-    def after_code_extractor(
+    def after_enrichment(
         state: MREValidationState,
-    ) -> Literal["behavior_analyst", "report_generator"]:
-        """Route after code extraction.
+    ) -> list[Literal["behavior_analyst", "provision_sandbox", "report_generator"]]:
+        """Route after version validation and code extraction have both finished.
 
-        `'behavior_analyst'` if continuing execution.
+        `['behavior_analyst', 'provision_sandbox']` if continuing execution.
 
-        `'report_generator'` to terminate early if no code snippets were found.
+        `['report_generator']` to terminate early if outdated package versions were
+        detected or no code snippets were found.
         """
         if state.get("should_terminate"):
-            return "report_generator"
-        return "behavior_analyst"
+            return ["report_generator"]
+        return ["behavior_analyst", "provision_sandbox"]
 
     def after_behavior_analyst(
         state: MREValidationState,
@@ -262,43 +414,136 @@ def create_coordinator(
             return "report_generator"
         return "api_key_check"
 
+    def resolve_outputs_node(state: MREValidationState) -> dict[str, Any]:
+        """Replace blob refs in the final state with their payloads."""
+        return {
+            key: load_blob(value) for key, value in state.items() if is_blob_ref(value)
+        }
+
     builder = StateGraph(MREValidationState)
-    builder.add_node("version_validator", version_validator_node)
-    builder.add_node("code_extractor", code_extractor_node)
-    builder.add_node("behavior_analyst", behavior_analyst_node)
+    # Each wrapper has a native async variant so the graph can be driven with
+    # `ainvoke`/`astream` without blocking the event loop
+    builder.add_node(
+        "version_validator",
+        RunnableLambda(version_validator_node, afunc=aversion_validator_node),
+    )
+    builder.add_node(
+        "code_extractor",
+        RunnableLambda(code_extractor_node, afunc=acode_extractor_node),
+    )
+    builder.add_node("review_enrichment", review_enrichment)
+    builder.add_node(
+        "behavior_analyst",
+        RunnableLambda(behavior_analyst_node, afunc=abehavior_analyst_node),
+    )
+    builder.add_node(
+        "provision_sandbox",
+        RunnableLambda(provision_sandbox_node, afunc=aprovision_sandbox_node),
+    )
     builder.add_node("api_key_check", api_key_check_node)
-    builder.add_node("executor", executor_node)
-    builder.add_node("report_generator", report_generator_node)
+    builder.add_node("executor", RunnableLambda(executor_node, afunc=aexecutor_node))
+    builder.add_node(
+        "report_generator",
+        RunnableLambda(report_generator_node, afunc=areport_generator_node),
+    )
+
+    # Version validation and code extraction are independent, so fan out from START
+    # and join before deciding whether to continue
     builder.add_edge(START, "version_validator")
-    builder.add_conditional_edges("version_validator", after_version_validator)
-    builder.add_conditional_edges("code_extractor", after_code_extractor)
+    builder.add_edge(START, "code_extractor")
+    builder.add_edge(["version_validator", "code_extractor"], "review_enrichment")
+    builder.add_conditional_edges(
+        "review_enrichment",
+        after_enrichment,
+        ["behavior_analyst", "provision_sandbox", "report_generator"],
+    )
+    # provision_sandbox has no outgoing edge; its handle is picked up by the
+    # executor, or discarded by report_generator if the run terminates early
     builder.add_conditional_edges("behavior_analyst", after_behavior_analyst)
 
     # api_key_check uses Command to route to executor or report_generator
     builder.add_edge("executor", "report_generator")
-    builder.add_edge("report_generator", END)
+    if resolve_outputs:
+        builder.add_node("resolve_outputs", resolve_outputs_node)
+        builder.add_edge("report_generator", "resolve_outputs")
+        builder.add_edge("resolve_outputs", END)
+    else:
+        builder.add_edge("report_generator", END)
 
     # Compile with checkpointer for HITL support
     # For LangGraph server deployments, use_default_checkpointer=False
     # since the server handles persistence automatically
-    effective_checkpointer = checkpointer
+    effective_checkpointer: BaseCheckpointSaver[Any] | None
+    if isinstance(checkpointer, str | Path):
+        effective_checkpointer = open_sqlite_checkpointer(checkpointer)
+    else:
+        effective_checkpointer = checkpointer
     if effective_checkpointer is None and use_default_checkpointer:
         effective_checkpointer = InMemorySaver()
 
-    return builder.compile(checkpointer=effective_checkpointer)
+    # Metrics are recorded by a callback handler, which subgraphs and model calls
+    # inherit through the config
+    return builder.compile(checkpointer=effective_checkpointer).with_config(
+        callbacks=[MetricsCallbackHandler()]
+    )
+
+
+_coordinator_lock = threading.Lock()
+
+
+@functools.cache
+def _shared_coordinator() -> CompiledStateGraph[Any, Any]:
+    return create_coordinator(checkpointer=InMemorySaver())
+
+
+def get_coordinator(
+    checkpointer: BaseCheckpointSaver[Any] | str | Path | None = None,
+) -> CompiledStateGraph[Any, Any]:
+    """Get the process-wide compiled coordinator.
+
+    The agent subgraphs and their chat model clients are built once per process and
+    shared across runs and threads; concurrent runs are isolated by `thread_id`.
+
+    Args:
+        checkpointer: Checkpointer (or SQLite database path) to use instead of the
+            shared `InMemorySaver`.
+
+            The cached graph is rebound to it without being rebuilt.
+
+    Returns:
+        The shared compiled coordinator graph.
+    """
+    with _coordinator_lock:
+        coordinator = _shared_coordinator()
+
+    if checkpointer is None:
+        return coordinator
+    if isinstance(checkpointer, str | Path):
+        checkpointer = open_sqlite_checkpointer(checkpointer)
+    return coordinator.copy(update={"checkpointer": checkpointer})
+
+
+def clear_coordinator_cache() -> None:
+    """Drop the cached coordinator.
+
+    The next `get_coordinator` call builds a new graph.
+    """
+    with _coordinator_lock:
+        _shared_coordinator.cache_clear()
 
 
 def create_default_state(issue_content: str) -> MREValidationState:
     """Initialize default initial state for validation.
 
     Args:
-        issue_content: The raw content of the GitHub issue in markdown.
+        issue_content: The raw content of the GitHub issue in markdown. It is put
+            in the blob store, and the state holds its ref.
 
     Returns:
         Initial `MREValidationState` with defaults.
     """
     return MREValidationState(
-        issue_content=issue_content,
+        issue_content=store_blob(issue_content),
         python_version=None,
         packages=[],
         version_notes=[],
@@ -310,12 +555,14 @@ def create_default_state(issue_content: str) -> MREValidationState:
         requires_api_keys=False,
         detected_api_providers=[],
         approved_api_keys={},
+        sandbox=None,
         execution_output=None,
         execution_error=None,
         hydrated_code=None,
         draft_comments=[],
         validation_report=None,
         reproduction_script=None,
+        enrichment_outcomes={},
         should_terminate=False,
         termination_reason=None,
     )
@@ -0,0 +1,151 @@
+"""Incremental parsing of `KEY: value` line responses, with early stopping.
+
+Several agents ask the model to answer in `KEY: value` lines (e.g.
+`NEEDS_MRE: true`). `LineProtocolParser` reads those lines from the model's stream
+as each one completes, and `StopEarly` wraps a chat model so that generation stops
+as soon as the agent has the fields it needs, rather than when the model finishes
+(e.g. after a closing remark). The agents still parse the returned message as
+before; it just ends at the last line they need.
+"""
+
+import contextlib
+import re
+from collections.abc import AsyncGenerator, Callable, Collection, Generator, Mapping
+from typing import Any, cast
+
+from langchain_core.caches import BaseCache
+from langchain_core.globals import get_llm_cache
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import (
+    AIMessageChunk,
+    BaseMessage,
+    message_chunk_to_message,
+)
+from langchain_core.runnables import Runnable, RunnableConfig
+from typing_extensions import override
+
+_FIELD = re.compile(r"^\s*([A-Z][A-Z_]*):\s*(.*?)\s*$")
+
+
+class LineProtocolParser:
+    """Collects `KEY: value` fields from text that arrives in pieces.
+
+    A field is read once its line is complete, i.e. followed by a line break.
+    """
+
+    def __init__(
+        self,
+        required: Collection[str],
+        *,
+        stop_when: Callable[[Mapping[str, str]], bool] | None = None,
+    ) -> None:
+        """Initialize the parser.
+
+        Args:
+            required: Keys the agent needs; the parser is done once all are read.
+            stop_when: Decides from the fields read so far whether the rest of the
+                response can be skipped, e.g. once it determines the routing.
+        """
+        self.required = frozenset(required)
+        self.stop_when = stop_when
+        self.fields: dict[str, str] = {}
+        self._line = ""
+
+    @property
+    def done(self) -> bool:
+        """Whether the agent has all the fields it needs."""
+        if self.required <= self.fields.keys():
+            return True
+        return self.stop_when is not None and self.stop_when(self.fields)
+
+    def feed(self, text: str) -> None:
+        """Read the next piece of the response.
+
+        Args:
+            text: The piece, which may end within a line.
+        """
+        *lines, self._line = (self._line + text).split("\n")
+        for line in lines:
+            self._read_line(line)
+
+    def _read_line(self, line: str) -> None:
+        if match := _FIELD.match(line):
+            # Like the agents' parsers, a repeated key overrides earlier values
+            self.fields[match[1]] = match[2]
+
+
+def _uses_response_cache(model: BaseChatModel) -> bool:
+    """Check whether the model's calls go through a response cache."""
+    if isinstance(model.cache, BaseCache):
+        return True
+    return model.cache is None and get_llm_cache() is not None
+
+
+class StopEarly(Runnable[LanguageModelInput, BaseMessage]):
+    """Chat model wrapper that stops streaming once a parser is done.
+
+    The response is the message streamed until then. Streaming bypasses the
+    response cache, so when the model has one (see `open_mre.models.set_llm_cache`),
+    the full response is requested instead: cached responses are instant, and
+    truncated responses would not be cached.
+    """
+
+    def __init__(
+        self, model: BaseChatModel, new_parser: Callable[[], LineProtocolParser]
+    ) -> None:
+        """Initialize the wrapper.
+
+        Args:
+            model: The chat model.
+            new_parser: Creates the parser for a call.
+        """
+        self.model = model
+        self.new_parser = new_parser
+
+    @override
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: RunnableConfig | None = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        if _uses_response_cache(self.model):
+            return self.model.invoke(input, config, **kwargs)
+
+        parser = self.new_parser()
+        merged: AIMessageChunk | None = None
+        stream = cast(
+            "Generator[AIMessageChunk, None, None]",
+            self.model.stream(input, config, **kwargs),
+        )
+        with contextlib.closing(stream):
+            for chunk in stream:
+                merged = chunk if merged is None else merged + chunk
+                parser.feed(chunk.text)
+                if parser.done:
+                    break
+        return message_chunk_to_message(merged or AIMessageChunk(content=""))
+
+    @override
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: RunnableConfig | None = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        if _uses_response_cache(self.model):
+            return await self.model.ainvoke(input, config, **kwargs)
+
+        parser = self.new_parser()
+        merged: AIMessageChunk | None = None
+        astream = cast(
+            "AsyncGenerator[AIMessageChunk, None]",
+            self.model.astream(input, config, **kwargs),
+        )
+        async with contextlib.aclosing(astream):
+            async for chunk in astream:
+                merged = chunk if merged is None else merged + chunk
+                parser.feed(chunk.text)
+                if parser.done:
+                    break
+        return message_chunk_to_message(merged or AIMessageChunk(content=""))
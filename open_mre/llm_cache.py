@@ -0,0 +1,225 @@
+"""Persistent chat model response cache.
+
+Agents build their prompts deterministically from the issue, so re-running an issue
+(after a crash, a config tweak, or a fix to a later stage) repeats the same model
+calls. `SQLiteLLMCache` stores responses on disk, keyed on the model and its
+parameters and on the prompt messages (with message IDs removed), so repeated
+calls are answered without calling the model.
+
+Enable it with `open_mre.models.set_llm_cache` before the agents are built.
+
+The storage (`SQLiteCache`) also backs other persistent caches, such as
+`open_mre.agents.executor.cache.HydrationCache`.
+"""
+
+# Queries interpolate only `SQLiteCache.table`, a class constant
+# ruff: noqa: S608
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Sequence
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+from typing_extensions import override
+
+from open_mre.metrics import LLM_CACHE_REQUESTS, increment
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = timedelta(days=7)
+
+# Set on cached responses, so token usage is not counted again (see
+# `open_mre.callbacks`)
+CACHE_HIT_METADATA_KEY = "open_mre_cache_hit"
+
+
+def _serialize(generations: Sequence[Generation]) -> str | None:
+    """Serialize chat generations, or return `None` if there are others."""
+    if not all(isinstance(g, ChatGeneration) for g in generations):
+        return None
+    return json.dumps(
+        [
+            {
+                "message": message_to_dict(g.message),  # type: ignore[attr-defined]
+                "generation_info": g.generation_info,
+            }
+            for g in generations
+        ]
+    )
+
+
+def _deserialize(value: str) -> list[Generation]:
+    generations: list[Generation] = []
+    for item in json.loads(value):
+        (message,) = messages_from_dict([item["message"]])
+        message.response_metadata = {
+            **message.response_metadata,
+            CACHE_HIT_METADATA_KEY: True,
+        }
+        generations.append(
+            ChatGeneration(message=message, generation_info=item["generation_info"])
+        )
+    return generations
+
+
+class SQLiteCache:
+    """Text values in a SQLite table, shared across processes.
+
+    Entries expire `ttl` after they were stored. When the stored values exceed
+    `max_bytes`, the least recently used ones are evicted.
+    """
+
+    table = "cache"
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: timedelta | None = DEFAULT_TTL,
+    ) -> None:
+        """Open (creating if needed) a cache database.
+
+        Args:
+            path: Path to the database file.
+            max_bytes: Maximum total size of the stored values.
+            ttl: How long a value is reused. `None` to keep values until they are
+                evicted.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at "
+                f"ON {self.table} (accessed_at)"
+            )
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl.total_seconds()
+
+    def _get(self, key: str) -> str | None:
+        """Get the value stored under `key`, unless it expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                self._conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        return None if row is None else str(row[0])
+
+    def _put(self, key: str, value: str) -> None:
+        """Store `value` under `key`, then evict entries beyond the limits."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Delete expired entries, then the least recently used beyond `max_bytes`."""
+        if self.ttl is not None:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?",
+                (now - self.ttl.total_seconds(),),
+            )
+        self._conn.execute(
+            f"""
+            DELETE FROM {self.table} WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (
+                        ORDER BY accessed_at DESC, key
+                    ) AS running_size
+                    FROM {self.table}
+                )
+                WHERE running_size > ?
+            )
+            """,
+            (self.max_bytes,),
+        )
+
+    def size(self) -> tuple[int, int]:
+        """Count the stored entries and their total size.
+
+        Returns:
+            The number of entries and their size in bytes.
+        """
+        with self._lock:
+            count, size = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return int(count), int(size)
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteLLMCache(SQLiteCache, BaseCache):
+    """Chat model response cache in a SQLite database, shared across processes.
+
+    Entries expire `ttl` after they were stored. When the stored responses exceed
+    `max_bytes`, the least recently used ones are evicted.
+    """
+
+    table = "llm_cache"
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        # `llm_string` identifies the model and its parameters, and `prompt` is the
+        # serialized messages, which the chat model normalizes before the lookup
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode()).hexdigest()
+
+    @override
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        value = self._get(self._key(prompt, llm_string))
+        increment(LLM_CACHE_REQUESTS, outcome="miss" if value is None else "hit")
+        return None if value is None else _deserialize(value)
+
+    @override
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        value = _serialize(return_val)
+        if value is not None:
+            self._put(self._key(prompt, llm_string), value)
+
+    @override
+    def clear(self, **kwargs: Any) -> None:
+        SQLiteCache.clear(self)
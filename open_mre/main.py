@@ -2,19 +2,228 @@
 
 import argparse
 import os
+import sqlite3
 import sys
+import time
 import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import timedelta
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, cast
 
 from dotenv import load_dotenv
-from langchain_core.runnables import RunnableConfig
+
+from open_mre.blobs import FileBlobStore, resolve_blobs, set_blob_store
+from open_mre.metrics import (
+    collect_metrics,
+    format_token_usage,
+    token_usage,
+    write_metrics,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
+    from langgraph.types import Interrupt
 
 load_dotenv()
-from langgraph.checkpoint.memory import InMemorySaver
-from langgraph.types import Command
 
-from open_mre.coordinator import create_coordinator, create_default_state
+# Environment variable providing a default for `--llm-cache`
+LLM_CACHE_ENV = "OPEN_MRE_LLM_CACHE"
+
+# Environment variable providing a default for `--hydration-cache`
+HYDRATION_CACHE_ENV = "OPEN_MRE_HYDRATION_CACHE"
+
+# Environment variable providing a default for `--pypi-cache`
+PYPI_CACHE_ENV = "OPEN_MRE_PYPI_CACHE"
+
+# Environment variable providing a default for `--pypi-index`
+PYPI_INDEX_ENV = "OPEN_MRE_PYPI_INDEX"
+
+# Environment variable providing a default for `--models`
+MODELS_ENV = "OPEN_MRE_MODELS"
+
+
+def add_model_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options selecting each agent's model and limiting model calls.
+
+    Args:
+        parser: The parser to extend.
+    """
+    parser.add_argument(
+        "--models",
+        type=Path,
+        default=os.environ.get(MODELS_ENV),
+        help=(
+            "JSON file mapping agent names to models, overriding the defaults "
+            f"(default: ${MODELS_ENV}, if set)"
+        ),
+    )
+    parser.add_argument(
+        "--llm-rpm",
+        type=int,
+        help="Model requests per minute to stay within (default: unlimited)",
+    )
+    parser.add_argument(
+        "--llm-tpm",
+        type=int,
+        help="Model tokens per minute to stay within (default: unlimited)",
+    )
+
+
+def configure_models(args: argparse.Namespace) -> None:
+    """Apply the agent model settings from `--models` and the rate limits.
+
+    Args:
+        args: Parsed arguments, including those from `add_model_arguments`.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file does not describe model settings.
+    """
+    if args.llm_rpm or args.llm_tpm:
+        from open_mre.scheduler import LLMScheduler, set_scheduler
+
+        set_scheduler(
+            LLMScheduler(
+                requests_per_minute=args.llm_rpm, tokens_per_minute=args.llm_tpm
+            )
+        )
+
+    if args.models:
+        from open_mre.models import load_agent_models, set_agent_models
+
+        set_agent_models(load_agent_models(args.models))
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options of the persistent caches.
+
+    Args:
+        parser: The parser to extend.
+    """
+    parser.add_argument(
+        "--llm-cache",
+        type=Path,
+        default=os.environ.get(LLM_CACHE_ENV),
+        help=(
+            "SQLite database caching model responses, so re-running an issue "
+            f"reuses them (default: ${LLM_CACHE_ENV}, if set)"
+        ),
+    )
+    parser.add_argument(
+        "--llm-cache-ttl-days",
+        type=float,
+        default=7,
+        help="How long cached responses are reused (default: 7)",
+    )
+    parser.add_argument(
+        "--llm-cache-max-mb",
+        type=float,
+        default=256,
+        help=(
+            "Size limit of the cache; least recently used responses are evicted "
+            "beyond it (default: 256)"
+        ),
+    )
+    parser.add_argument(
+        "--hydration-cache",
+        type=Path,
+        default=os.environ.get(HYDRATION_CACHE_ENV),
+        help=(
+            "SQLite database caching hydrated scripts by code, packages, and "
+            "behavior, so the same MRE is hydrated once; uses the --llm-cache "
+            f"limits (default: ${HYDRATION_CACHE_ENV}, if set)"
+        ),
+    )
+    parser.add_argument(
+        "--pypi-cache",
+        type=Path,
+        default=os.environ.get(PYPI_CACHE_ENV),
+        help=(
+            "SQLite database caching PyPI package metadata, revalidated with "
+            f"ETags once stale (default: ${PYPI_CACHE_ENV}, if set)"
+        ),
+    )
+    parser.add_argument(
+        "--pypi-fresh-minutes",
+        type=float,
+        default=60,
+        help=(
+            "How long cached PyPI metadata is used without revalidating it "
+            "(default: 60)"
+        ),
+    )
+    parser.add_argument(
+        "--pypi-index",
+        type=Path,
+        default=os.environ.get(PYPI_INDEX_ENV),
+        help=(
+            "Offline PyPI index (see `open-mre pypi-index`) to check versions "
+            f"against instead of pypi.org (default: ${PYPI_INDEX_ENV}, if set)"
+        ),
+    )
+
+
+@contextmanager
+def _opening(option: str, path: Path) -> Iterator[None]:
+    """Report which option's file could not be opened, if any."""
+    try:
+        yield
+    except (OSError, ValueError, sqlite3.Error) as e:
+        msg = f"Cannot use {option} {path}: {e}"
+        raise ValueError(msg) from e
+
+
+def configure_caches(args: argparse.Namespace) -> None:
+    """Enable the persistent caches whose paths are set, and the PyPI index.
+
+    Args:
+        args: Parsed arguments, including those from `add_cache_arguments`.
+
+    Raises:
+        ValueError: If a cache cannot be opened, or the `--pypi-index` file cannot
+            be read. The message names the option.
+    """
+    max_bytes = int(args.llm_cache_max_mb * 1024 * 1024)
+    ttl = timedelta(days=args.llm_cache_ttl_days)
+
+    if args.llm_cache:
+        from open_mre.llm_cache import SQLiteLLMCache
+        from open_mre.models import set_llm_cache
+
+        with _opening("--llm-cache", args.llm_cache):
+            cache = SQLiteLLMCache(args.llm_cache, max_bytes=max_bytes, ttl=ttl)
+        set_llm_cache(cache)
+
+    if args.hydration_cache:
+        from open_mre.agents.executor.cache import HydrationCache, set_hydration_cache
+
+        with _opening("--hydration-cache", args.hydration_cache):
+            hydration_cache = HydrationCache(
+                args.hydration_cache, max_bytes=max_bytes, ttl=ttl
+            )
+        set_hydration_cache(hydration_cache)
+
+    if args.pypi_cache:
+        from open_mre.tools.pypi_cache import PyPICache, set_pypi_cache
+
+        with _opening("--pypi-cache", args.pypi_cache):
+            pypi_cache = PyPICache(
+                args.pypi_cache,
+                fresh_for=timedelta(minutes=args.pypi_fresh_minutes),
+                max_bytes=max_bytes,
+            )
+        set_pypi_cache(pypi_cache)
+
+    if args.pypi_index:
+        from open_mre.tools.pypi_index import PyPIIndex, set_pypi_index
+
+        with _opening("--pypi-index", args.pypi_index):
+            index = PyPIIndex.load(args.pypi_index)
+        set_pypi_index(index)
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -51,14 +260,43 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         help="Skip code execution (analysis only)",
     )
 
-    # TODO: Pass option to run_validation (currently default is False)
     parser.add_argument(
         "--auto-approve-keys",
         action="store_true",
         help="Automatically approve API key usage (use with caution)",
     )
 
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--checkpoint-db",
+        type=Path,
+        help=(
+            "SQLite database for durable checkpoints, so an interrupted run can be "
+            "resumed with --thread-id"
+        ),
+    )
+
+    parser.add_argument(
+        "--thread-id",
+        help="Thread to run on; resumes the thread if --checkpoint-db already has it",
+    )
+
+    parser.add_argument(
+        "--retention-days",
+        type=float,
+        default=30,
+        help=(
+            "Delete threads in --checkpoint-db older than this many days before "
+            "running (default: 30)"
+        ),
+    )
+
+    add_model_arguments(parser)
+    add_cache_arguments(parser)
+
+    args = parser.parse_args(argv)
+    if args.thread_id and not args.checkpoint_db:
+        parser.error("--thread-id requires --checkpoint-db")
+    return args
 
 
 def prompt_for_api_keys(providers: list[str]) -> dict[str, str]:
@@ -111,11 +349,81 @@ def prompt_for_api_keys(providers: list[str]) -> dict[str, str]:
     return env_vars
 
 
+def stream_run(
+    coordinator: "CompiledStateGraph[Any, Any]",
+    graph_input: Any,
+    config: "RunnableConfig",
+    *,
+    on_update: Callable[[str, dict[str, Any]], None] | None = None,
+) -> list["Interrupt"]:
+    """Stream the coordinator until it finishes or is interrupted.
+
+    Prints each node's start and finish, with its elapsed time, as they happen.
+
+    Args:
+        coordinator: Compiled coordinator graph.
+        graph_input: Initial state, `None` to continue from the latest checkpoint,
+            or a `Command` to resume an interrupt.
+        config: Run config with the thread ID.
+        on_update: Called with the node name and its state update as each node
+            finishes, so callers can act on partial results (e.g. an early draft
+            comment).
+
+    Returns:
+        The interrupts the run stopped at, if any.
+    """
+    started: dict[str, float] = {}
+    interrupts: list[Interrupt] = []
+
+    events = cast(
+        "Iterator[tuple[str, dict[str, Any]]]",
+        coordinator.stream(graph_input, config, stream_mode=["tasks", "updates"]),
+    )
+    for mode, chunk in events:
+        if mode == "tasks":
+            if "result" not in chunk:
+                started[chunk["id"]] = time.perf_counter()
+                print(f"  [start] {chunk['name']}")
+                continue
+
+            elapsed = time.perf_counter() - started.pop(
+                chunk["id"], time.perf_counter()
+            )
+            status = "failed" if chunk["error"] else "done"
+            if chunk["interrupts"]:
+                status = "paused"
+            print(f"  [{status}] {chunk['name']} ({elapsed:.1f}s)")
+            continue
+
+        for node, update in chunk.items():
+            if node == "__interrupt__":
+                interrupts.extend(update)
+            elif on_update is not None and isinstance(update, dict):
+                on_update(node, update)
+
+    return interrupts
+
+
+def print_draft_comments(node: str, update: dict[str, Any]) -> None:
+    """Print draft comments as soon as a node produces them.
+
+    Args:
+        node: Name of the node that finished.
+        update: The node's state update.
+    """
+    for comment in update.get("draft_comments", []):
+        preview = comment.strip().splitlines()[0] if comment.strip() else ""
+        print(f"  Draft comment from {node}: {preview}")
+
+
 def run_validation(
     issue_content: str,
     *,
     auto_approve_keys: bool = False,
     issue_file: Path | None = None,
+    checkpointer: "BaseCheckpointSaver[Any] | Path | None" = None,
+    thread_id: str | None = None,
+    on_update: Callable[[str, dict[str, Any]], None] | None = None,
 ) -> dict[str, Any]:
     """Run the validation workflow.
 
@@ -123,12 +431,24 @@ def run_validation(
         issue_content: The raw markdown content of the issue.
         auto_approve_keys: If `True`, skip API key approval prompts.
         issue_file: Path to the issue file (for metadata tracking).
+        checkpointer: Checkpointer (or SQLite database path) to run on instead of
+            the shared in-memory one.
+        thread_id: Thread to run on. If the checkpointer already has this thread,
+            the run resumes from its latest checkpoint instead of starting over.
+        on_update: Called with the node name and its state update as each node
+            finishes.
 
     Returns:
-        Final state dictionary from the coordinator graph.
+        Final state dictionary from the coordinator graph, with blob refs resolved.
     """
-    checkpointer = InMemorySaver()
-    coordinator = create_coordinator(checkpointer=checkpointer)
+    # Deferred so that `--help` and argument errors don't pay for importing
+    # LangChain, LangGraph, and the agents
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.types import Command
+
+    from open_mre.coordinator import create_default_state, get_coordinator
+
+    coordinator = get_coordinator(checkpointer)
     initial_state = create_default_state(issue_content=issue_content)
 
     # thread_id is required by the checkpointer for HITL interrupt/resume flow
@@ -137,62 +457,68 @@ def run_validation(
     if issue_file is not None:
         metadata["issue_file"] = str(issue_file)
 
+    thread_id = thread_id or str(uuid.uuid4())
     config: RunnableConfig = {
-        "configurable": {"thread_id": str(uuid.uuid4())},
+        "configurable": {"thread_id": thread_id},
         "metadata": metadata,
     }
 
-    print("\nStarting MRE validation...")
-
-    result = coordinator.invoke(initial_state, config)
-
-    # Handle HITL interrupts
-    while True:
-        # Check if we're at an interrupt
-        state = coordinator.get_state(config)
-
-        if not state.tasks:
-            # No pending tasks, we're done
+    snapshot = coordinator.get_state(config)
+    if not snapshot.values:
+        print("\nStarting MRE validation...")
+        interrupts = stream_run(coordinator, initial_state, config, on_update=on_update)
+    elif not snapshot.next:
+        print(f"\nThread {thread_id} already completed, reusing its results.")
+        interrupts = []
+    else:
+        print(f"\nResuming MRE validation (thread {thread_id})...")
+        interrupts = [
+            interrupt for task in snapshot.tasks for interrupt in task.interrupts
+        ]
+        if not interrupts:
+            interrupts = stream_run(coordinator, None, config, on_update=on_update)
+
+    # Handle HITL interrupts as they occur
+    while interrupts:
+        interrupt_data = interrupts[0].value
+        if interrupt_data.get("type") != "api_key_approval":
             break
 
-        # Check for interrupt
-        for task in state.tasks:
-            if hasattr(task, "interrupts") and task.interrupts:
-                interrupt_data = task.interrupts[0].value
-
-                if interrupt_data.get("type") == "api_key_approval":
-                    providers = interrupt_data.get("providers", [])
-
-                    if auto_approve_keys:
-                        # Auto-approve with empty keys (will likely fail execution)
-                        print("\nAuto-approving API key usage (no keys provided)")
-                        approval = {"approved": True, "env_vars": {}}
-                    else:
-                        env_vars = prompt_for_api_keys(providers)
-                        if env_vars:
-                            approval = {"approved": True, "env_vars": env_vars}
-                        else:
-                            approval = {"approved": False, "reason": "User declined"}
-
-                    # Resume with approval response
-                    result = coordinator.invoke(
-                        Command(resume=approval),
-                        config,
-                    )
-                    break
+        providers = interrupt_data.get("providers", [])
+        if auto_approve_keys:
+            # Auto-approve with empty keys (will likely fail execution)
+            print("\nAuto-approving API key usage (no keys provided)")
+            approval = {"approved": True, "env_vars": {}}
         else:
-            # No interrupts found, we're done
-            break
+            env_vars = prompt_for_api_keys(providers)
+            if env_vars:
+                approval = {"approved": True, "env_vars": env_vars}
+            else:
+                approval = {"approved": False, "reason": "User declined"}
+
+        # Resume with approval response
+        interrupts = stream_run(
+            coordinator, Command(resume=approval), config, on_update=on_update
+        )
+
+    result = resolve_blobs(coordinator.get_state(config).values)
+
+    # The shared in-memory checkpointer outlives this run, so drop its checkpoints
+    if isinstance(coordinator.checkpointer, InMemorySaver):
+        coordinator.checkpointer.delete_thread(thread_id)
 
     return result
 
 
-def write_outputs(result: dict[str, Any], output_dir: Path) -> None:
+def write_outputs(
+    result: dict[str, Any], output_dir: Path, *, quiet: bool = False
+) -> None:
     """Write validation outputs to files.
 
     Args:
         result: Final state from the coordinator.
         output_dir: Directory to write output files.
+        quiet: If `True`, don't print the paths of written files.
     """
     output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -201,14 +527,16 @@ def write_outputs(result: dict[str, Any], output_dir: Path) -> None:
     if validation_report:
         report_path = output_dir / "validation_report.md"
         report_path.write_text(validation_report)
-        print(f"\nValidation report written to: {report_path}")
+        if not quiet:
+            print(f"\nValidation report written to: {report_path}")
 
     # Write reproduction script
     reproduction_script = result.get("reproduction_script")
     if reproduction_script:
         script_path = output_dir / "reproduction.py"
         script_path.write_text(reproduction_script)
-        print(f"Reproduction script written to: {script_path}")
+        if not quiet:
+            print(f"Reproduction script written to: {script_path}")
 
     # Write draft comments
     draft_comments = result.get("draft_comments", [])
@@ -218,7 +546,8 @@ def write_outputs(result: dict[str, Any], output_dir: Path) -> None:
         for i, comment in enumerate(draft_comments, 1):
             content += f"## Comment {i}\n\n{comment}\n\n---\n\n"
         comments_path.write_text(content)
-        print(f"Draft comments written to: {comments_path}")
+        if not quiet:
+            print(f"Draft comments written to: {comments_path}")
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -230,6 +559,21 @@ def main(argv: list[str] | None = None) -> int:
     Returns:
         Exit code (`0`: success, non-zero: failure).
     """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # `open-mre batch <source>` validates many issues concurrently
+    if argv and argv[0] == "batch":
+        from open_mre.batch import batch_main
+
+        return batch_main(argv[1:])
+
+    # `open-mre pypi-index <index>` creates or refreshes an offline PyPI index
+    if argv and argv[0] == "pypi-index":
+        from open_mre.tools.pypi_index import pypi_index_main
+
+        return pypi_index_main(argv[1:])
+
     args = parse_args(argv=argv)
 
     issue_file: Path = args.issue_file
@@ -250,19 +594,67 @@ def main(argv: list[str] | None = None) -> int:
     print(f"Loaded issue from: {issue_file}")
 
     try:
-        result = run_validation(
-            issue_content=issue_content,
-            issue_file=issue_file,
+        configure_models(args)
+    except (OSError, ValueError) as e:
+        print(f"Error: Invalid --models file: {e}", file=sys.stderr)
+        return 1
+    try:
+        configure_caches(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    checkpointer = None
+    thread_id = args.thread_id
+    if args.checkpoint_db:
+        from open_mre.checkpoints import apply_retention, open_sqlite_checkpointer
+
+        checkpointer = open_sqlite_checkpointer(args.checkpoint_db)
+        # Large state fields are stored next to the database, so they outlive
+        # the process along with the checkpoints that refer to them
+        blob_store = FileBlobStore(
+            args.checkpoint_db.with_name(f"{args.checkpoint_db.name}.blobs")
+        )
+        set_blob_store(blob_store)
+        expired = apply_retention(
+            checkpointer,
+            max_age=timedelta(days=args.retention_days),
+            blob_store=blob_store,
         )
+        if expired:
+            print(f"Deleted {len(expired)} expired thread(s) from {args.checkpoint_db}")
+        thread_id = thread_id or str(uuid.uuid4())
+        print(f"Thread ID: {thread_id}")
+    resume_hint = (
+        f"Resume with: --checkpoint-db {args.checkpoint_db} --thread-id {thread_id}"
+    )
+
+    try:
+        with collect_metrics() as run_metrics:
+            result = run_validation(
+                issue_content=issue_content,
+                auto_approve_keys=args.auto_approve_keys,
+                issue_file=issue_file,
+                checkpointer=checkpointer,
+                thread_id=thread_id,
+                on_update=print_draft_comments,
+            )
     except KeyboardInterrupt:
         print("Validation interrupted by user.")
+        if args.checkpoint_db:
+            print(resume_hint)
         return 130
     except Exception as e:
         print(f"Error during validation: {e}", file=sys.stderr)
+        if args.checkpoint_db:
+            print(resume_hint, file=sys.stderr)
         return 1
 
     # Write outputs
     write_outputs(result, args.output_dir)
+    metrics_path = write_metrics(run_metrics, args.output_dir)
+    print(f"Run metrics written to: {metrics_path}")
+    print(format_token_usage(token_usage(run_metrics)))
 
     # Print summary
     execution_ran = result.get("execution_output") or result.get("execution_error")
@@ -0,0 +1,333 @@
+"""Latency and usage metrics for nodes and external calls.
+
+Every graph node, LLM call, PyPI request, and sandbox phase records into the
+process-wide registry (see `get_metrics`), which can be exported in the Prometheus
+text format for scraping. `collect_metrics` additionally scopes a registry to a
+single run, for a per-run JSON summary.
+
+Durations are kept as summaries (count, sum, and p50/p95 over recent samples), and
+everything else as counters.
+"""
+
+import contextlib
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+NODE_DURATION = "open_mre_node_duration_seconds"
+LLM_CALL_DURATION = "open_mre_llm_call_duration_seconds"
+LLM_TOKENS = "open_mre_llm_tokens_total"
+LLM_CACHE_REQUESTS = "open_mre_llm_cache_requests_total"
+LLM_ESCALATIONS = "open_mre_llm_escalations_total"
+LLM_EARLY_STOPS = "open_mre_llm_early_stops_total"
+LLM_QUEUE_WAIT = "open_mre_llm_queue_wait_seconds"
+LLM_RETRIES = "open_mre_llm_retries_total"
+HYDRATION_CACHE_REQUESTS = "open_mre_hydration_cache_requests_total"
+PYPI_REQUEST_DURATION = "open_mre_pypi_request_duration_seconds"
+PYPI_REQUESTS = "open_mre_pypi_requests_total"
+PYPI_CACHE_REQUESTS = "open_mre_pypi_cache_requests_total"
+SANDBOX_PHASE_DURATION = "open_mre_sandbox_phase_duration_seconds"
+
+METRIC_HELP = {
+    NODE_DURATION: "Duration of graph node executions, by node and status.",
+    LLM_CALL_DURATION: "Duration of chat model calls, by model and node.",
+    LLM_TOKENS: "Tokens used by chat model calls, by model, node, and token type "
+    "(input, output, and the cache_read and cache_creation parts of input).",
+    LLM_CACHE_REQUESTS: "Chat model response cache lookups, by outcome.",
+    LLM_ESCALATIONS: "Chat model calls retried on the escalation model, by agent.",
+    LLM_EARLY_STOPS: "Chat model calls stopped once the response had the fields the "
+    "agent needs, by model and node.",
+    LLM_QUEUE_WAIT: "Time chat model calls waited for the rate limits and "
+    "higher-priority calls, by priority.",
+    LLM_RETRIES: "Chat model calls retried after a transient error, by HTTP status "
+    "(or connection).",
+    HYDRATION_CACHE_REQUESTS: "Hydrated script cache lookups, by outcome.",
+    PYPI_REQUEST_DURATION: "Duration of PyPI JSON API requests.",
+    PYPI_REQUESTS: "PyPI JSON API requests, by outcome.",
+    PYPI_CACHE_REQUESTS: "PyPI metadata cache lookups, by outcome (fresh, "
+    "revalidated, stale when PyPI could not be reached, or miss).",
+    SANDBOX_PHASE_DURATION: "Duration of sandbox phases (create, attach, install, "
+    "install_wait, write, exec, cleanup), by phase.",
+}
+
+QUANTILES = (0.5, 0.95)
+
+METRICS_FILENAME = "metrics.json"
+PROMETHEUS_FILENAME = "metrics.prom"
+
+# Samples kept per summary for quantiles. Count and sum cover all observations.
+MAX_SAMPLES = 1024
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _quantile(sorted_samples: list[float], q: float) -> float:
+    """Nearest-rank quantile of a non-empty sorted list."""
+    rank = max(math.ceil(q * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+@dataclass
+class _Summary:
+    count: int = 0
+    total: float = 0.0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=MAX_SAMPLES))
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+
+class MetricsRegistry:
+    """Thread-safe store of summaries and counters."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._summaries: dict[str, dict[Labels, _Summary]] = {}
+        self._counters: dict[str, dict[Labels, float]] = {}
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record an observation (e.g. a duration in seconds) in a summary.
+
+        Args:
+            name: Metric name.
+            value: The observed value.
+            **labels: Label values identifying the series.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._summaries.setdefault(name, {})
+            series.setdefault(key, _Summary()).observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """Increase a counter.
+
+        Args:
+            name: Metric name.
+            amount: Amount to add.
+            **labels: Label values identifying the series.
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize the recorded metrics as JSON-serializable data.
+
+        Returns:
+            `{"summaries": {name: [series]}, "counters": {name: [series]}}`, where
+            each summary series has `labels`, `count`, `sum`, `p50`, `p95`, and
+            `max`, and each counter series has `labels` and `value`.
+        """
+        with self._lock:
+            summaries = {
+                name: [
+                    {
+                        "labels": dict(labels),
+                        "count": stats.count,
+                        "sum": round(stats.total, 6),
+                        **{
+                            f"p{round(q * 100)}": round(value, 6)
+                            for q, value in _quantiles(stats).items()
+                        },
+                        "max": round(max(stats.samples), 6),
+                    }
+                    for labels, stats in sorted(series.items())
+                ]
+                for name, series in sorted(self._summaries.items())
+            }
+            counters = {
+                name: [
+                    {"labels": dict(labels), "value": value}
+                    for labels, value in sorted(series.items())
+                ]
+                for name, series in sorted(self._counters.items())
+            }
+        return {"summaries": summaries, "counters": counters}
+
+    def to_prometheus(self) -> str:
+        """Render the recorded metrics in the Prometheus text exposition format.
+
+        Returns:
+            The metrics, one sample per line.
+        """
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._summaries.items()):
+                lines.extend(_metadata(name, "summary"))
+                for labels, stats in sorted(series.items()):
+                    for q, value in _quantiles(stats).items():
+                        quantile_labels = (*labels, ("quantile", str(q)))
+                        lines.append(f"{name}{_format_labels(quantile_labels)} {value}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {stats.total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {stats.count}")
+            for name, counter_series in sorted(self._counters.items()):
+                lines.extend(_metadata(name, "counter"))
+                lines.extend(
+                    f"{name}{_format_labels(labels)} {value}"
+                    for labels, value in sorted(counter_series.items())
+                )
+        return "".join(f"{line}\n" for line in lines)
+
+
+def _quantiles(stats: _Summary) -> dict[float, float]:
+    sorted_samples = sorted(stats.samples)
+    return {q: _quantile(sorted_samples, q) for q in QUANTILES}
+
+
+def _metadata(name: str, metric_type: str) -> list[str]:
+    lines = [f"# TYPE {name} {metric_type}"]
+    if name in METRIC_HELP:
+        lines.insert(0, f"# HELP {name} {METRIC_HELP[name]}")
+    return lines
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+_process_registry = MetricsRegistry()
+
+# Registries scoped to the current run(s), in addition to the process-wide one
+_run_registries: contextvars.ContextVar[tuple[MetricsRegistry, ...]] = (
+    contextvars.ContextVar("open_mre_run_metrics", default=())
+)
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide registry, which accumulates metrics from every run.
+
+    Returns:
+        The process-wide registry.
+    """
+    return _process_registry
+
+
+@contextlib.contextmanager
+def collect_metrics() -> Iterator[MetricsRegistry]:
+    """Also record metrics into a fresh registry while the context is active.
+
+    Scoping follows `contextvars`, so concurrent runs in separate asyncio tasks or
+    threads each collect only their own metrics.
+
+    Yields:
+        The registry for this scope.
+    """
+    registry = MetricsRegistry()
+    token = _run_registries.set((*_run_registries.get(), registry))
+    try:
+        yield registry
+    finally:
+        _run_registries.reset(token)
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    """Record an observation in the process-wide and run-scoped registries.
+
+    Args:
+        name: Metric name.
+        value: The observed value.
+        **labels: Label values identifying the series.
+    """
+    for registry in (_process_registry, *_run_registries.get()):
+        registry.observe(name, value, **labels)
+
+
+def increment(name: str, amount: float = 1, **labels: Any) -> None:
+    """Increase a counter in the process-wide and run-scoped registries.
+
+    Args:
+        name: Metric name.
+        amount: Amount to add.
+        **labels: Label values identifying the series.
+    """
+    for registry in (_process_registry, *_run_registries.get()):
+        registry.increment(name, amount, **labels)
+
+
+@contextlib.contextmanager
+def timed(name: str, **labels: Any) -> Iterator[None]:
+    """Record how long the block takes, in seconds (also if it raises).
+
+    Args:
+        name: Metric name.
+        **labels: Label values identifying the series.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def token_usage(registry: MetricsRegistry) -> dict[str, int]:
+    """Total the LLM tokens recorded in a registry, by token type.
+
+    Args:
+        registry: The registry.
+
+    Returns:
+        Token counts for `input`, `output`, `cache_read` (prompt cache hits), and
+        `cache_creation` (prompt cache writes). Input tokens that were neither read
+        from nor written to the cache are `input - cache_read - cache_creation`.
+    """
+    totals = dict.fromkeys(("input", "output", "cache_read", "cache_creation"), 0)
+    for series in registry.summary()["counters"].get(LLM_TOKENS, []):
+        token_type = series["labels"].get("type")
+        if token_type in totals:
+            totals[token_type] += int(series["value"])
+    return totals
+
+
+def format_token_usage(usage: dict[str, int]) -> str:
+    """Describe token usage in one line, for run output.
+
+    Args:
+        usage: Token counts, as returned by `token_usage`.
+
+    Returns:
+        The description.
+    """
+    uncached = usage["input"] - usage["cache_read"] - usage["cache_creation"]
+    return (
+        f"LLM tokens: {usage['input']:,} input ({usage['cache_read']:,} cache hits, "
+        f"{usage['cache_creation']:,} cache writes, {uncached:,} uncached), "
+        f"{usage['output']:,} output"
+    )
+
+
+def write_metrics(registry: MetricsRegistry, output_dir: Path) -> Path:
+    """Write a registry's JSON summary and Prometheus text export.
+
+    Args:
+        registry: The registry to export.
+        output_dir: Directory for `metrics.json` and `metrics.prom`.
+
+    Returns:
+        Path of the JSON summary.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary_path = output_dir / METRICS_FILENAME
+    summary_path.write_text(json.dumps(registry.summary(), indent=2) + "\n")
+    (output_dir / PROMETHEUS_FILENAME).write_text(registry.to_prometheus())
+    return summary_path
@@ -0,0 +1,358 @@
+"""Chat model clients shared by the agents.
+
+Model clients hold connection pools and are safe to share across threads, so each
+configured model is constructed once per process rather than once per agent build
+or per invocation.
+
+Each agent's model is looked up in a registry (see `DEFAULT_AGENT_MODELS` and
+`set_agent_models`). Parsing-style agents default to a faster model tier, with an
+escalation model: `invoke_with_escalation` retries a call on it when the agent
+cannot use the faster model's response. Its calls go through the process-wide
+`open_mre.scheduler.LLMScheduler`, which also retries transient errors, so the
+clients' own retries are disabled.
+
+A response cache (e.g. `open_mre.llm_cache.SQLiteLLMCache`) set with
+`set_llm_cache` is attached to every client built afterwards.
+
+Prompts are sent with their prompt caching markers only to models that accept them
+(see `messages_for`), and only mark the shared issue prefix when another agent
+reads it from the same model's cache (see `shares_prompt_cache`).
+"""
+
+import functools
+import json
+import threading
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from langchain.chat_models import init_chat_model
+from langchain_core.caches import BaseCache
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableBinding
+
+from open_mre.line_protocol import StopEarly
+from open_mre.metrics import LLM_ESCALATIONS, increment
+from open_mre.prompts import estimate_tokens, without_cache_control
+from open_mre.scheduler import get_scheduler
+
+DEFAULT_MODEL = "claude-sonnet-4-5"
+FAST_MODEL = "claude-haiku-4-5"
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """Chat model settings for an agent."""
+
+    model: str
+    """Model identifier, as accepted by `init_chat_model`."""
+    max_tokens: int | None = None
+    """Maximum number of output tokens (`None`: the provider's default)."""
+    temperature: float | None = None
+    """Sampling temperature (`None`: the provider's default)."""
+    escalation_model: str | None = None
+    """Model to retry with when the agent cannot use a response, if any."""
+
+
+# Provider prompt caches are per model. The version validator's prompts start with
+# its tools, so its cached prefix is its own (read again by its tool loop); with
+# these defaults the code extractor is alone on its model and does not mark the
+# shared prefix (see `shares_prompt_cache`), which would only pay for cache writes.
+DEFAULT_AGENT_MODELS: dict[str, ModelConfig] = {
+    # Lookups and a structured report, or a few labeled lines: easy to check, so
+    # they run on the faster tier and escalate only on unusable output
+    "version_validator": ModelConfig(
+        FAST_MODEL, max_tokens=2048, temperature=0, escalation_model=DEFAULT_MODEL
+    ),
+    "code_extractor": ModelConfig(
+        FAST_MODEL, max_tokens=1024, temperature=0, escalation_model=DEFAULT_MODEL
+    ),
+    "behavior_analyst": ModelConfig(DEFAULT_MODEL, max_tokens=1024, temperature=0),
+    "executor": ModelConfig(DEFAULT_MODEL, max_tokens=4096, temperature=0),
+    "report_generator": ModelConfig(DEFAULT_MODEL, max_tokens=4096),
+}
+
+# Agents whose prompts start with bound tools, so they share no cached prefix
+_TOOL_AGENTS = frozenset({"version_validator"})
+
+_lock = threading.Lock()
+_llm_cache: BaseCache | None = None
+_agent_models: dict[str, ModelConfig] = dict(DEFAULT_AGENT_MODELS)
+
+
+@functools.cache
+def _cached_chat_model(
+    model: str, max_tokens: int | None, temperature: float | None
+) -> BaseChatModel:
+    # Retries are left to the scheduler, which coordinates them across calls
+    kwargs: dict[str, Any] = {"max_retries": 0}
+    if _llm_cache is not None:
+        kwargs["cache"] = _llm_cache
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    chat_model: BaseChatModel = init_chat_model(model=model, **kwargs)
+    return chat_model
+
+
+def get_chat_model(
+    model: str = DEFAULT_MODEL,
+    *,
+    max_tokens: int | None = None,
+    temperature: float | None = None,
+) -> BaseChatModel:
+    """Get the process-wide chat model client for `model`.
+
+    Args:
+        model: Model identifier, as accepted by `init_chat_model`.
+        max_tokens: Maximum number of output tokens (`None`: provider default).
+        temperature: Sampling temperature (`None`: provider default).
+
+    Returns:
+        The shared chat model client.
+    """
+    # `functools.cache` can call the wrapped function more than once when threads
+    # race on a cold key, so serialize construction
+    with _lock:
+        return _cached_chat_model(model, max_tokens, temperature)
+
+
+def get_agent_model_config(agent: str) -> ModelConfig:
+    """Get the model settings of an agent.
+
+    Args:
+        agent: The agent name, e.g. `code_extractor`.
+
+    Returns:
+        The agent's settings, or the default model for unknown agents.
+    """
+    with _lock:
+        return _agent_models.get(agent, ModelConfig(DEFAULT_MODEL))
+
+
+def shares_prompt_cache(agent: str) -> bool:
+    """Check whether another agent sends the shared issue prefix to an agent's model.
+
+    Marking the prefix for caching makes the first call pay for a cache write,
+    which only pays off if another call reads the entry. Provider caches are per
+    model, so this depends on the configured models.
+
+    Args:
+        agent: The agent name, e.g. `code_extractor`.
+
+    Returns:
+        Whether the agent should mark its issue prefix for caching.
+    """
+    with _lock:
+        models = dict(_agent_models)
+    model = models.get(agent, ModelConfig(DEFAULT_MODEL)).model
+    return any(
+        config.model == model
+        for name, config in models.items()
+        if name != agent and name not in _TOOL_AGENTS
+    )
+
+
+def get_agent_models(agent: str) -> list[BaseChatModel]:
+    """Get an agent's chat model clients, in escalation order.
+
+    Args:
+        agent: The agent name, e.g. `code_extractor`.
+
+    Returns:
+        The agent's model, followed by its escalation model if it has one.
+    """
+    config = get_agent_model_config(agent)
+    names = [config.model]
+    if config.escalation_model and config.escalation_model != config.model:
+        names.append(config.escalation_model)
+    return [
+        get_chat_model(
+            name, max_tokens=config.max_tokens, temperature=config.temperature
+        )
+        for name in names
+    ]
+
+
+def set_agent_models(models: Mapping[str, ModelConfig]) -> None:
+    """Override the model settings of some agents.
+
+    Agents not in `models` keep their current settings. Agents keep the clients
+    they were built with, so call this before building the coordinator (or clear
+    its cache with `open_mre.coordinator.clear_coordinator_cache`).
+
+    Args:
+        models: Settings by agent name.
+    """
+    with _lock:
+        _agent_models.update(models)
+
+
+def reset_agent_models() -> None:
+    """Restore the default model settings of all agents."""
+    with _lock:
+        _agent_models.clear()
+        _agent_models.update(DEFAULT_AGENT_MODELS)
+
+
+def load_agent_models(path: Path) -> dict[str, ModelConfig]:
+    """Read agent model settings from a JSON file.
+
+    The file maps agent names to either a model identifier or an object with the
+    fields of `ModelConfig`, e.g.
+    `{"executor": "claude-haiku-4-5", "code_extractor": {"model": "gpt-5-mini",
+    "escalation_model": null}}`.
+
+    Args:
+        path: The JSON file.
+
+    Returns:
+        Settings by agent name.
+
+    Raises:
+        ValueError: If the file does not describe model settings.
+    """
+    data = json.loads(path.read_text())
+    if not isinstance(data, dict):
+        msg = f"{path}: expected an object mapping agent names to models"
+        raise ValueError(msg)  # noqa: TRY004
+
+    models: dict[str, ModelConfig] = {}
+    for agent, value in data.items():
+        if agent not in DEFAULT_AGENT_MODELS:
+            msg = f"{path}: unknown agent {agent!r}"
+            raise ValueError(msg)
+        try:
+            models[agent] = (
+                ModelConfig(value) if isinstance(value, str) else ModelConfig(**value)
+            )
+        except TypeError as e:
+            msg = f"{path}: invalid settings for {agent!r}: {e}"
+            raise ValueError(msg) from e
+    return models
+
+
+def _estimate_input_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Estimate a prompt's tokens, for the scheduler's token budget."""
+    return sum(estimate_tokens(message.text) for message in messages)
+
+
+def supports_cache_control(model: Runnable[LanguageModelInput, BaseMessage]) -> bool:
+    """Check whether a model accepts `cache_control` blocks (Anthropic models do).
+
+    Args:
+        model: A chat model, possibly with tools bound or wrapped in `StopEarly`.
+
+    Returns:
+        Whether prompt caching markers can be sent to the model.
+    """
+    while isinstance(model, RunnableBinding | StopEarly):
+        model = model.bound if isinstance(model, RunnableBinding) else model.model
+    return type(model).__module__.split(".")[0] == "langchain_anthropic"
+
+
+def messages_for(
+    model: Runnable[LanguageModelInput, BaseMessage], messages: Sequence[BaseMessage]
+) -> list[BaseMessage]:
+    """Prepare a prompt for a model, removing markers it does not accept.
+
+    Args:
+        model: The model to call.
+        messages: The prompt, e.g. from `open_mre.prompts.build_messages`.
+
+    Returns:
+        The messages to send to the model.
+    """
+    if supports_cache_control(model):
+        return list(messages)
+    return without_cache_control(messages)
+
+
+def invoke_with_escalation(
+    agent: str,
+    models: Sequence[Runnable[LanguageModelInput, BaseMessage]],
+    messages: Sequence[BaseMessage],
+    *,
+    accept: Callable[[BaseMessage], bool],
+) -> BaseMessage:
+    """Call an agent's model, escalating while the response is not usable.
+
+    Args:
+        agent: The agent name, for metrics.
+        models: The agent's models (e.g. from `get_agent_models`, possibly with
+            tools bound), in escalation order.
+        messages: The prompt.
+        accept: Whether the agent can use a response.
+
+    Returns:
+        The first accepted response, or the last model's response.
+    """
+    scheduler = get_scheduler()
+    tokens = _estimate_input_tokens(messages)
+    response = scheduler.call(
+        functools.partial(models[0].invoke, input=messages_for(models[0], messages)),
+        tokens,
+    )
+    for model in models[1:]:
+        if accept(response):
+            break
+        increment(LLM_ESCALATIONS, agent=agent)
+        response = scheduler.call(
+            functools.partial(model.invoke, input=messages_for(model, messages)),
+            tokens,
+        )
+    return response
+
+
+async def ainvoke_with_escalation(
+    agent: str,
+    models: Sequence[Runnable[LanguageModelInput, BaseMessage]],
+    messages: Sequence[BaseMessage],
+    *,
+    accept: Callable[[BaseMessage], bool],
+) -> BaseMessage:
+    """Async version of `invoke_with_escalation`."""
+    scheduler = get_scheduler()
+    tokens = _estimate_input_tokens(messages)
+    response = await scheduler.acall(
+        functools.partial(models[0].ainvoke, input=messages_for(models[0], messages)),
+        tokens,
+    )
+    for model in models[1:]:
+        if accept(response):
+            break
+        increment(LLM_ESCALATIONS, agent=agent)
+        response = await scheduler.acall(
+            functools.partial(model.ainvoke, input=messages_for(model, messages)),
+            tokens,
+        )
+    return response
+
+
+def clear_model_cache() -> None:
+    """Drop the cached chat model clients.
+
+    The next `get_chat_model` call constructs a new client.
+    """
+    with _lock:
+        _cached_chat_model.cache_clear()
+
+
+def set_llm_cache(cache: BaseCache | None) -> None:
+    """Set the response cache used by chat model clients.
+
+    Cached clients are dropped so the next `get_chat_model` call picks up the
+    cache. Agents keep the client they were built with, so call this before
+    building the coordinator (or clear its cache with
+    `open_mre.coordinator.clear_coordinator_cache`).
+
+    Args:
+        cache: The response cache, or `None` to disable caching.
+    """
+    global _llm_cache  # noqa: PLW0603
+    with _lock:
+        _llm_cache = cache
+        _cached_chat_model.cache_clear()
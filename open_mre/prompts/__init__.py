@@ -1,10 +1,25 @@
 """Prompt templates for LLM agents."""
 
+from open_mre.prompts.digest import (
+    DigestPart,
+    IssueDigest,
+    PartKind,
+    digest_issue,
+    estimate_tokens,
+    render_digest,
+    truncate_tokens,
+)
+from open_mre.prompts.prefix import (
+    build_messages,
+    issue_prefix,
+    without_cache_control,
+)
 from open_mre.prompts.templates import (
     BEHAVIOR_ANALYST_SYSTEM_PROMPT,
     CODE_EXTRACTOR_SYSTEM_PROMPT,
     EXECUTOR_SYSTEM_PROMPT,
     REPORT_GENERATOR_SYSTEM_PROMPT,
+    SHARED_SYSTEM_PROMPT,
     VERSION_VALIDATOR_SYSTEM_PROMPT,
 )
 
@@ -13,5 +28,16 @@ __all__ = [
     "CODE_EXTRACTOR_SYSTEM_PROMPT",
     "EXECUTOR_SYSTEM_PROMPT",
     "REPORT_GENERATOR_SYSTEM_PROMPT",
+    "SHARED_SYSTEM_PROMPT",
     "VERSION_VALIDATOR_SYSTEM_PROMPT",
+    "DigestPart",
+    "IssueDigest",
+    "PartKind",
+    "build_messages",
+    "digest_issue",
+    "estimate_tokens",
+    "issue_prefix",
+    "render_digest",
+    "truncate_tokens",
+    "without_cache_control",
 ]
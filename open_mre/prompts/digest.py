@@ -0,0 +1,233 @@
+"""Token-budgeted issue content for agent prompts.
+
+Pasted logs and tracebacks can make an issue far larger than what an agent needs to
+see. `digest_issue` splits an issue once into parts (prose, code, tracebacks, logs,
+and environment info, by section) and estimates their token counts, and
+`render_digest` assembles an excerpt from those parts within a token budget, filling
+it with the kinds of content most relevant to the agent first.
+"""
+
+import ast
+import functools
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Literal
+
+PartKind = Literal["text", "code", "traceback", "log", "environment"]
+
+# Parts are truncated rather than omitted only if at least this much of them fits
+MIN_TRUNCATED_TOKENS = 40
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_HEADING = re.compile(r"^#{1,6}\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(`{3,}|~{3,})\s*([\w+-]*)")
+_PYTHON_LANGUAGES = {"python", "py", "python3", "pycon", "ipython"}
+_TRACEBACK = re.compile(
+    r"^\s*Traceback \(most recent call last\):"
+    r"|^\s*(?:\w+\.)*\w*(?:Error|Exception|Warning): ",
+    re.MULTILINE,
+)
+_ENVIRONMENT = re.compile(
+    r"System Information|Package Information|^\s*>?\s*[\w.-]+\s*(?:==|:)\s*\d",
+    re.MULTILINE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text.
+
+    Counts words and punctuation marks, which tracks subword tokenizers closely
+    enough for budgeting prose, code, and logs alike.
+
+    Args:
+        text: The text.
+
+    Returns:
+        The estimated token count.
+    """
+    return len(_TOKEN.findall(text))
+
+
+@dataclass(frozen=True)
+class DigestPart:
+    """A contiguous part of an issue."""
+
+    kind: PartKind
+    section: str
+    """Heading of the section the part is in (empty before the first heading)."""
+    text: str
+    fence: str
+    """Opening fence line (e.g. `` ```python ``) for fenced blocks, else empty."""
+    tokens: int
+
+
+@dataclass(frozen=True)
+class IssueDigest:
+    """An issue split into parts, in document order."""
+
+    parts: tuple[DigestPart, ...]
+
+    @property
+    def tokens(self) -> int:
+        """Estimated token count of the whole issue."""
+        return sum(part.tokens for part in self.parts)
+
+
+def _classify_block(language: str, body: str) -> PartKind:
+    """Classify a fenced block by its language tag and content."""
+    if _TRACEBACK.search(body):
+        return "traceback"
+    if language.lower() in _PYTHON_LANGUAGES:
+        return "code"
+    if _ENVIRONMENT.search(body):
+        return "environment"
+    if not language:
+        try:
+            tree = ast.parse(body)
+        except (SyntaxError, ValueError):
+            return "log"
+        if any(isinstance(node, ast.Import | ast.ImportFrom) for node in tree.body):
+            return "code"
+    return "log"
+
+
+@functools.lru_cache(maxsize=32)
+def digest_issue(content: str) -> IssueDigest:
+    """Split an issue into parts.
+
+    Results are cached, so the agents of a run share one digest.
+
+    Args:
+        content: The markdown content of the issue.
+
+    Returns:
+        The digest.
+    """
+    parts: list[DigestPart] = []
+    section = ""
+    prose: list[str] = []
+
+    def add(kind: PartKind, lines: list[str], fence: str = "") -> None:
+        text = "\n".join(lines).strip("\n")
+        if text.strip():
+            parts.append(DigestPart(kind, section, text, fence, estimate_tokens(text)))
+
+    lines = iter(content.splitlines())
+    for line in lines:
+        if fence := _FENCE.match(line):
+            add("text", prose)
+            prose = []
+            marker = fence[1]
+            body: list[str] = []
+            for inner in lines:
+                closing = inner.strip()
+                if closing.startswith(marker) and not closing.strip(marker[0]):
+                    break
+                body.append(inner)
+            block = "\n".join(body)
+            add(_classify_block(fence[2], block), body, line.strip())
+        elif heading := _HEADING.match(line):
+            add("text", prose)
+            prose = []
+            section = heading[1]
+        else:
+            prose.append(line)
+    add("text", prose)
+    return IssueDigest(tuple(parts))
+
+
+def truncate_tokens(
+    text: str, max_tokens: int, *, keep: Literal["head", "both"] = "head"
+) -> str:
+    """Shorten a text to about `max_tokens` tokens, by whole lines where possible.
+
+    Args:
+        text: The text.
+        max_tokens: The token budget.
+        keep: `"head"` keeps the beginning; `"both"` keeps the beginning and the end,
+            which suits logs and tracebacks, whose error is at the end.
+
+    Returns:
+        The text, with a marker where lines were omitted.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    budgets = [max_tokens] if keep == "head" else [max_tokens // 2, max_tokens // 2]
+
+    head: list[str] = []
+    used = 0
+    for line in lines:
+        used += estimate_tokens(line)
+        if used > budgets[0]:
+            break
+        head.append(line)
+    tail: list[str] = []
+    if keep == "both":
+        used = 0
+        for line in reversed(lines[len(head) :]):
+            used += estimate_tokens(line)
+            if used > budgets[1]:
+                break
+            tail.insert(0, line)
+    if not head and not tail:
+        # A single long line; cut it at about four characters per token
+        head = [lines[0][: max_tokens * 4]]
+
+    omitted = len(lines) - len(head) - len(tail)
+    marker = f"[... {omitted} lines omitted ...]" if omitted else "[...]"
+    return "\n".join([*head, marker, *tail])
+
+
+def render_digest(
+    digest: IssueDigest, *, budget: int, priorities: Sequence[PartKind]
+) -> str:
+    """Render an issue excerpt that fits in a token budget.
+
+    Parts are admitted in order of `priorities` (and in document order within a
+    kind), whole if they fit, otherwise truncated to the remaining budget. Parts of
+    kinds missing from `priorities`, and parts that do not fit, are replaced by a
+    one-line marker. The excerpt keeps document order and section headings.
+
+    Args:
+        digest: The issue digest.
+        budget: Token budget for the parts' content.
+        priorities: Kinds of parts to include, most relevant first.
+
+    Returns:
+        The excerpt.
+    """
+    ranked = sorted(
+        (i for i, part in enumerate(digest.parts) if part.kind in priorities),
+        key=lambda i: (priorities.index(digest.parts[i].kind), i),
+    )
+    allotted: dict[int, int] = {}
+    remaining = budget
+    for i in ranked:
+        tokens = digest.parts[i].tokens
+        if tokens <= remaining:
+            allotted[i] = tokens
+            remaining -= tokens
+        elif remaining >= MIN_TRUNCATED_TOKENS:
+            allotted[i] = remaining
+            remaining = 0
+
+    blocks: list[str] = []
+    section = ""
+    for i, part in enumerate(digest.parts):
+        if part.section != section:
+            section = part.section
+            blocks.append(f"## {section}")
+        if i not in allotted:
+            blocks.append(f"[{part.kind} omitted, ~{part.tokens} tokens]")
+            continue
+        keep: Literal["head", "both"] = (
+            "both" if part.kind in {"traceback", "log"} else "head"
+        )
+        text = truncate_tokens(part.text, allotted[i], keep=keep)
+        if part.fence:
+            closing = re.match(r"[`~]+", part.fence)
+            text = f"{part.fence}\n{text}\n{closing[0] if closing else '```'}"
+        blocks.append(text)
+    return "\n\n".join(blocks)
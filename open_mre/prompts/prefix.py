@@ -0,0 +1,99 @@
+"""Agent prompts laid out around a shared, cacheable prefix.
+
+Every agent sees the same issue, so each prompt starts with the same system prompt
+block: `SHARED_SYSTEM_PROMPT` and an excerpt of the issue (see
+`open_mre.prompts.digest`). The block is marked for provider prompt caching, so
+after the first call of a run, the other agents read it from the cache instead of
+processing it again. Writing the cache costs more than plain input, so agents whose
+model no other agent reads the prefix from leave the marker out (see
+`open_mre.models.shares_prompt_cache`). The agent's own system prompt and its task
+come after the prefix, where they do not invalidate it. Only Anthropic models
+accept the caching marker; it is removed (see `without_cache_control`) for other
+providers.
+
+The prefix must be identical across agents, so all of them share one excerpt
+budget.
+"""
+
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from open_mre.prompts.digest import PartKind, digest_issue, render_digest
+from open_mre.prompts.templates import SHARED_SYSTEM_PROMPT
+
+ISSUE_TOKEN_BUDGET = 4000
+ISSUE_PRIORITIES: tuple[PartKind, ...] = (
+    "text",
+    "traceback",
+    "code",
+    "environment",
+    "log",
+)
+
+
+def issue_prefix(issue_content: str) -> str:
+    """Render the shared prompt prefix for an issue.
+
+    Args:
+        issue_content: The markdown content of the issue.
+
+    Returns:
+        The shared system prompt, followed by the issue excerpt.
+    """
+    excerpt = render_digest(
+        digest_issue(issue_content),
+        budget=ISSUE_TOKEN_BUDGET,
+        priorities=ISSUE_PRIORITIES,
+    )
+    return f"{SHARED_SYSTEM_PROMPT}\n\nGitHub Issue:\n---\n{excerpt}\n---"
+
+
+def build_messages(
+    issue_content: str, system_prompt: str, task: str, *, cache: bool = True
+) -> list[BaseMessage]:
+    """Build an agent's messages: the cached prefix, its system prompt, its task.
+
+    Args:
+        issue_content: The markdown content of the issue.
+        system_prompt: The agent's system prompt.
+        task: The agent's instructions for this call.
+        cache: Whether to mark the prefix for prompt caching.
+
+    Returns:
+        The system message (prefix, then `system_prompt`) and the task message.
+    """
+    prefix: dict[str, Any] = {"type": "text", "text": issue_prefix(issue_content)}
+    if cache:
+        prefix["cache_control"] = {"type": "ephemeral"}
+    return [
+        SystemMessage(content=[prefix, {"type": "text", "text": system_prompt}]),
+        HumanMessage(content=task),
+    ]
+
+
+def without_cache_control(messages: Sequence[BaseMessage]) -> list[BaseMessage]:
+    """Remove the prompt caching markers, for models that do not accept them.
+
+    Args:
+        messages: The prompt, e.g. from `build_messages`.
+
+    Returns:
+        The prompt, without `cache_control` in its content blocks.
+    """
+    return [
+        message.model_copy(
+            update={
+                "content": [
+                    {k: v for k, v in block.items() if k != "cache_control"}
+                    if isinstance(block, dict)
+                    else block
+                    for block in message.content
+                ]
+            }
+        )
+        if isinstance(message.content, list)
+        else message
+        for message in messages
+    ]
@@ -0,0 +1,333 @@
+"""Process-wide scheduling of chat model requests.
+
+Every agent's model calls go through one `LLMScheduler` (see `get_scheduler`),
+shared by all runs in the process (batch issues, server threads). It:
+
+- keeps calls within the provider's requests-per-minute and tokens-per-minute
+  limits, with a token bucket per limit (a full minute's budget can be used in a
+  burst, and refills continuously),
+- admits waiting calls by priority: interactive runs before batch backlog (see
+  `llm_priority`), and in arrival order within a priority,
+- retries rate-limited, overloaded, and failed-to-connect calls with jittered
+  exponential backoff (or the provider's `Retry-After`), pausing all calls while
+  the provider is rate limiting, so that one 429 does not become many.
+
+Token counts are estimated before a call, and the budget is corrected with the
+usage the provider reports afterwards. Responses served from the response cache
+(see `open_mre.llm_cache`) made no request, so their budget is given back.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Literal
+
+import httpx
+from langchain_core.messages import AIMessage, BaseMessage
+
+from open_mre.llm_cache import CACHE_HIT_METADATA_KEY
+from open_mre.metrics import LLM_QUEUE_WAIT, LLM_RETRIES, increment, observe
+
+Priority = Literal["interactive", "backlog"]
+
+# Lower ranks are admitted first
+_PRIORITY_RANKS: dict[Priority, int] = {"interactive": 0, "backlog": 1}
+
+# HTTP statuses worth retrying: timeouts, rate limits, server errors, overload
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504, 529})
+
+# How often callers behind a higher-priority call check whether it is their turn
+POLL_INTERVAL = 0.05
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "open_mre_llm_priority", default="interactive"
+)
+
+
+@contextlib.contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Set the priority of the model calls made while the context is active.
+
+    Scoping follows `contextvars`, like `open_mre.metrics.collect_metrics`.
+
+    Args:
+        priority: `"interactive"` (the default) or `"backlog"`.
+
+    Yields:
+        Nothing.
+    """
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class _Bucket:
+    """Token bucket holding up to a minute's budget, refilled continuously."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (a full bucket for larger amounts)."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self.rate, 0.0)
+
+    def take(self, amount: float) -> None:
+        # May go negative for amounts above the capacity, delaying later calls
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+def _status_code(error: BaseException) -> int | None:
+    """Get the HTTP status of a provider SDK error, if it has one."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: BaseException) -> float | None:
+    """Get the delay requested with a `Retry-After` header, in seconds."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(float(headers.get("retry-after", "")), 0.0)
+    except ValueError:
+        return None
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Check whether a failed call is worth retrying."""
+    if _status_code(error) in RETRYABLE_STATUS_CODES:
+        return True
+    # SDKs wrap connection errors and timeouts of the underlying HTTP client
+    cause: BaseException | None = error
+    while cause is not None:
+        if isinstance(cause, httpx.TransportError):
+            return True
+        cause = cause.__cause__
+    return False
+
+
+def _tokens_used(message: BaseMessage) -> int | None:
+    """Get the input and output tokens a response reports, if any."""
+    usage = message.usage_metadata if isinstance(message, AIMessage) else None
+    if not usage:
+        return None
+    return usage["input_tokens"] + usage["output_tokens"]
+
+
+class LLMScheduler:
+    """Rate limiter, priority queue, and retry policy for chat model calls."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            requests_per_minute: Request budget (`None`: unlimited).
+            tokens_per_minute: Input and output token budget (`None`: unlimited).
+            max_retries: Retries of a call that fails with a transient error.
+            base_delay: Upper bound of the first retry's delay, in seconds; it
+                doubles with every retry.
+            max_delay: Upper bound of any retry's delay, in seconds.
+        """
+        self.requests = _Bucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = _Bucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._waiting: list[tuple[int, int]] = []
+        self._tickets = itertools.count()
+        self._paused_until = 0.0
+
+    def _enqueue(self) -> tuple[int, int]:
+        ticket = (_PRIORITY_RANKS[_priority.get()], next(self._tickets))
+        with self._lock:
+            heapq.heappush(self._waiting, ticket)
+        return ticket
+
+    def _dequeue(self, ticket: tuple[int, int]) -> None:
+        with self._lock:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+
+    def _try_acquire(self, ticket: tuple[int, int], tokens: int) -> float:
+        """Take the budget for a call if it is its turn.
+
+        Returns:
+            `0` if the budget was taken, else the seconds to wait before retrying.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._waiting[0] != ticket:
+                return POLL_INTERVAL
+            wait = max(
+                self._paused_until - now,
+                self.requests.wait_time(1, now) if self.requests else 0.0,
+                self.tokens.wait_time(tokens, now) if self.tokens else 0.0,
+            )
+            if wait > 0:
+                return wait
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            heapq.heappop(self._waiting)
+            return 0.0
+
+    def acquire(self, tokens: int) -> None:
+        """Wait until a call of about `tokens` tokens may start.
+
+        Args:
+            tokens: Estimated input and output tokens of the call.
+        """
+        started = time.perf_counter()
+        ticket = self._enqueue()
+        try:
+            while wait := self._try_acquire(ticket, tokens):
+                time.sleep(wait)
+        finally:
+            self._dequeue(ticket)
+        observe(LLM_QUEUE_WAIT, time.perf_counter() - started, priority=_priority.get())
+
+    async def aacquire(self, tokens: int) -> None:
+        """Async version of `acquire`."""
+        started = time.perf_counter()
+        ticket = self._enqueue()
+        try:
+            # Polls rather than waiting on an event: callers in other threads and
+            # event loops share the budget
+            while wait := self._try_acquire(ticket, tokens):  # noqa: ASYNC110
+                await asyncio.sleep(wait)
+        finally:
+            self._dequeue(ticket)
+        observe(LLM_QUEUE_WAIT, time.perf_counter() - started, priority=_priority.get())
+
+    def _settle(self, estimated: int, response: BaseMessage) -> None:
+        """Correct the budget with the usage the response reports.
+
+        Cached responses report the usage of the original call, but made no
+        request: the budget taken for them is given back instead.
+        """
+        with self._lock:
+            if response.response_metadata.get(CACHE_HIT_METADATA_KEY):
+                if self.requests:
+                    self.requests.give_back(1)
+                if self.tokens:
+                    self.tokens.give_back(estimated)
+                return
+            used = _tokens_used(response)
+            if self.tokens and used is not None:
+                self.tokens.take(used - estimated)
+
+    def _backoff(self, error: BaseException, attempt: int) -> float | None:
+        """Get the delay before retrying a failed call, or `None` to give up."""
+        if attempt >= self.max_retries or not _is_transient(error):
+            return None
+        status = _status_code(error)
+        increment(LLM_RETRIES, reason=str(status or "connection"))
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        delay = _retry_after(error) or random.uniform(0, cap)  # noqa: S311
+        if status in {429, 529}:
+            # Hold back every call, not just this one, while rate limited
+            with self._lock:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def call(self, func: Callable[[], BaseMessage], tokens: int) -> BaseMessage:
+        """Make a model call within the budget, retrying transient errors.
+
+        Args:
+            func: Makes the call.
+            tokens: Estimated input and output tokens of the call.
+
+        Returns:
+            The response.
+        """
+        attempt = 0
+        while True:
+            self.acquire(tokens)
+            try:
+                response = func()
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self._settle(tokens, response)
+                return response
+
+    async def acall(
+        self, func: Callable[[], Awaitable[BaseMessage]], tokens: int
+    ) -> BaseMessage:
+        """Async version of `call`."""
+        attempt = 0
+        while True:
+            await self.aacquire(tokens)
+            try:
+                response = await func()
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self._settle(tokens, response)
+                return response
+
+
+_scheduler = LLMScheduler()
+
+
+def get_scheduler() -> LLMScheduler:
+    """Get the process-wide scheduler.
+
+    Returns:
+        The scheduler.
+    """
+    return _scheduler
+
+
+def set_scheduler(scheduler: LLMScheduler) -> None:
+    """Replace the process-wide scheduler, e.g. to set rate limits.
+
+    Args:
+        scheduler: The new scheduler.
+    """
+    global _scheduler  # noqa: PLW0603
+    _scheduler = scheduler
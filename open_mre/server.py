@@ -1,6 +1,11 @@
 """LangGraph server entry point.
 
 This module exposes the compiled coordinator graph for the LangGraph local server.
+
+Runs hold large text fields as blob refs (see `open_mre.blobs`) until the last step,
+which resolves them so clients receive the text. Set `OPEN_MRE_BLOB_DIR` to a
+directory shared by all server workers so that interrupted runs can be resumed
+after a restart or by another worker.
 """
 
 from open_mre.coordinator import create_coordinator
@@ -8,4 +13,4 @@ from open_mre.coordinator import create_coordinator
 # Module-level compiled graph for LangGraph server
 # The server imports this variable directly
 # use_default_checkpointer=False because LangGraph server handles persistence
-graph = create_coordinator(use_default_checkpointer=False)
+graph = create_coordinator(use_default_checkpointer=False, resolve_outputs=True)
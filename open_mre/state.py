@@ -12,6 +12,27 @@ class PackageInfo(TypedDict):
     user_version: str | None
     latest_version: str | None
     is_outdated: bool | None
+    # Newer releases than `user_version`, when the release history is known
+    releases_behind: int | None
+
+
+class SandboxHandle(TypedDict):
+    """Reference to a speculatively provisioned execution sandbox.
+
+    Only identifiers are stored so that a run resumed in another process can
+    reattach to the same sandbox.
+    """
+
+    sandbox_id: str
+    packages: list[str]
+    install_command_id: str | None
+
+
+class StageOutcome(TypedDict):
+    """Early-termination signal reported by a parallel enrichment stage."""
+
+    draft_comment: str | None
+    should_terminate: bool
 
 
 class MREValidationState(TypedDict):
@@ -21,6 +42,10 @@ class MREValidationState(TypedDict):
 
     Each agent subgraph receives a subset of this state as input
     and returns updates to specific fields.
+
+    Large text fields (`issue_content`, `execution_output`, `hydrated_code`,
+    `validation_report`, `reproduction_script`) hold blob refs rather than the text
+    itself; see `open_mre.blobs`.
     """
 
     # Input
@@ -44,6 +69,7 @@ class MREValidationState(TypedDict):
 
     # Execution context (set after API key approval)
     approved_api_keys: dict[str, str]
+    sandbox: SandboxHandle | None
 
     # Execution results
     execution_output: str | None
@@ -56,6 +82,8 @@ class MREValidationState(TypedDict):
     reproduction_script: str | None
 
     # Control flow
+    # Keyed by stage name; merged at the join after the parallel enrichment stages
+    enrichment_outcomes: Annotated[dict[str, StageOutcome], lambda x, y: {**x, **y}]
     should_terminate: bool
     termination_reason: str | None
 
@@ -1,17 +1,69 @@
 """Custom tools for validation."""
 
-from open_mre.tools.daytona_sandbox import (
-    DAYTONA_AVAILABLE,
-    DaytonaSandbox,
-    ExecutionResult,
-    execute_in_sandbox,
-)
-from open_mre.tools.pypi_checker import check_pypi_version
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from open_mre.tools.daytona_sandbox import (
+        DAYTONA_AVAILABLE,
+        AsyncDaytonaSandbox,
+        DaytonaSandbox,
+        ExecutionResult,
+        adiscard_sandbox,
+        aexecute_in_sandbox,
+        aprovision_sandbox,
+        discard_sandbox,
+        execute_in_sandbox,
+        provision_sandbox,
+        sandbox_available,
+    )
+    from open_mre.tools.pypi_checker import check_pypi_version, check_pypi_versions
+
+# Exports are resolved on first access, so that importing this package does not pull
+# in LangChain
+_EXPORT_MODULES = {
+    "DAYTONA_AVAILABLE": "open_mre.tools.daytona_sandbox",
+    "AsyncDaytonaSandbox": "open_mre.tools.daytona_sandbox",
+    "DaytonaSandbox": "open_mre.tools.daytona_sandbox",
+    "ExecutionResult": "open_mre.tools.daytona_sandbox",
+    "adiscard_sandbox": "open_mre.tools.daytona_sandbox",
+    "aexecute_in_sandbox": "open_mre.tools.daytona_sandbox",
+    "aprovision_sandbox": "open_mre.tools.daytona_sandbox",
+    "check_pypi_version": "open_mre.tools.pypi_checker",
+    "check_pypi_versions": "open_mre.tools.pypi_checker",
+    "discard_sandbox": "open_mre.tools.daytona_sandbox",
+    "execute_in_sandbox": "open_mre.tools.daytona_sandbox",
+    "provision_sandbox": "open_mre.tools.daytona_sandbox",
+    "sandbox_available": "open_mre.tools.daytona_sandbox",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORT_MODULES.get(name)
+    if module is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
+
 
 __all__ = [
     "DAYTONA_AVAILABLE",
+    "AsyncDaytonaSandbox",
     "DaytonaSandbox",
     "ExecutionResult",
+    "adiscard_sandbox",
+    "aexecute_in_sandbox",
+    "aprovision_sandbox",
     "check_pypi_version",
+    "check_pypi_versions",
+    "discard_sandbox",
     "execute_in_sandbox",
+    "provision_sandbox",
+    "sandbox_available",
 ]
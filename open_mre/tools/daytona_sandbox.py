@@ -1,25 +1,55 @@
 """Daytona sandbox tool for code execution.
 
 Provides functions to create, execute code in, and clean up Daytona sandboxes.
+
+Async variants (`AsyncDaytonaSandbox`, `aexecute_in_sandbox`, ...) use Daytona's
+async client so that sandbox work does not block the event loop.
 """
 
+import asyncio
 import contextlib
+import importlib.util
 import logging
 import os
+import time
 import types
 from dataclasses import dataclass
 from typing import Any
 
+from open_mre.metrics import SANDBOX_PHASE_DURATION, timed
+from open_mre.state import SandboxHandle
+
 logger = logging.getLogger(__name__)
 
-try:
-    from daytona import Daytona, DaytonaConfig
+# The Daytona SDK takes seconds to import, so only check that it is installed here
+# and import it on first use
+DAYTONA_AVAILABLE = importlib.util.find_spec("daytona") is not None
+
+
+def _daytona_sdk() -> types.ModuleType:
+    """Import the Daytona SDK.
+
+    Returns:
+        The `daytona` module.
+    """
+    import daytona
 
-    DAYTONA_AVAILABLE = True
-except ImportError:
-    DAYTONA_AVAILABLE = False
-    Daytona = None
-    DaytonaConfig = None
+    return daytona
+
+
+# Session used for background package installation in provisioned sandboxes
+INSTALL_SESSION_ID = "open-mre-install"
+
+# Exit code reported when a background install's status cannot be read, e.g. because
+# its session did not survive a restart of the sandbox
+INSTALL_STATUS_UNKNOWN = -1
+
+# Minutes a provisioned sandbox is kept once it has been auto-stopped, so that one
+# abandoned at the human-in-the-loop interrupt is eventually deleted
+PROVISIONED_AUTO_DELETE_MINUTES = 60
+
+# Path the MRE is written to inside the sandbox
+CODE_PATH = "/tmp/mre_code.py"  # noqa: S108
 
 
 @dataclass
@@ -33,6 +63,184 @@ class ExecutionResult:
     error_message: str | None = None
 
 
+def _failure(
+    message: str, *, stderr: str | None = None, exit_code: int = 1
+) -> ExecutionResult:
+    """Build a failed `ExecutionResult`.
+
+    Args:
+        message: Error message.
+        stderr: Standard error, if different from the error message.
+        exit_code: Exit code to report.
+
+    Returns:
+        A failed `ExecutionResult`.
+    """
+    return ExecutionResult(
+        stdout="",
+        stderr=message if stderr is None else stderr,
+        exit_code=exit_code,
+        success=False,
+        error_message=message,
+    )
+
+
+def _timeout(what: str, timeout: int) -> ExecutionResult:
+    """Build an `ExecutionResult` for a timed out operation.
+
+    Args:
+        what: Description of the operation that timed out.
+        timeout: Timeout in seconds.
+
+    Returns:
+        A failed `ExecutionResult` with exit code `124`.
+    """
+    logger.warning("%s timed out after %ds", what, timeout)
+    return ExecutionResult(
+        stdout="",
+        stderr=f"{what} timed out after {timeout} seconds",
+        exit_code=124,
+        success=False,
+        error_message="Timeout",
+    )
+
+
+def _install_command(packages: list[str]) -> str:
+    """Build the pip command that installs `packages`."""
+    return f"pip install {' '.join(packages)}"
+
+
+def _write_command(code: str) -> str:
+    """Build the shell command that writes `code` to `CODE_PATH`."""
+    code_escaped = code.replace("'", "'\\''")
+    return f"echo '{code_escaped}' > {CODE_PATH}"
+
+
+def _run_command(env_vars: dict[str, str] | None) -> str:
+    """Build the shell command that runs the MRE with `env_vars` set."""
+    env_prefix = ""
+    if env_vars:
+        env_parts = [f"{k}='{v}'" for k, v in env_vars.items()]
+        env_prefix = " ".join(env_parts) + " "
+    return f"{env_prefix}python {CODE_PATH}"
+
+
+def _install_result(response: Any) -> ExecutionResult:
+    """Convert a `pip install` response into an `ExecutionResult`."""
+    stdout = str(response.result) if response.result else ""
+    logger.debug("Package install output: %s", stdout)
+    logger.info("Packages installed successfully")
+    return ExecutionResult(
+        stdout=stdout,
+        stderr="",
+        exit_code=0,
+        success=True,
+    )
+
+
+def _background_install_result(exit_code: int, logs: Any) -> ExecutionResult:
+    """Convert a finished background install into an `ExecutionResult`."""
+    stdout = str(logs.stdout or logs.output or "")
+    stderr = str(logs.stderr or "")
+    logger.debug("Package install output: %s", stdout)
+    if exit_code != 0:
+        logger.error("Package installation failed (exit_code=%d)", exit_code)
+        return ExecutionResult(
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            success=False,
+            error_message=f"pip install exited with code {exit_code}",
+        )
+    logger.info("Packages installed successfully")
+    return ExecutionResult(
+        stdout=stdout,
+        stderr=stderr,
+        exit_code=0,
+        success=True,
+    )
+
+
+def _execution_result(response: Any) -> ExecutionResult:
+    """Convert a code execution response into an `ExecutionResult`."""
+    # Parse response - structure may vary by SDK version
+    result_str = str(response.result) if response.result else ""
+
+    # Log the output for observability
+    logger.info("Execution completed")
+    logger.debug("stdout: %s", result_str)
+
+    # Check for Python errors in output
+    # (process succeeded but Python code may have failed)
+    has_error = any(
+        err in result_str for err in ("Error:", "Traceback (most recent call last):")
+    )
+    if has_error:
+        logger.warning("Python error detected in output:\n%s", result_str)
+
+    return ExecutionResult(
+        stdout=result_str,
+        stderr="",
+        exit_code=0,
+        success=True,
+    )
+
+
+def _execution_error_result(error: Exception, timeout: int) -> ExecutionResult:
+    """Convert a code execution exception into an `ExecutionResult`."""
+    error_str = str(error)
+
+    # Check if it's a timeout
+    if "timeout" in error_str.lower():
+        return _timeout("Execution", timeout)
+
+    # Check if it's a Python error (which is expected for bug reports)
+    # The error output is actually useful information
+    logger.error("Execution failed", exc_info=error)
+    return _failure(error_str)
+
+
+def _daytona_config(api_key: str | None, api_url: str | None) -> Any:
+    """Resolve Daytona credentials and build the client config.
+
+    Args:
+        api_key: Daytona API key.
+
+            Defaults to `DAYTONA_API_KEY` env var.
+        api_url: Daytona API URL.
+
+            Defaults to `DAYTONA_API_URL` env var.
+
+    Returns:
+        A `DaytonaConfig`.
+
+    Raises:
+        ImportError: If `daytona` is not installed.
+        ValueError: If API key is not provided.
+    """
+    if not DAYTONA_AVAILABLE:
+        msg = "daytona is not installed. Install it with: `pip install daytona`"
+        raise ImportError(msg)
+
+    api_key = api_key or os.environ.get("DAYTONA_API_KEY")
+    api_url = api_url or os.environ.get("DAYTONA_API_URL", "https://app.daytona.io/api")
+
+    if not api_key:
+        msg = "Daytona API key is required"
+        raise ValueError(msg)
+
+    return _daytona_sdk().DaytonaConfig(api_key=api_key, api_url=api_url)
+
+
+def _create_params(auto_delete_interval: int | None) -> Any:
+    """Build the sandbox creation parameters (`None` for the defaults)."""
+    if auto_delete_interval is None:
+        return None
+    return _daytona_sdk().CreateSandboxFromSnapshotParams(
+        auto_delete_interval=auto_delete_interval
+    )
+
+
 class DaytonaSandbox:
     """Wrapper around Daytona sandbox for code execution."""
 
@@ -55,32 +263,45 @@ class DaytonaSandbox:
             ImportError: If `daytona` is not installed.
             ValueError: If API key is not provided.
         """
-        if not DAYTONA_AVAILABLE:
-            msg = "daytona is not installed. Install it with: `pip install daytona`"
-            raise ImportError(msg)
-
-        self.api_key = api_key or os.environ.get("DAYTONA_API_KEY")
-        self.api_url = api_url or os.environ.get(
-            "DAYTONA_API_URL", "https://app.daytona.io/api"
-        )
+        self.config = _daytona_config(api_key, api_url)
+        self.api_key = self.config.api_key
+        self.api_url = self.config.api_url
+        self.daytona = _daytona_sdk().Daytona(self.config)
+        self.sandbox: Any = None
 
-        if not self.api_key:
-            msg = "Daytona API key is required"
-            raise ValueError(msg)
+    @property
+    def sandbox_id(self) -> str | None:
+        """ID of the underlying sandbox, if one has been created or attached."""
+        return self.sandbox.id if self.sandbox else None
 
-        self.config = DaytonaConfig(
-            api_key=self.api_key,
-            api_url=self.api_url,
-        )
-        self.daytona = Daytona(self.config)
-        self.sandbox: Any = None
+    def create(self, *, auto_delete_interval: int | None = None) -> None:
+        """Create a new sandbox instance.
 
-    def create(self) -> None:
-        """Create a new sandbox instance."""
+        Args:
+            auto_delete_interval: Minutes after the sandbox is auto-stopped before
+                it is deleted (`None`: Daytona's default, never).
+        """
         logger.info("Creating Daytona sandbox...")
-        self.sandbox = self.daytona.create()
+        with timed(SANDBOX_PHASE_DURATION, phase="create"):
+            self.sandbox = self.daytona.create(_create_params(auto_delete_interval))
         logger.info("Sandbox created successfully")
 
+    def attach(self, sandbox_id: str, *, start: bool = True) -> None:
+        """Attach to an existing sandbox instance.
+
+        Args:
+            sandbox_id: ID of the sandbox to attach to.
+            start: Whether to start the sandbox if it has been auto-stopped while
+                idle (e.g. during a long human-in-the-loop wait).
+        """
+        logger.info("Attaching to Daytona sandbox %s...", sandbox_id)
+        with timed(SANDBOX_PHASE_DURATION, phase="attach"):
+            self.sandbox = self.daytona.get(sandbox_id)
+        if start and self.sandbox.state != "started":
+            logger.info("Starting stopped sandbox %s...", sandbox_id)
+            self.sandbox.start()
+        logger.info("Sandbox attached successfully")
+
     def install_packages(self, packages: list[str]) -> ExecutionResult:
         """Install Python packages in the sandbox.
 
@@ -91,13 +312,7 @@ class DaytonaSandbox:
             `ExecutionResult` with installation output.
         """
         if not self.sandbox:
-            return ExecutionResult(
-                stdout="",
-                stderr="Sandbox not created",
-                exit_code=1,
-                success=False,
-                error_message="Sandbox not created",
-            )
+            return _failure("Sandbox not created")
 
         if not packages:
             return ExecutionResult(
@@ -107,30 +322,83 @@ class DaytonaSandbox:
                 success=True,
             )
 
-        package_str = " ".join(packages)
-        cmd = f"pip install {package_str}"
-
         logger.info("Installing packages: %s", packages)
         try:
-            response = self.sandbox.process.exec(cmd)
-            stdout = str(response.result) if response.result else ""
-            logger.debug("Package install output: %s", stdout)
-            logger.info("Packages installed successfully")
-            return ExecutionResult(
-                stdout=stdout,
-                stderr="",
-                exit_code=0,
-                success=True,
-            )
+            with timed(SANDBOX_PHASE_DURATION, phase="install"):
+                response = self.sandbox.process.exec(_install_command(packages))
         except Exception as e:
             logger.exception("Package installation failed")
-            return ExecutionResult(
-                stdout="",
-                stderr=str(e),
-                exit_code=1,
-                success=False,
-                error_message=str(e),
-            )
+            return _failure(str(e))
+        return _install_result(response)
+
+    def start_package_install(self, packages: list[str]) -> str | None:
+        """Start installing Python packages in the background.
+
+        The installation runs asynchronously inside the sandbox, so it keeps going
+        even if this process exits. Use `wait_for_install` to collect the result.
+
+        Args:
+            packages: List of package names to install.
+
+        Returns:
+            ID of the installation command, or `None` if there was nothing to install.
+        """
+        if not self.sandbox or not packages:
+            return None
+
+        logger.info("Starting background install of packages: %s", packages)
+        self.sandbox.process.create_session(INSTALL_SESSION_ID)
+        response = self.sandbox.process.execute_session_command(
+            INSTALL_SESSION_ID,
+            _daytona_sdk().SessionExecuteRequest(
+                command=_install_command(packages), run_async=True
+            ),
+        )
+        return str(response.cmd_id)
+
+    def wait_for_install(
+        self,
+        command_id: str,
+        timeout: int = 600,
+        poll_interval: float = 2.0,
+    ) -> ExecutionResult:
+        """Wait for a background installation started by `start_package_install`.
+
+        Args:
+            command_id: ID of the installation command.
+            timeout: Maximum time to wait in seconds.
+            poll_interval: Time between status checks in seconds.
+
+        Returns:
+            `ExecutionResult` with installation output.
+        """
+        if not self.sandbox:
+            return _failure("Sandbox not created")
+
+        logger.info("Waiting for background package install to finish...")
+        deadline = time.monotonic() + timeout
+        # Only the remaining wait is on the critical path, since the install
+        # started in the background
+        with timed(SANDBOX_PHASE_DURATION, phase="install_wait"):
+            try:
+                while True:
+                    command = self.sandbox.process.get_session_command(
+                        INSTALL_SESSION_ID, command_id
+                    )
+                    if command.exit_code is not None:
+                        break
+                    if time.monotonic() >= deadline:
+                        return _timeout("Package installation", timeout)
+                    time.sleep(poll_interval)
+
+                logs = self.sandbox.process.get_session_command_logs(
+                    INSTALL_SESSION_ID, command_id
+                )
+            except Exception as e:
+                logger.exception("Failed to check package installation")
+                return _failure(str(e), exit_code=INSTALL_STATUS_UNKNOWN)
+
+        return _background_install_result(command.exit_code, logs)
 
     def set_env_vars(self, env_vars: dict[str, str]) -> None:
         """Set environment variables in the sandbox.
@@ -163,124 +431,312 @@ class DaytonaSandbox:
             `ExecutionResult` with execution output.
         """
         if not self.sandbox:
-            return ExecutionResult(
-                stdout="",
-                stderr="Sandbox not created",
-                exit_code=1,
-                success=False,
-                error_message="Sandbox not created",
-            )
+            return _failure("Sandbox not created")
 
         # Set environment variables if provided
         if env_vars:
             self.set_env_vars(env_vars)
 
         # Write code to a file
-        code_escaped = code.replace("'", "'\\''")
-        write_cmd = f"echo '{code_escaped}' > /tmp/mre_code.py"
-
-        logger.debug("Writing code to /tmp/mre_code.py")
+        logger.debug("Writing code to %s", CODE_PATH)
         try:
-            self.sandbox.process.exec(write_cmd)
+            with timed(SANDBOX_PHASE_DURATION, phase="write"):
+                self.sandbox.process.exec(_write_command(code))
             logger.debug("Code written successfully")
         except Exception as e:
             logger.exception("Failed to write code to sandbox")
-            return ExecutionResult(
-                stdout="",
-                stderr=f"Failed to write code: {e}",
-                exit_code=1,
-                success=False,
-                error_message=str(e),
-            )
-
-        # Build execution command with env vars
-        env_prefix = ""
-        if env_vars:
-            env_parts = [f"{k}='{v}'" for k, v in env_vars.items()]
-            env_prefix = " ".join(env_parts) + " "
-
-        exec_cmd = f"{env_prefix}python /tmp/mre_code.py"
+            return _failure(str(e), stderr=f"Failed to write code: {e}")
 
         logger.info("Executing code in sandbox (timeout=%ds)...", timeout)
         try:
-            response = self.sandbox.process.exec(exec_cmd, timeout=timeout)
+            with timed(SANDBOX_PHASE_DURATION, phase="exec"):
+                response = self.sandbox.process.exec(
+                    _run_command(env_vars), timeout=timeout
+                )
+        except Exception as e:
+            return _execution_error_result(e, timeout)
+        return _execution_result(response)
 
-            # Parse response - structure may vary by SDK version
-            result_str = str(response.result) if response.result else ""
+    def cleanup(self) -> None:
+        """Clean up and delete the sandbox."""
+        if self.sandbox:
+            logger.info("Cleaning up sandbox...")
+            try:
+                # Try to delete the sandbox if the method exists
+                with timed(SANDBOX_PHASE_DURATION, phase="cleanup"):
+                    if hasattr(self.sandbox, "delete"):
+                        self.sandbox.delete()
+                    elif hasattr(self.daytona, "delete"):
+                        self.daytona.delete(self.sandbox)
+                logger.info("Sandbox cleaned up successfully")
+            except Exception as e:
+                logger.warning("Sandbox cleanup failed (best effort): %s", e)
+            finally:
+                self.sandbox = None
 
-            # Log the output for observability
-            logger.info("Execution completed")
-            logger.debug("stdout: %s", result_str)
+    def __enter__(self) -> "DaytonaSandbox":
+        """Context manager entry."""
+        self.create()
+        return self
 
-            # Check for Python errors in output
-            # (process succeeded but Python code may have failed)
-            has_error = any(
-                err in result_str
-                for err in ("Error:", "Traceback (most recent call last):")
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: types.TracebackType | None,
+    ) -> None:
+        """Context manager exit."""
+        self.cleanup()
+
+
+class AsyncDaytonaSandbox:
+    """Async wrapper around Daytona sandbox for code execution.
+
+    Mirrors `DaytonaSandbox`, but uses Daytona's async client. Call `close` (or use
+    it as an async context manager) to release the client's HTTP session.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        api_url: str | None = None,
+    ) -> None:
+        """Initialize the async Daytona sandbox manager.
+
+        Args:
+            api_key: Daytona API key.
+
+                Defaults to `DAYTONA_API_KEY` env var.
+            api_url: Daytona API URL.
+
+                Defaults to `DAYTONA_API_URL` env var.
+
+        Raises:
+            ImportError: If `daytona` is not installed.
+            ValueError: If API key is not provided.
+        """
+        self.config = _daytona_config(api_key, api_url)
+        self.daytona = _daytona_sdk().AsyncDaytona(self.config)
+        self.sandbox: Any = None
+
+    @property
+    def sandbox_id(self) -> str | None:
+        """ID of the underlying sandbox, if one has been created or attached."""
+        return self.sandbox.id if self.sandbox else None
+
+    async def create(self, *, auto_delete_interval: int | None = None) -> None:
+        """Create a new sandbox instance.
+
+        Args:
+            auto_delete_interval: Minutes after the sandbox is auto-stopped before
+                it is deleted (`None`: Daytona's default, never).
+        """
+        logger.info("Creating Daytona sandbox...")
+        with timed(SANDBOX_PHASE_DURATION, phase="create"):
+            self.sandbox = await self.daytona.create(
+                _create_params(auto_delete_interval)
             )
-            if has_error:
-                logger.warning("Python error detected in output:\n%s", result_str)
+        logger.info("Sandbox created successfully")
+
+    async def attach(self, sandbox_id: str, *, start: bool = True) -> None:
+        """Attach to an existing sandbox instance.
+
+        Args:
+            sandbox_id: ID of the sandbox to attach to.
+            start: Whether to start the sandbox if it has been auto-stopped.
+        """
+        logger.info("Attaching to Daytona sandbox %s...", sandbox_id)
+        with timed(SANDBOX_PHASE_DURATION, phase="attach"):
+            self.sandbox = await self.daytona.get(sandbox_id)
+        if start and self.sandbox.state != "started":
+            logger.info("Starting stopped sandbox %s...", sandbox_id)
+            await self.sandbox.start()
+        logger.info("Sandbox attached successfully")
+
+    async def install_packages(self, packages: list[str]) -> ExecutionResult:
+        """Install Python packages in the sandbox.
+
+        Args:
+            packages: List of package names to install.
+
+        Returns:
+            `ExecutionResult` with installation output.
+        """
+        if not self.sandbox:
+            return _failure("Sandbox not created")
 
+        if not packages:
             return ExecutionResult(
-                stdout=result_str,
+                stdout="No packages to install",
                 stderr="",
                 exit_code=0,
                 success=True,
             )
+
+        logger.info("Installing packages: %s", packages)
+        try:
+            with timed(SANDBOX_PHASE_DURATION, phase="install"):
+                response = await self.sandbox.process.exec(_install_command(packages))
         except Exception as e:
-            error_str = str(e)
-
-            # Check if it's a timeout
-            if "timeout" in error_str.lower():
-                logger.warning("Execution timed out after %ds", timeout)
-                return ExecutionResult(
-                    stdout="",
-                    stderr=f"Execution timed out after {timeout} seconds",
-                    exit_code=124,
-                    success=False,
-                    error_message="Timeout",
+            logger.exception("Package installation failed")
+            return _failure(str(e))
+        return _install_result(response)
+
+    async def start_package_install(self, packages: list[str]) -> str | None:
+        """Start installing Python packages in the background.
+
+        Args:
+            packages: List of package names to install.
+
+        Returns:
+            ID of the installation command, or `None` if there was nothing to install.
+        """
+        if not self.sandbox or not packages:
+            return None
+
+        logger.info("Starting background install of packages: %s", packages)
+        await self.sandbox.process.create_session(INSTALL_SESSION_ID)
+        response = await self.sandbox.process.execute_session_command(
+            INSTALL_SESSION_ID,
+            _daytona_sdk().SessionExecuteRequest(
+                command=_install_command(packages), run_async=True
+            ),
+        )
+        return str(response.cmd_id)
+
+    async def wait_for_install(
+        self,
+        command_id: str,
+        timeout: int = 600,  # noqa: ASYNC109
+        poll_interval: float = 2.0,
+    ) -> ExecutionResult:
+        """Wait for a background installation started by `start_package_install`.
+
+        Args:
+            command_id: ID of the installation command.
+            timeout: Maximum time to wait in seconds.
+            poll_interval: Time between status checks in seconds.
+
+        Returns:
+            `ExecutionResult` with installation output.
+        """
+        if not self.sandbox:
+            return _failure("Sandbox not created")
+
+        logger.info("Waiting for background package install to finish...")
+        deadline = time.monotonic() + timeout
+        # Only the remaining wait is on the critical path, since the install
+        # started in the background
+        with timed(SANDBOX_PHASE_DURATION, phase="install_wait"):
+            try:
+                while True:
+                    command = await self.sandbox.process.get_session_command(
+                        INSTALL_SESSION_ID, command_id
+                    )
+                    if command.exit_code is not None:
+                        break
+                    if time.monotonic() >= deadline:
+                        return _timeout("Package installation", timeout)
+                    await asyncio.sleep(poll_interval)
+
+                logs = await self.sandbox.process.get_session_command_logs(
+                    INSTALL_SESSION_ID, command_id
                 )
+            except Exception as e:
+                logger.exception("Failed to check package installation")
+                return _failure(str(e), exit_code=INSTALL_STATUS_UNKNOWN)
 
-            # Check if it's a Python error (which is expected for bug reports)
-            # The error output is actually useful information
-            logger.exception("Execution failed")
-            return ExecutionResult(
-                stdout="",
-                stderr=error_str,
-                exit_code=1,
-                success=False,
-                error_message=error_str,
-            )
+        return _background_install_result(command.exit_code, logs)
 
-    def cleanup(self) -> None:
+    async def set_env_vars(self, env_vars: dict[str, str]) -> None:
+        """Set environment variables in the sandbox.
+
+        Args:
+            env_vars: Dictionary of environment variable names and values.
+        """
+        if not self.sandbox or not env_vars:
+            return
+
+        # Export environment variables (best effort)
+        for key, value in env_vars.items():
+            with contextlib.suppress(Exception):
+                await self.sandbox.process.exec(f"export {key}='{value}'")
+
+    async def execute_code(
+        self,
+        code: str,
+        env_vars: dict[str, str] | None = None,
+        timeout: int = 60,  # noqa: ASYNC109
+    ) -> ExecutionResult:
+        """Execute Python code in the sandbox.
+
+        Args:
+            code: Python code to execute.
+            env_vars: Optional environment variables to set.
+            timeout: Timeout in seconds.
+
+        Returns:
+            `ExecutionResult` with execution output.
+        """
+        if not self.sandbox:
+            return _failure("Sandbox not created")
+
+        # Set environment variables if provided
+        if env_vars:
+            await self.set_env_vars(env_vars)
+
+        # Write code to a file
+        logger.debug("Writing code to %s", CODE_PATH)
+        try:
+            with timed(SANDBOX_PHASE_DURATION, phase="write"):
+                await self.sandbox.process.exec(_write_command(code))
+            logger.debug("Code written successfully")
+        except Exception as e:
+            logger.exception("Failed to write code to sandbox")
+            return _failure(str(e), stderr=f"Failed to write code: {e}")
+
+        logger.info("Executing code in sandbox (timeout=%ds)...", timeout)
+        try:
+            with timed(SANDBOX_PHASE_DURATION, phase="exec"):
+                response = await self.sandbox.process.exec(
+                    _run_command(env_vars), timeout=timeout
+                )
+        except Exception as e:
+            return _execution_error_result(e, timeout)
+        return _execution_result(response)
+
+    async def cleanup(self) -> None:
         """Clean up and delete the sandbox."""
         if self.sandbox:
             logger.info("Cleaning up sandbox...")
             try:
-                # Try to delete the sandbox if the method exists
-                if hasattr(self.sandbox, "delete"):
-                    self.sandbox.delete()
-                elif hasattr(self.daytona, "delete"):
-                    self.daytona.delete(self.sandbox)
+                with timed(SANDBOX_PHASE_DURATION, phase="cleanup"):
+                    await self.sandbox.delete()
                 logger.info("Sandbox cleaned up successfully")
             except Exception as e:
                 logger.warning("Sandbox cleanup failed (best effort): %s", e)
             finally:
                 self.sandbox = None
 
-    def __enter__(self) -> "DaytonaSandbox":
-        """Context manager entry."""
-        self.create()
+    async def close(self) -> None:
+        """Close the Daytona client without deleting the sandbox."""
+        with contextlib.suppress(Exception):
+            await self.daytona.close()
+
+    async def __aenter__(self) -> "AsyncDaytonaSandbox":
+        """Async context manager entry."""
+        await self.create()
         return self
 
-    def __exit__(
+    async def __aexit__(
         self,
         exc_type: type[BaseException] | None,
         exc_val: BaseException | None,
         exc_tb: types.TracebackType | None,
     ) -> None:
-        """Context manager exit."""
-        self.cleanup()
+        """Async context manager exit."""
+        await self.cleanup()
+        await self.close()
 
 
 def create_sandbox(
@@ -308,10 +764,12 @@ def execute_in_sandbox(
     api_key: str | None = None,
     api_url: str | None = None,
     timeout: int = 60,
+    handle: SandboxHandle | None = None,
 ) -> ExecutionResult:
     """Execute code in a Daytona sandbox (convenience function).
 
-    Creates a sandbox, installs packages, executes code, and cleans up.
+    Creates a sandbox (or reattaches to a provisioned one), installs packages,
+    executes code, and cleans up.
 
     Args:
         code: Python code to execute.
@@ -320,6 +778,10 @@ def execute_in_sandbox(
         api_key: Optional Daytona API key.
         api_url: Optional Daytona API URL.
         timeout: Execution timeout in seconds.
+        handle: Optional sandbox from `provision_sandbox` to reuse.
+
+            Its background installation is awaited instead of installing again,
+            unless its status cannot be read (e.g. the sandbox was restarted).
 
     Returns:
         `ExecutionResult` with execution output.
@@ -330,10 +792,35 @@ def execute_in_sandbox(
         timeout,
     )
     try:
-        with DaytonaSandbox(api_key=api_key, api_url=api_url) as sandbox:
-            # Install packages if specified
-            if packages:
-                install_result = sandbox.install_packages(packages)
+        sandbox = DaytonaSandbox(api_key=api_key, api_url=api_url)
+        if handle is not None:
+            try:
+                sandbox.attach(handle["sandbox_id"])
+            except Exception as e:
+                logger.warning(
+                    "Could not reattach to sandbox %s, creating a new one: %s",
+                    handle["sandbox_id"],
+                    e,
+                )
+                handle = None
+        if handle is None:
+            sandbox.create()
+
+        try:
+            # Install packages, reusing a background install if one was started
+            remaining = list(packages or [])
+            if handle is not None and handle["install_command_id"]:
+                install_result = sandbox.wait_for_install(handle["install_command_id"])
+                if install_result.exit_code == INSTALL_STATUS_UNKNOWN:
+                    # e.g. the sandbox was restarted: install everything again
+                    logger.warning("Background install was lost, installing again")
+                elif not install_result.success:
+                    logger.error("Package installation failed, aborting execution")
+                    return install_result
+                else:
+                    remaining = [p for p in remaining if p not in handle["packages"]]
+            if remaining:
+                install_result = sandbox.install_packages(remaining)
                 if not install_result.success:
                     logger.error("Package installation failed, aborting execution")
                     return install_result
@@ -346,6 +833,8 @@ def execute_in_sandbox(
                 result.exit_code,
             )
             return result
+        finally:
+            sandbox.cleanup()
     except ImportError:
         logger.warning("Daytona SDK not available")
         return ExecutionResult(
@@ -357,10 +846,241 @@ def execute_in_sandbox(
         )
     except Exception as e:
         logger.exception("Unexpected error during sandbox execution")
+        return _failure(str(e))
+
+
+async def aexecute_in_sandbox(
+    code: str,
+    packages: list[str] | None = None,
+    env_vars: dict[str, str] | None = None,
+    api_key: str | None = None,
+    api_url: str | None = None,
+    timeout: int = 60,  # noqa: ASYNC109
+    handle: SandboxHandle | None = None,
+) -> ExecutionResult:
+    """Async version of `execute_in_sandbox`.
+
+    Args:
+        code: Python code to execute.
+        packages: Optional packages to install.
+        env_vars: Optional environment variables.
+        api_key: Optional Daytona API key.
+        api_url: Optional Daytona API URL.
+        timeout: Execution timeout in seconds.
+        handle: Optional sandbox from `provision_sandbox` to reuse.
+
+    Returns:
+        `ExecutionResult` with execution output.
+    """
+    logger.info(
+        "Starting sandbox execution (packages=%s, timeout=%ds)",
+        packages or [],
+        timeout,
+    )
+    try:
+        sandbox = AsyncDaytonaSandbox(api_key=api_key, api_url=api_url)
+        try:
+            if handle is not None:
+                try:
+                    await sandbox.attach(handle["sandbox_id"])
+                except Exception as e:
+                    logger.warning(
+                        "Could not reattach to sandbox %s, creating a new one: %s",
+                        handle["sandbox_id"],
+                        e,
+                    )
+                    handle = None
+            if handle is None:
+                await sandbox.create()
+
+            # Install packages, reusing a background install if one was started
+            remaining = list(packages or [])
+            if handle is not None and handle["install_command_id"]:
+                install_result = await sandbox.wait_for_install(
+                    handle["install_command_id"]
+                )
+                if install_result.exit_code == INSTALL_STATUS_UNKNOWN:
+                    # e.g. the sandbox was restarted: install everything again
+                    logger.warning("Background install was lost, installing again")
+                elif not install_result.success:
+                    logger.error("Package installation failed, aborting execution")
+                    return install_result
+                else:
+                    remaining = [p for p in remaining if p not in handle["packages"]]
+            if remaining:
+                install_result = await sandbox.install_packages(remaining)
+                if not install_result.success:
+                    logger.error("Package installation failed, aborting execution")
+                    return install_result
+
+            # Execute code
+            result = await sandbox.execute_code(
+                code, env_vars=env_vars, timeout=timeout
+            )
+            logger.info(
+                "Sandbox execution finished (success=%s, exit_code=%d)",
+                result.success,
+                result.exit_code,
+            )
+            return result
+        finally:
+            await sandbox.cleanup()
+            await sandbox.close()
+    except ImportError:
+        logger.warning("Daytona SDK not available")
         return ExecutionResult(
             stdout="",
-            stderr=str(e),
+            stderr="Daytona SDK not installed",
             exit_code=1,
             success=False,
-            error_message=str(e),
+            error_message="Daytona SDK not available",
+        )
+    except Exception as e:
+        logger.exception("Unexpected error during sandbox execution")
+        return _failure(str(e))
+
+
+def sandbox_available() -> bool:
+    """Check whether sandboxes can be created in this environment.
+
+    Returns:
+        `True` if the Daytona SDK is installed and an API key is configured.
+    """
+    return DAYTONA_AVAILABLE and bool(os.environ.get("DAYTONA_API_KEY"))
+
+
+def provision_sandbox(
+    packages: list[str],
+    api_key: str | None = None,
+    api_url: str | None = None,
+) -> SandboxHandle | None:
+    """Create a sandbox and start installing packages into it in the background.
+
+    The sandbox is kept alive for a later `execute_in_sandbox` call, which can
+    happen in another process. If it is never used (e.g. the run is abandoned at
+    the human-in-the-loop interrupt), Daytona deletes it
+    `PROVISIONED_AUTO_DELETE_MINUTES` after auto-stopping it.
+
+    Args:
+        packages: Packages to install.
+        api_key: Optional Daytona API key.
+        api_url: Optional Daytona API URL.
+
+    Returns:
+        A handle to the provisioned sandbox, or `None` if provisioning failed.
+    """
+    sandbox: DaytonaSandbox | None = None
+    try:
+        sandbox = DaytonaSandbox(api_key=api_key, api_url=api_url)
+        sandbox.create(auto_delete_interval=PROVISIONED_AUTO_DELETE_MINUTES)
+        install_command_id = sandbox.start_package_install(packages)
+        sandbox_id = sandbox.sandbox_id
+    except Exception:
+        logger.exception("Speculative sandbox provisioning failed")
+        if sandbox is not None:
+            sandbox.cleanup()
+        return None
+
+    if sandbox_id is None:
+        return None
+
+    logger.info("Provisioned sandbox %s", sandbox_id)
+    return SandboxHandle(
+        sandbox_id=sandbox_id,
+        packages=list(packages),
+        install_command_id=install_command_id,
+    )
+
+
+async def aprovision_sandbox(
+    packages: list[str],
+    api_key: str | None = None,
+    api_url: str | None = None,
+) -> SandboxHandle | None:
+    """Async version of `provision_sandbox`.
+
+    Args:
+        packages: Packages to install.
+        api_key: Optional Daytona API key.
+        api_url: Optional Daytona API URL.
+
+    Returns:
+        A handle to the provisioned sandbox, or `None` if provisioning failed.
+    """
+    sandbox: AsyncDaytonaSandbox | None = None
+    try:
+        sandbox = AsyncDaytonaSandbox(api_key=api_key, api_url=api_url)
+        await sandbox.create(auto_delete_interval=PROVISIONED_AUTO_DELETE_MINUTES)
+        install_command_id = await sandbox.start_package_install(packages)
+        sandbox_id = sandbox.sandbox_id
+    except Exception:
+        logger.exception("Speculative sandbox provisioning failed")
+        if sandbox is not None:
+            await sandbox.cleanup()
+        return None
+    finally:
+        if sandbox is not None:
+            await sandbox.close()
+
+    if sandbox_id is None:
+        return None
+
+    logger.info("Provisioned sandbox %s", sandbox_id)
+    return SandboxHandle(
+        sandbox_id=sandbox_id,
+        packages=list(packages),
+        install_command_id=install_command_id,
+    )
+
+
+def discard_sandbox(
+    handle: SandboxHandle,
+    api_key: str | None = None,
+    api_url: str | None = None,
+) -> None:
+    """Delete a provisioned sandbox that will not be used (best effort).
+
+    Args:
+        handle: Handle returned by `provision_sandbox`.
+        api_key: Optional Daytona API key.
+        api_url: Optional Daytona API URL.
+    """
+    try:
+        sandbox = DaytonaSandbox(api_key=api_key, api_url=api_url)
+        sandbox.attach(handle["sandbox_id"], start=False)
+    except Exception as e:
+        logger.warning(
+            "Could not discard sandbox %s (best effort): %s", handle["sandbox_id"], e
+        )
+        return
+    sandbox.cleanup()
+
+
+async def adiscard_sandbox(
+    handle: SandboxHandle,
+    api_key: str | None = None,
+    api_url: str | None = None,
+) -> None:
+    """Async version of `discard_sandbox`.
+
+    Args:
+        handle: Handle returned by `provision_sandbox`.
+        api_key: Optional Daytona API key.
+        api_url: Optional Daytona API URL.
+    """
+    try:
+        sandbox = AsyncDaytonaSandbox(api_key=api_key, api_url=api_url)
+    except Exception as e:
+        logger.warning(
+            "Could not discard sandbox %s (best effort): %s", handle["sandbox_id"], e
+        )
+        return
+    try:
+        await sandbox.attach(handle["sandbox_id"], start=False)
+        await sandbox.cleanup()
+    except Exception as e:
+        logger.warning(
+            "Could not discard sandbox %s (best effort): %s", handle["sandbox_id"], e
         )
+    finally:
+        await sandbox.close()
@@ -0,0 +1,146 @@
+"""Persistent cache of PyPI package metadata.
+
+The version validator looks up the same few packages (mostly `langchain-*`) for
+almost every issue, and each lookup downloads the package's full JSON document.
+`PyPICache` keeps the part of it the checker uses, with the document's `ETag`:
+within `fresh_for` of a fetch, lookups are answered from the cache without a
+request; after that, the checker revalidates with `If-None-Match`, which PyPI
+answers with an empty `304 Not Modified` until a new release. If revalidation
+fails, the stale entry is used rather than failing the lookup.
+
+Enable it with `set_pypi_cache`.
+"""
+
+import json
+import re
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import cast
+
+from typing_extensions import TypedDict
+
+from open_mre.llm_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, SQLiteCache
+
+DEFAULT_FRESH_FOR = timedelta(hours=1)
+
+# Bump when `PyPIMetadata` changes, so older entries are fetched again
+PYPI_CACHE_VERSION = 3
+
+
+class PyPIMetadata(TypedDict):
+    """The part of a PyPI JSON document the checker uses."""
+
+    latest_version: str
+    # Upload date (`YYYY-MM-DD`) of the latest version's first file
+    latest_release_date: str | None
+    yanked_versions: list[str]
+    # Every release with a valid PEP 440 version, oldest first
+    releases: list[str]
+
+
+class PyPICacheEntry(TypedDict):
+    """Cached metadata of a package."""
+
+    metadata: PyPIMetadata
+    etag: str | None
+    fetched_at: float
+
+
+def normalize_name(package_name: str) -> str:
+    """Normalize a package name as PyPI does (PEP 503).
+
+    Args:
+        package_name: The name, e.g. `'LangChain_Core'`.
+
+    Returns:
+        The normalized name, e.g. `'langchain-core'`.
+    """
+    return re.sub(r"[-_.]+", "-", package_name).lower()
+
+
+class PyPICache(SQLiteCache):
+    """PyPI package metadata in a SQLite database, shared across processes."""
+
+    table = "pypi_metadata"
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        fresh_for: timedelta = DEFAULT_FRESH_FOR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: timedelta | None = DEFAULT_TTL,
+    ) -> None:
+        """Open (creating if needed) a cache database.
+
+        Args:
+            path: Path to the database file.
+            fresh_for: How long after a fetch metadata is used without
+                revalidating it.
+            max_bytes: Maximum total size of the stored metadata.
+            ttl: How long metadata is kept for revalidation, and as a fallback
+                when PyPI cannot be reached. `None` to keep it until it is evicted.
+        """
+        super().__init__(path, max_bytes=max_bytes, ttl=ttl)
+        self.fresh_for = fresh_for
+
+    @staticmethod
+    def _key(package_name: str) -> str:
+        return f"{PYPI_CACHE_VERSION}:{normalize_name(package_name)}"
+
+    def get(self, package_name: str) -> PyPICacheEntry | None:
+        """Get the cached metadata of a package.
+
+        Args:
+            package_name: The package name.
+
+        Returns:
+            The entry, or `None` if the package is not cached.
+        """
+        value = self._get(self._key(package_name))
+        return None if value is None else cast("PyPICacheEntry", json.loads(value))
+
+    def put(self, package_name: str, metadata: PyPIMetadata, etag: str | None) -> None:
+        """Store the metadata of a package, fetched or revalidated just now.
+
+        Args:
+            package_name: The package name.
+            metadata: The metadata.
+            etag: The `ETag` of the JSON document, if PyPI sent one.
+        """
+        entry = PyPICacheEntry(metadata=metadata, etag=etag, fetched_at=time.time())
+        self._put(self._key(package_name), json.dumps(entry))
+
+    def is_fresh(self, entry: PyPICacheEntry) -> bool:
+        """Check whether an entry can be used without revalidating it.
+
+        Args:
+            entry: The entry.
+
+        Returns:
+            Whether it was fetched or revalidated within `fresh_for`.
+        """
+        return time.time() - entry["fetched_at"] < self.fresh_for.total_seconds()
+
+
+_pypi_cache: PyPICache | None = None
+
+
+def get_pypi_cache() -> PyPICache | None:
+    """Get the PyPI metadata cache, if one is set.
+
+    Returns:
+        The cache, or `None`.
+    """
+    return _pypi_cache
+
+
+def set_pypi_cache(cache: PyPICache | None) -> None:
+    """Set the PyPI metadata cache used by `check_pypi_version`.
+
+    Args:
+        cache: The cache, or `None` to disable caching.
+    """
+    global _pypi_cache  # noqa: PLW0603
+    _pypi_cache = cache
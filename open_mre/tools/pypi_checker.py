@@ -1,18 +1,310 @@
 """PyPI package version checking tool."""
 
+import asyncio
+import threading
+import weakref
+from collections.abc import Iterable, Sequence
+from typing import Any
+
 import httpx
-from langchain_core.tools import tool
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from langchain_core.tools import StructuredTool
+from packaging.version import InvalidVersion, Version
+from typing_extensions import TypedDict
+
+from open_mre.metrics import (
+    PYPI_CACHE_REQUESTS,
+    PYPI_REQUEST_DURATION,
+    PYPI_REQUESTS,
+    increment,
+    timed,
+)
+from open_mre.tools.pypi_cache import (
+    PyPICacheEntry,
+    PyPIMetadata,
+    get_pypi_cache,
+    normalize_name,
+)
+from open_mre.tools.pypi_index import PyPIIndex, get_pypi_index
+
+PYPI_TIMEOUT = 5.0
+
+# Connections kept open to pypi.org, shared by all lookups in the process
+PYPI_MAX_CONNECTIONS = 20
+_LIMITS = httpx.Limits(
+    max_connections=PYPI_MAX_CONNECTIONS,
+    max_keepalive_connections=PYPI_MAX_CONNECTIONS,
+)
+
+_clients_lock = threading.Lock()
+_client: httpx.Client | None = None
+# Async clients cannot be shared across event loops
+_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+
+class PyPILookup(TypedDict):
+    """Result of a package lookup; fields are `None` if it failed."""
+
+    package: str
+    latest_version: str | None
+    latest_release_date: str | None
+    yanked_versions: list[str] | None
+    error: str | None
+
+
+def _get_client() -> httpx.Client:
+    """Get the shared keep-alive client."""
+    global _client  # noqa: PLW0603
+    with _clients_lock:
+        if _client is None:
+            _client = httpx.Client(
+                timeout=PYPI_TIMEOUT, follow_redirects=True, limits=_LIMITS
+            )
+        return _client
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Get the shared keep-alive client of the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=PYPI_TIMEOUT, follow_redirects=True, limits=_LIMITS
+            )
+            _async_clients[loop] = client
+        return client
+
+
+def close_pypi_clients() -> None:
+    """Close the shared client; the next lookups open a new one.
+
+    Async clients can only be closed from their event loop, with
+    `aclose_pypi_clients`.
+    """
+    global _client  # noqa: PLW0603
+    with _clients_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+async def aclose_pypi_clients() -> None:
+    """Close the running event loop's client; the next lookups open a new one.
+
+    Call it before the loop ends (e.g. at the end of the coroutine passed to
+    `asyncio.run`), so that its connections are closed.
+    """
+    with _clients_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _pypi_url(package_name: str) -> str:
+    """Build the PyPI JSON API URL for a package."""
+    return f"https://pypi.org/pypi/{normalize_name(package_name)}/json"
+
+
+def _request_headers(entry: PyPICacheEntry | None) -> dict[str, str]:
+    """Build the headers revalidating a cached entry, if there is one."""
+    if entry is None or not entry["etag"]:
+        return {}
+    return {"If-None-Match": entry["etag"]}
+
+
+def _release_date(files: list[dict[str, Any]]) -> str | None:
+    """Get the upload date of a release's first file."""
+    times = [f.get("upload_time_iso_8601") or f.get("upload_time") for f in files]
+    uploaded = [t for t in times if t]
+    return min(uploaded)[:10] if uploaded else None
+
+
+def _sorted_releases(versions: Iterable[str]) -> list[str]:
+    """Sort versions in PEP 440 order, dropping invalid (pre-PEP 440) ones."""
+    parsed: list[tuple[Version, str]] = []
+    for version in versions:
+        try:
+            parsed.append((Version(version), version))
+        except InvalidVersion:
+            continue
+    return [version for _, version in sorted(parsed)]
+
+
+def _metadata(data: dict[str, Any]) -> PyPIMetadata:
+    """Extract the metadata the checker uses from a PyPI JSON document."""
+    latest_version = data["info"]["version"]
+    releases: dict[str, list[dict[str, Any]]] = data.get("releases") or {}
+    return PyPIMetadata(
+        latest_version=latest_version,
+        latest_release_date=_release_date(
+            releases.get(latest_version) or data.get("urls") or []
+        ),
+        # A release is yanked when all of its files are
+        yanked_versions=[
+            version
+            for version, files in releases.items()
+            if files and all(f.get("yanked") for f in files)
+        ],
+        # Releases without files were never installable
+        releases=_sorted_releases(v for v, files in releases.items() if files),
+    )
+
+
+def _read_response(
+    package_name: str, response: Any, entry: PyPICacheEntry | None
+) -> PyPIMetadata:
+    """Get the metadata from a PyPI JSON API response, and cache it."""
+    cache = get_pypi_cache()
+    if response.status_code == httpx.codes.NOT_MODIFIED and entry is not None:
+        increment(PYPI_CACHE_REQUESTS, outcome="revalidated")
+        metadata, etag = entry["metadata"], entry["etag"]
+    else:
+        response.raise_for_status()
+        if cache is not None:
+            increment(PYPI_CACHE_REQUESTS, outcome="miss")
+        metadata = _metadata(response.json())
+        etag = response.headers.get("etag")
+
+    if cache is not None:
+        cache.put(package_name, metadata, etag)
+    return metadata
+
+
+def _result(package_name: str, metadata: PyPIMetadata) -> PyPILookup:
+    """Build the result returned when a lookup succeeds."""
+    return PyPILookup(
+        package=package_name,
+        latest_version=metadata["latest_version"],
+        latest_release_date=metadata["latest_release_date"],
+        yanked_versions=metadata["yanked_versions"],
+        error=None,
+    )
+
+
+def _error_result(package_name: str, error: Exception) -> PyPILookup:
+    """Build the result returned when a lookup fails."""
+    return PyPILookup(
+        package=package_name,
+        latest_version=None,
+        latest_release_date=None,
+        yanked_versions=None,
+        error=str(error),
+    )
+
+
+# A lookup's result for the model, and the metadata it was built from (if found),
+# which is passed on as the tool message artifact
+Lookup = tuple[PyPILookup, PyPIMetadata | None]
+
+
+def _found(package_name: str, metadata: PyPIMetadata) -> Lookup:
+    """Build the lookup of a package that was found."""
+    return _result(package_name, metadata), metadata
+
+
+def _index_lookup(package_name: str) -> Lookup | None:
+    """Look a package up in the selected offline index, if there is one."""
+    index = get_pypi_index()
+    if index is None:
+        return None
+    metadata = index.get(package_name)
+    if metadata is None:
+        error = LookupError(f"{package_name} is not in the offline PyPI index")
+        return _error_result(package_name, error), None
+    return _found(package_name, metadata)
+
+
+def _cached_entry(package_name: str) -> tuple[PyPICacheEntry | None, bool]:
+    """Get the cached entry of a package, and whether it is fresh."""
+    cache = get_pypi_cache()
+    entry = cache.get(package_name) if cache else None
+    fresh = cache is not None and entry is not None and cache.is_fresh(entry)
+    if fresh:
+        increment(PYPI_CACHE_REQUESTS, outcome="fresh")
+    return entry, fresh
+
+
+def _failed_lookup(
+    package_name: str, entry: PyPICacheEntry | None, error: Exception
+) -> Lookup:
+    """Fall back to a stale cached entry, if there is one."""
+    if entry is None:
+        return _error_result(package_name, error), None
+    increment(PYPI_CACHE_REQUESTS, outcome="stale")
+    return _found(package_name, entry["metadata"])
 
 
-@tool
-def check_pypi_version(package_name: str) -> dict[str, str | None]:
+def _counted(lookup: Lookup) -> Lookup:
+    """Count a lookup by outcome, and pass it through."""
+    increment(PYPI_REQUESTS, outcome="error" if lookup[0]["error"] else "ok")
+    return lookup
+
+
+def _lookup(package_name: str) -> Lookup:
+    """Look a package up in the index, the cache, or on PyPI."""
+    indexed = _index_lookup(package_name)
+    if indexed is not None:
+        return indexed
+
+    entry, fresh = _cached_entry(package_name)
+    if fresh and entry is not None:
+        return _counted(_found(package_name, entry["metadata"]))
+
+    try:
+        with timed(PYPI_REQUEST_DURATION):
+            response = _get_client().get(
+                _pypi_url(package_name), headers=_request_headers(entry)
+            )
+        lookup = _found(package_name, _read_response(package_name, response, entry))
+    except Exception as e:
+        lookup = _failed_lookup(package_name, entry, e)
+    return _counted(lookup)
+
+
+async def _alookup(package_name: str) -> Lookup:
+    """Async version of `_lookup`."""
+    indexed = _index_lookup(package_name)
+    if indexed is not None:
+        return indexed
+
+    entry, fresh = _cached_entry(package_name)
+    if fresh and entry is not None:
+        return _counted(_found(package_name, entry["metadata"]))
+
+    try:
+        with timed(PYPI_REQUEST_DURATION):
+            response = await _get_async_client().get(
+                _pypi_url(package_name), headers=_request_headers(entry)
+            )
+        lookup = _found(package_name, _read_response(package_name, response, entry))
+    except Exception as e:
+        lookup = _failed_lookup(package_name, entry, e)
+    return _counted(lookup)
+
+
+def _artifact(lookups: Iterable[Lookup]) -> dict[str, PyPIMetadata]:
+    """Map the packages that were found to their metadata."""
+    return {
+        result["package"]: metadata
+        for result, metadata in lookups
+        if metadata is not None
+    }
+
+
+def _check_pypi_version(
+    package_name: str,
+) -> tuple[PyPILookup, dict[str, PyPIMetadata]]:
     """Query PyPI JSON API to get latest version of a package.
 
     Args:
         package_name: Name of Python package (e.g., `'requests'`)
 
     Returns:
-        A dictionary with the latest version or an error message.
+        A dictionary with the latest version, its release date, and the yanked
+        versions, or an error message.
 
     Example:
         ```python
@@ -20,27 +312,105 @@ def check_pypi_version(package_name: str) -> dict[str, str | None]:
         print(result)
         ```
         ```python
-        {"package": "requests", "latest_version": "2.31.0", "error": null}
+        {
+            "package": "requests",
+            "latest_version": "2.32.3",
+            "latest_release_date": "2024-05-29",
+            "yanked_versions": ["2.32.0", "2.32.1"],
+            "error": null,
+        }
         ```
     """
-    try:
-        response = httpx.get(
-            f"https://pypi.org/pypi/{package_name}/json",
-            timeout=5.0,
-            follow_redirects=True,
-        )
-        response.raise_for_status()
+    lookup = _lookup(package_name)
+    return lookup[0], _artifact([lookup])
 
-        data = response.json()
 
-        return {
-            "package": package_name,
-            "latest_version": data["info"]["version"],
-            "error": None,
-        }
-    except Exception as e:
-        return {
-            "package": package_name,
-            "latest_version": None,
-            "error": str(e),
-        }
+async def _acheck_pypi_version(
+    package_name: str,
+) -> tuple[PyPILookup, dict[str, PyPIMetadata]]:
+    """Async version of `_check_pypi_version`."""
+    lookup = await _alookup(package_name)
+    return lookup[0], _artifact([lookup])
+
+
+# Built explicitly (rather than with `@tool`) so that `ainvoke` uses a native
+# coroutine instead of running the blocking request in a thread. The model gets
+# the results; the full metadata (e.g. the release history, for comparing
+# versions) is attached to the tool message as its artifact, by package name.
+check_pypi_version = StructuredTool.from_function(
+    func=_check_pypi_version,
+    coroutine=_acheck_pypi_version,
+    name="check_pypi_version",
+    response_format="content_and_artifact",
+)
+
+
+def _check_pypi_versions(
+    package_names: list[str],
+) -> tuple[list[PyPILookup], dict[str, PyPIMetadata]]:
+    """Query PyPI JSON API for the latest versions of several packages at once.
+
+    Args:
+        package_names: Names of Python packages (e.g., `['requests', 'httpx']`)
+
+    Returns:
+        One result per package, in order, as returned by `check_pypi_version`.
+    """
+    if not package_names:
+        return [], {}
+    workers = min(len(package_names), PYPI_MAX_CONNECTIONS)
+    with ContextThreadPoolExecutor(max_workers=workers) as executor:
+        lookups = list(executor.map(_lookup, package_names))
+    return [result for result, _ in lookups], _artifact(lookups)
+
+
+async def _acheck_pypi_versions(
+    package_names: list[str],
+) -> tuple[list[PyPILookup], dict[str, PyPIMetadata]]:
+    """Async version of `_check_pypi_versions`."""
+    lookups = await asyncio.gather(*(_alookup(name) for name in package_names))
+    return [result for result, _ in lookups], _artifact(lookups)
+
+
+check_pypi_versions = StructuredTool.from_function(
+    func=_check_pypi_versions,
+    coroutine=_acheck_pypi_versions,
+    name="check_pypi_versions",
+    response_format="content_and_artifact",
+)
+
+
+def _fetch_metadata(package_name: str) -> PyPIMetadata:
+    """Download the metadata of a package, bypassing the cache and the index."""
+    with timed(PYPI_REQUEST_DURATION):
+        response = _get_client().get(_pypi_url(package_name))
+    response.raise_for_status()
+    return _metadata(response.json())
+
+
+def refresh_pypi_index(
+    index: PyPIIndex, package_names: Sequence[str]
+) -> dict[str, str]:
+    """Download the current metadata of packages into an index, concurrently.
+
+    Packages that cannot be downloaded keep their indexed metadata, if any.
+
+    Args:
+        index: The index to update.
+        package_names: The packages to refresh.
+
+    Returns:
+        The error of each package that could not be refreshed.
+    """
+    errors: dict[str, str] = {}
+
+    def refresh(package_name: str) -> None:
+        try:
+            index.update(package_name, _fetch_metadata(package_name))
+        except Exception as e:
+            errors[package_name] = str(e)
+
+    workers = max(min(len(package_names), PYPI_MAX_CONNECTIONS), 1)
+    with ContextThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(refresh, package_names))
+    return errors
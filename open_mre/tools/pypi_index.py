@@ -0,0 +1,215 @@
+"""Offline snapshot of PyPI package metadata.
+
+`PyPIIndex` is a JSON file mapping package names to the metadata version checks use
+(the latest version, its release date, the yanked versions, and every release in
+PEP 440 order). When an index is selected as the data source (`--pypi-index`, or
+`set_pypi_index`), `check_pypi_version` reads it instead of pypi.org: lookups are
+in-memory and never touch the network, so runs work without network access and
+give the same answers every time.
+
+The index is refreshed in bulk with `open-mre pypi-index`.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from collections.abc import Mapping, Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from open_mre.tools.pypi_cache import PyPIMetadata, normalize_name
+
+# Bump when the file layout or `PyPIMetadata` changes
+INDEX_FORMAT = 1
+
+# Packages indexed by `open-mre pypi-index` when the index is new and none are given
+DEFAULT_INDEX_PACKAGES = (
+    "langchain",
+    "langchain-anthropic",
+    "langchain-aws",
+    "langchain-classic",
+    "langchain-community",
+    "langchain-core",
+    "langchain-google-genai",
+    "langchain-mcp-adapters",
+    "langchain-ollama",
+    "langchain-openai",
+    "langchain-text-splitters",
+    "langgraph",
+    "langgraph-checkpoint",
+    "langgraph-prebuilt",
+    "langsmith",
+)
+
+
+class PyPIIndex:
+    """Package metadata snapshot, keyed on normalized package names."""
+
+    def __init__(
+        self,
+        packages: Mapping[str, PyPIMetadata] | None = None,
+        *,
+        refreshed_at: str | None = None,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            packages: Metadata by package name.
+            refreshed_at: When the index was last refreshed (ISO 8601).
+        """
+        self.packages = {
+            normalize_name(name): metadata
+            for name, metadata in (packages or {}).items()
+        }
+        self.refreshed_at = refreshed_at
+
+    @classmethod
+    def load(cls, path: str | Path) -> "PyPIIndex":
+        """Read an index file.
+
+        Args:
+            path: Path to the file.
+
+        Returns:
+            The index.
+
+        Raises:
+            ValueError: If the file is not an index in the current format.
+        """
+        data: Any = json.loads(Path(path).read_text())
+        if not isinstance(data, dict) or data.get("format") != INDEX_FORMAT:
+            msg = f"{path} is not a PyPI index in format {INDEX_FORMAT}"
+            raise ValueError(msg)
+        return cls(data["packages"], refreshed_at=data.get("refreshed_at"))
+
+    def save(self, path: str | Path) -> None:
+        """Write the index file, replacing it atomically.
+
+        Args:
+            path: Path to the file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "format": INDEX_FORMAT,
+            "refreshed_at": self.refreshed_at,
+            "packages": dict(sorted(self.packages.items())),
+        }
+        # Readers (e.g. concurrent runs) see the old or the new file, never a part
+        with tempfile.NamedTemporaryFile(
+            "w", dir=path.parent, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(data, f, separators=(",", ":"))
+        Path(f.name).replace(path)
+
+    def get(self, package_name: str) -> PyPIMetadata | None:
+        """Get the metadata of a package.
+
+        Args:
+            package_name: The package name, in any PEP 503 spelling.
+
+        Returns:
+            The metadata, or `None` if the package is not indexed.
+        """
+        return self.packages.get(normalize_name(package_name))
+
+    def update(self, package_name: str, metadata: PyPIMetadata) -> None:
+        """Set the metadata of a package.
+
+        Args:
+            package_name: The package name.
+            metadata: The metadata.
+        """
+        self.packages[normalize_name(package_name)] = metadata
+
+    def __len__(self) -> int:
+        """Count the indexed packages."""
+        return len(self.packages)
+
+
+_pypi_index: PyPIIndex | None = None
+
+
+def get_pypi_index() -> PyPIIndex | None:
+    """Get the index selected as the data source of version checks, if any.
+
+    Returns:
+        The index, or `None` when version checks use pypi.org.
+    """
+    return _pypi_index
+
+
+def set_pypi_index(index: PyPIIndex | None) -> None:
+    """Select an index as the data source of version checks.
+
+    Args:
+        index: The index, or `None` to use pypi.org.
+    """
+    global _pypi_index  # noqa: PLW0603
+    _pypi_index = index
+
+
+def parse_pypi_index_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse the arguments of `open-mre pypi-index`.
+
+    Args:
+        argv: Command-line arguments following `pypi-index`.
+
+    Returns:
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="open-mre pypi-index",
+        description=(
+            "Create or refresh an offline PyPI index, for use with --pypi-index"
+        ),
+    )
+    parser.add_argument("index", type=Path, help="Index file to create or refresh")
+    parser.add_argument(
+        "packages",
+        nargs="*",
+        help=(
+            "Packages to add or refresh (default: the packages already in the "
+            "index, or the LangChain packages for a new index)"
+        ),
+    )
+    return parser.parse_args(argv)
+
+
+def pypi_index_main(argv: Sequence[str] | None = None) -> int:
+    """Entry point for `open-mre pypi-index`.
+
+    Args:
+        argv: Command-line arguments following `pypi-index`.
+
+    Returns:
+        Exit code (`0`: every package was refreshed, non-zero: failure).
+    """
+    args = parse_pypi_index_args(argv)
+
+    try:
+        index = PyPIIndex.load(args.index) if args.index.exists() else PyPIIndex()
+    except (OSError, ValueError) as e:
+        print(f"Error: Invalid PyPI index: {e}", file=sys.stderr)
+        return 1
+    package_names = args.packages or list(index.packages) or DEFAULT_INDEX_PACKAGES
+
+    # Imported here: the lookup code pulls in LangChain
+    from open_mre.tools.pypi_checker import refresh_pypi_index
+
+    errors = refresh_pypi_index(index, package_names)
+    # A refresh that failed entirely leaves the index as stale as it was
+    if len(errors) < len(package_names):
+        index.refreshed_at = datetime.now(UTC).isoformat(timespec="seconds")
+    index.save(args.index)
+
+    for name, error in errors.items():
+        print(f"Error: Could not refresh {name}: {error}", file=sys.stderr)
+    refreshed = len(package_names) - len(errors)
+    print(
+        f"Refreshed {refreshed} of {len(package_names)} package(s) in {args.index} "
+        f"({len(index)} indexed)"
+    )
+    return 1 if errors else 0
@@ -0,0 +1,85 @@
+"""Shared fixtures for unit tests."""
+
+from collections.abc import Iterator, Sequence
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+
+from open_mre.coordinator import clear_coordinator_cache
+from open_mre.models import clear_model_cache
+
+
+class PromptRoutedChatModel(BaseChatModel):
+    """Fake chat model that answers based on the system prompt it receives.
+
+    `responses` maps a substring of the system prompt to the reply text. Calls whose
+    system prompt matches no key get an empty reply.
+    """
+
+    responses: dict[str, str]
+    calls: list[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "prompt-routed-fake"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        system_prompt = next(
+            (m.text for m in messages if isinstance(m, SystemMessage)), ""
+        )
+        reply = ""
+        for key, candidate in self.responses.items():
+            if key in system_prompt:
+                self.calls.append(key)
+                reply = candidate
+                break
+        # Count words as tokens, so tests can check usage accounting
+        input_tokens = sum(len(m.text.split()) for m in messages)
+        output_tokens = len(reply.split())
+        message = AIMessage(
+            content=reply,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(
+        self,
+        tools: Sequence[Any],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable[Any, Any]:
+        return self
+
+
+@pytest.fixture
+def fake_chat_model() -> Iterator[PromptRoutedChatModel]:
+    """Serve a `PromptRoutedChatModel` to every agent.
+
+    Tests configure replies by assigning to `fake_chat_model.responses`.
+    """
+    model = PromptRoutedChatModel(responses={}, calls=[])
+    clear_model_cache()
+    clear_coordinator_cache()
+    try:
+        with patch("open_mre.models.init_chat_model", return_value=model):
+            yield model
+    finally:
+        clear_model_cache()
+        clear_coordinator_cache()
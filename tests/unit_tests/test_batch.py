@@ -0,0 +1,118 @@
+"""Tests for batch validation."""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from open_mre.batch import BatchIssue, load_issues, run_batch
+from open_mre.blobs import InMemoryBlobStore, load_blob, set_blob_store, store_blob
+
+
+class FakeCoordinator:
+    """Stand-in coordinator that records how many runs overlap."""
+
+    checkpointer = None
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.max_active = 0
+
+    async def ainvoke(self, state: dict[str, Any], config: Any) -> dict[str, Any]:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        issue_content = load_blob(state["issue_content"])
+        if "boom" in issue_content:
+            msg = "model unavailable"
+            raise RuntimeError(msg)
+        return {
+            "validation_report": store_blob(f"# Report for {issue_content}"),
+            "termination_reason": "No code snippets found",
+            "draft_comments": ["Please add an MRE."],
+        }
+
+    async def aget_state(self, config: Any) -> SimpleNamespace:
+        return SimpleNamespace(tasks=[])
+
+
+def test_load_issues_from_directory(tmp_path: Path) -> None:
+    (tmp_path / "b.md").write_text("second")
+    (tmp_path / "a.md").write_text("first")
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    issues = load_issues(tmp_path)
+
+    assert [(i.issue_id, i.content) for i in issues] == [
+        ("a", "first"),
+        ("b", "second"),
+    ]
+
+
+def test_load_issues_from_jsonl(tmp_path: Path) -> None:
+    source = tmp_path / "issues.jsonl"
+    source.write_text(
+        json.dumps({"number": 123, "title": "Crash", "body": "details"})
+        + "\n\n"
+        + json.dumps({"content": "no id"})
+        + "\n"
+    )
+
+    issues = load_issues(source)
+
+    assert [(i.issue_id, i.content) for i in issues] == [
+        ("123", "# Crash\n\ndetails"),
+        ("3", "no id"),
+    ]
+    assert issues[1].source == f"{source}:3"
+
+
+def test_load_issues_rejects_duplicate_ids(tmp_path: Path) -> None:
+    source = tmp_path / "issues.jsonl"
+    source.write_text('{"id": 1, "body": "a"}\n{"id": 1, "body": "b"}\n')
+
+    with pytest.raises(ValueError, match="Duplicate issue id"):
+        load_issues(source)
+
+
+def test_run_batch_bounds_concurrency_and_aggregates_results(tmp_path: Path) -> None:
+    issues = [
+        BatchIssue(issue_id=f"issue-{i}", content=f"issue {i}", source=f"{i}.md")
+        for i in range(6)
+    ]
+    issues.append(BatchIssue(issue_id="broken", content="boom", source="broken.md"))
+    coordinator = FakeCoordinator()
+    blob_store = InMemoryBlobStore()
+    set_blob_store(blob_store)
+
+    try:
+        records = asyncio.run(
+            run_batch(
+                issues,
+                tmp_path,
+                max_concurrency=2,
+                coordinator=coordinator,  # type: ignore[arg-type]
+            )
+        )
+    finally:
+        set_blob_store(None)
+
+    assert coordinator.max_active == 2
+    assert len(records) == len(issues)
+
+    lines = (tmp_path / "results.jsonl").read_text().splitlines()
+    by_id = {record["issue_id"]: record for record in map(json.loads, lines)}
+    assert by_id.keys() == {issue.issue_id for issue in issues}
+    assert by_id["broken"]["status"] == "error"
+    assert by_id["broken"]["error"] == "model unavailable"
+    assert by_id["issue-0"]["status"] == "incomplete"
+    assert by_id["issue-0"]["draft_comment_count"] == 1
+    assert (tmp_path / "issue-0" / "validation_report.md").read_text() == (
+        "# Report for issue 0"
+    )
+    # Each issue's payloads were dropped with its run
+    assert not list(blob_store.refs())
@@ -0,0 +1,22 @@
+"""Smoke test for the offline pipeline benchmark."""
+
+from benchmarks.pipeline import DEFAULT_CORPUS, Latency, run
+from open_mre.batch import load_issues
+
+NO_LATENCY = Latency(llm=0, llm_per_1k_tokens=0, pypi=0, sandbox=0, install=0)
+
+
+def test_pipeline_benchmark_runs_offline() -> None:
+    issues = load_issues(DEFAULT_CORPUS)
+
+    results = run(issues, [1, 3], NO_LATENCY)
+
+    assert [result["concurrency"] for result in results] == [1, 3]
+    for result in results:
+        assert result["issues"] == len(issues)
+        assert result["throughput_per_second"] > 0
+        # Every stage ran for some issue, including PyPI lookups and execution
+        assert {"version_validator", "executor", "report_generator"} <= set(
+            result["stages"]
+        )
+        assert {"pypi.request", "sandbox.exec"} <= set(result["external"])
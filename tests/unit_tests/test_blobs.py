@@ -0,0 +1,132 @@
+"""Tests for content-addressed blob storage."""
+
+import os
+import time
+import uuid
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+
+from open_mre.blobs import (
+    BLOB_REF_PREFIX,
+    FileBlobStore,
+    InMemoryBlobStore,
+    blob_ref,
+    collect_garbage,
+    is_blob_ref,
+    load_blob,
+    resolve_blobs,
+    scoped_blob_store,
+    set_blob_store,
+    store_blob,
+)
+from open_mre.checkpoints import live_blob_refs, open_sqlite_checkpointer
+from open_mre.coordinator import create_coordinator, create_default_state
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+
+@pytest.fixture
+def blob_store() -> Iterator[InMemoryBlobStore]:
+    store = InMemoryBlobStore()
+    set_blob_store(store)
+    yield store
+    set_blob_store(None)
+
+
+def test_store_blob_deduplicates_and_passes_through(
+    blob_store: InMemoryBlobStore,
+) -> None:
+    ref = store_blob("x" * 100_000)
+
+    assert is_blob_ref(ref)
+    assert store_blob("x" * 100_000) == ref
+    assert store_blob(ref) == ref
+    assert list(blob_store.refs()) == [ref]
+    assert load_blob(ref) == "x" * 100_000
+    assert load_blob("plain text") == "plain text"
+    assert store_blob(None) is None
+    assert resolve_blobs({"report": ref, "count": 1}) == {
+        "report": "x" * 100_000,
+        "count": 1,
+    }
+
+
+def test_file_blob_store_round_trip_and_garbage_collection(tmp_path: Path) -> None:
+    store = FileBlobStore(tmp_path / "blobs")
+    live = store.put("live")
+    dead = store.put("dead")
+    fresh = store.put("fresh")
+    old = time.time() - 7200
+    for ref in (live, dead):
+        digest = ref.removeprefix(BLOB_REF_PREFIX)
+        os.utime(store.root / digest[:2] / digest, (old, old))
+
+    assert FileBlobStore(tmp_path / "blobs").get(live) == "live"
+    assert collect_garbage(store, {live}) == [dead]
+    assert sorted(store.refs()) == sorted([live, fresh])
+    with pytest.raises(KeyError):
+        store.get(dead)
+
+
+def test_checkpointed_state_holds_refs(
+    tmp_path: Path, fake_chat_model: PromptRoutedChatModel
+) -> None:
+    set_blob_store(FileBlobStore(tmp_path / "blobs"))
+    fake_chat_model.responses = {"technical report writer": "# Report"}
+    checkpointer = open_sqlite_checkpointer(tmp_path / "checkpoints.db")
+    config: RunnableConfig = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    issue = "No code here, just a long description. " * 1000
+
+    try:
+        with patch("open_mre.coordinator.sandbox_available", return_value=False):
+            create_coordinator(checkpointer=checkpointer).invoke(
+                create_default_state(issue_content=issue), config
+            )
+        values = checkpointer.get_tuple(config).checkpoint["channel_values"]  # type: ignore[union-attr]
+
+        assert is_blob_ref(values["issue_content"])
+        assert load_blob(values["issue_content"]) == issue
+        assert load_blob(values["validation_report"]).startswith("# Report")
+        assert live_blob_refs(checkpointer) >= {
+            values["issue_content"],
+            values["validation_report"],
+        }
+    finally:
+        set_blob_store(None)
+
+
+def test_server_graph_resolves_refs_in_its_output(
+    blob_store: InMemoryBlobStore, fake_chat_model: PromptRoutedChatModel
+) -> None:
+    fake_chat_model.responses = {"technical report writer": "# Report"}
+    config: RunnableConfig = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    issue = "No code here, just a long description. " * 1000
+
+    with patch("open_mre.coordinator.sandbox_available", return_value=False):
+        result = create_coordinator(resolve_outputs=True).invoke(
+            {"issue_content": issue}, config
+        )
+
+    assert result["issue_content"] == issue
+    assert result["validation_report"].startswith("# Report")
+    assert not any(is_blob_ref(value) for value in result.values())
+    # The earlier steps still passed refs
+    assert blob_ref(result["validation_report"]) in set(blob_store.refs())
+
+
+def test_scoped_blob_store_drops_the_payloads_of_a_run(
+    blob_store: InMemoryBlobStore, tmp_path: Path
+) -> None:
+    with scoped_blob_store():
+        ref = store_blob("run output")
+        assert load_blob(ref) == "run output"
+    assert not list(blob_store.refs())
+
+    durable = FileBlobStore(tmp_path / "blobs")
+    set_blob_store(durable)
+    with scoped_blob_store():
+        ref = store_blob("run output")
+    assert durable.get(ref) == "run output"
@@ -0,0 +1,165 @@
+"""Tests for durable checkpoints and retention."""
+
+import sqlite3
+import uuid
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+
+from open_mre.checkpoints import (
+    apply_retention,
+    latest_checkpoint_times,
+    open_sqlite_checkpointer,
+    prune_threads,
+)
+from open_mre.coordinator import create_coordinator, create_default_state
+from open_mre.main import run_validation
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+ISSUE = """# Bug
+
+```python
+from langchain_openai import ChatOpenAI
+ChatOpenAI().invoke("hi")
+```
+"""
+
+RESPONSES = {
+    "version validation specialist": """PYTHON_VERSION: 3.11
+PACKAGES: langchain-openai:1.0.0:1.0.0:false
+NOTES: none
+DRAFT_COMMENT: none
+SHOULD_TERMINATE: false""",
+    "code extraction specialist": """ADDITIONAL_CODE: none
+NOTES: Complete MRE
+NEEDS_MRE: false""",
+    "behavior analysis specialist": """EXPECTED_BEHAVIOR: Returns a reply
+ACTUAL_BEHAVIOR: Raises an error
+ANALYSIS_NOTES: none
+MISSING_INFO: false
+MISSING_DETAILS: none""",
+    "technical report writer": "# Report",
+}
+
+
+@pytest.fixture
+def no_sandbox() -> Iterator[None]:
+    with patch("open_mre.coordinator.sandbox_available", return_value=False):
+        yield
+
+
+def _checkpoint_rows(db_path: Path) -> list[tuple[str, str]]:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT thread_id, checkpoint_ns FROM checkpoints"
+        ).fetchall()
+
+
+@pytest.mark.usefixtures("no_sandbox")
+def test_interrupted_run_resumes_from_sqlite_checkpoint(
+    tmp_path: Path, fake_chat_model: PromptRoutedChatModel
+) -> None:
+    fake_chat_model.responses = RESPONSES
+    db_path = tmp_path / "checkpoints.db"
+    thread_id = str(uuid.uuid4())
+    config: RunnableConfig = {"configurable": {"thread_id": thread_id}}
+
+    # First process: the run stops at the API key approval interrupt
+    coordinator = create_coordinator(checkpointer=db_path)
+    coordinator.invoke(create_default_state(issue_content=ISSUE), config)
+    assert coordinator.get_state(config).next == ("api_key_check",)
+    fake_chat_model.calls.clear()
+
+    # Second process: resume the thread from the database
+    with patch(
+        "open_mre.main.prompt_for_api_keys", return_value={}
+    ) as prompt_for_api_keys:
+        result = run_validation(ISSUE, checkpointer=db_path, thread_id=thread_id)
+
+    prompt_for_api_keys.assert_called_once_with(["openai"])
+    assert result["termination_reason"] == "API key usage not approved by maintainer"
+    # Completed stages are not re-run
+    assert fake_chat_model.calls == ["technical report writer"]
+
+
+@pytest.mark.usefixtures("no_sandbox")
+def test_retention_compacts_and_prunes_threads(
+    tmp_path: Path, fake_chat_model: PromptRoutedChatModel
+) -> None:
+    fake_chat_model.responses = RESPONSES
+    db_path = tmp_path / "checkpoints.db"
+    checkpointer = open_sqlite_checkpointer(db_path)
+    coordinator = create_coordinator(checkpointer=checkpointer)
+    thread_ids = [str(uuid.uuid4()) for _ in range(2)]
+    started = []
+    for thread_id in thread_ids:
+        started.append(datetime.now(UTC))
+        coordinator.invoke(
+            create_default_state(issue_content=ISSUE),
+            {"configurable": {"thread_id": thread_id}},
+        )
+
+    assert latest_checkpoint_times(checkpointer) == {
+        thread_id: max(
+            datetime.fromisoformat(checkpoint_tuple.checkpoint["ts"])
+            for checkpoint_tuple in checkpointer.list(
+                {"configurable": {"thread_id": thread_id}}
+            )
+        )
+        for thread_id in thread_ids
+    }
+
+    # Nothing expired: the database is left as is
+    rows = _checkpoint_rows(db_path)
+    assert apply_retention(checkpointer) == []
+    assert _checkpoint_rows(db_path) == rows
+    assert len(rows) > len(set(rows))
+
+    assert apply_retention(checkpointer, max_age=timedelta(0), now=started[1]) == [
+        thread_ids[0]
+    ]
+
+    rows = _checkpoint_rows(db_path)
+    assert len(rows) == len(set(rows))
+    assert {thread_id for thread_id, _ in rows} == {thread_ids[1]}
+    state = coordinator.get_state({"configurable": {"thread_id": thread_ids[1]}})
+    assert state.next == ("api_key_check",)
+    assert state.values["expected_behavior"] == "Returns a reply"
+
+    expired = prune_threads(
+        checkpointer,
+        max_age=timedelta(days=30),
+        now=datetime.now(UTC) + timedelta(days=31),
+    )
+
+    assert expired == [thread_ids[1]]
+    assert _checkpoint_rows(db_path) == []
+
+
+@pytest.mark.usefixtures("no_sandbox")
+def test_retention_is_skipped_while_the_database_is_locked(
+    tmp_path: Path,
+    fake_chat_model: PromptRoutedChatModel,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    fake_chat_model.responses = RESPONSES
+    db_path = tmp_path / "checkpoints.db"
+    checkpointer = open_sqlite_checkpointer(db_path)
+    create_coordinator(checkpointer=checkpointer).invoke(
+        create_default_state(issue_content=ISSUE),
+        {"configurable": {"thread_id": str(uuid.uuid4())}},
+    )
+    checkpointer.conn.execute("PRAGMA busy_timeout = 0")
+    rows = _checkpoint_rows(db_path)
+
+    with sqlite3.connect(db_path) as other:
+        other.execute("BEGIN IMMEDIATE")
+        assert apply_retention(checkpointer, max_age=timedelta(0)) == []
+        other.rollback()
+
+    assert _checkpoint_rows(db_path) == rows
+    assert "database is locked" in caplog.text
@@ -0,0 +1,68 @@
+"""Tests for the code extractor agent."""
+
+import pytest
+
+from open_mre.agents.code_extractor import create_code_extractor_agent
+from open_mre.agents.code_extractor.agent import (
+    extract_fenced_code_blocks,
+    is_complete_fenced_code,
+)
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+COMPLETE = """# Bug
+
+```python
+from langchain_core.messages import AIMessage
+
+print(AIMessage(content="hi"))
+```
+"""
+
+
+@pytest.mark.parametrize(
+    ("issue", "complete"),
+    [
+        (COMPLETE, True),
+        # Only definitions, nothing runs
+        ("```python\nimport os\n\ndef f():\n    pass\n```", False),
+        # No imports
+        ("```python\nprint('hi')\n```", False),
+        # Does not parse
+        ("```python\nimport os\nprint(os.getcwd()\n```", False),
+        # A traceback in an untagged fence
+        (COMPLETE + "```\nTraceback (most recent call last):\n```", False),
+        # Code outside the fences
+        (COMPLETE + "\nAlso:\nfrom langchain import foo\n", False),
+        (COMPLETE + "\n>>> foo()\n", False),
+        # Other languages and prose are fine
+        (COMPLETE + "\n```bash\npip install langchain\n```\nThanks!", True),
+        ("No code here.", False),
+    ],
+)
+def test_is_complete_fenced_code(issue: str, complete: bool) -> None:  # noqa: FBT001
+    assert is_complete_fenced_code(issue, extract_fenced_code_blocks(issue)) is complete
+
+
+def test_complete_fenced_code_skips_the_model(
+    fake_chat_model: PromptRoutedChatModel,
+) -> None:
+    result = create_code_extractor_agent().invoke({"issue_content": COMPLETE})
+
+    assert fake_chat_model.calls == []
+    assert result["code_snippets"] == extract_fenced_code_blocks(COMPLETE)
+    assert result["should_terminate"] is False
+
+
+def test_ambiguous_code_asks_the_model(
+    fake_chat_model: PromptRoutedChatModel,
+) -> None:
+    fake_chat_model.responses = {
+        "code extraction specialist": "ADDITIONAL_CODE: foo()\nNEEDS_MRE: false"
+    }
+
+    result = create_code_extractor_agent().invoke(
+        {"issue_content": "Calling it like this fails:\n\n    foo()\n"}
+    )
+
+    assert fake_chat_model.calls == ["code extraction specialist"]
+    assert result["code_snippets"] == ["foo()"]
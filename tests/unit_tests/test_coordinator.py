@@ -0,0 +1,257 @@
+"""Tests for the coordinator graph."""
+
+import asyncio
+import uuid
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+
+from open_mre.blobs import load_blob
+from open_mre.coordinator import (
+    create_coordinator,
+    create_default_state,
+    get_coordinator,
+)
+from open_mre.state import SandboxHandle
+from open_mre.tools import ExecutionResult
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+ISSUE = """# Bug
+
+```python
+import langchain
+print(langchain.__version__)
+```
+"""
+
+VERSIONS_CURRENT = """PYTHON_VERSION: not specified
+PACKAGES: langchain:1.1.0:1.1.0:false
+NOTES: Python version not specified
+DRAFT_COMMENT: none
+SHOULD_TERMINATE: false"""
+
+VERSIONS_OUTDATED = """PYTHON_VERSION: 3.11
+PACKAGES: langchain:0.1.0:1.1.0:true
+NOTES: langchain is outdated
+DRAFT_COMMENT: Please upgrade langchain.
+SHOULD_TERMINATE: true"""
+
+CODE_MISSING = """ADDITIONAL_CODE: none
+NOTES: No code found
+NEEDS_MRE: true"""
+
+CODE_FOUND = """ADDITIONAL_CODE: none
+NOTES: Complete MRE
+NEEDS_MRE: false"""
+
+BEHAVIOR_CLEAR = """EXPECTED_BEHAVIOR: Prints the version
+ACTUAL_BEHAVIOR: Raises an error
+ANALYSIS_NOTES: none
+MISSING_INFO: false
+MISSING_DETAILS: none"""
+
+BEHAVIOR_MISSING = """EXPECTED_BEHAVIOR: unclear
+ACTUAL_BEHAVIOR: unclear
+ANALYSIS_NOTES: none
+MISSING_INFO: true
+MISSING_DETAILS: What happens when the code runs"""
+
+REPORT = "# Report"
+
+HANDLE = SandboxHandle(
+    sandbox_id="sandbox-123",
+    packages=["langchain==1.1.0", "langchain-core"],
+    install_command_id="cmd-1",
+)
+
+
+@pytest.fixture
+def sandbox_mocks() -> Iterator[dict[str, MagicMock]]:
+    with (
+        patch("open_mre.coordinator.sandbox_available", return_value=True),
+        patch(
+            "open_mre.coordinator.provision_sandbox", return_value=HANDLE
+        ) as provision,
+        patch("open_mre.coordinator.discard_sandbox") as discard,
+        patch(
+            "open_mre.agents.executor.agent.execute_in_sandbox",
+            return_value=ExecutionResult(
+                stdout="boom", stderr="", exit_code=0, success=True
+            ),
+        ) as execute,
+    ):
+        yield {"provision": provision, "discard": discard, "execute": execute}
+
+
+def _run(issue: str) -> dict[str, Any]:
+    coordinator = create_coordinator()
+    config: RunnableConfig = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    return coordinator.invoke(create_default_state(issue_content=issue), config)
+
+
+def test_enrichment_stages_run_in_parallel_from_start() -> None:
+    coordinator = create_coordinator(use_default_checkpointer=False)
+    graph = coordinator.get_graph()
+    start_targets = {edge.target for edge in graph.edges if edge.source == "__start__"}
+
+    assert start_targets == {"version_validator", "code_extractor"}
+
+
+def test_outdated_versions_take_precedence_over_missing_mre(
+    fake_chat_model: PromptRoutedChatModel,
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": VERSIONS_OUTDATED,
+        "code extraction specialist": CODE_MISSING,
+        "technical report writer": REPORT,
+    }
+
+    result = _run(ISSUE)
+
+    assert result["termination_reason"] == "Outdated package versions detected"
+    assert result["draft_comments"] == ["Please upgrade langchain."]
+    assert "behavior analysis specialist" not in fake_chat_model.calls
+
+
+def test_missing_mre_comment_includes_version_notes(
+    fake_chat_model: PromptRoutedChatModel,
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": VERSIONS_CURRENT,
+        "code extraction specialist": CODE_MISSING,
+        "technical report writer": REPORT,
+    }
+
+    result = _run("No code here.")
+
+    assert result["termination_reason"] == "No code snippets found"
+    assert len(result["draft_comments"]) == 1
+    assert result["draft_comments"][0].endswith(
+        "Additionally:\n- Python version not specified"
+    )
+    assert load_blob(result["validation_report"]).startswith(REPORT)
+
+
+def test_provisioned_sandbox_is_reused_by_executor(
+    fake_chat_model: PromptRoutedChatModel, sandbox_mocks: dict[str, MagicMock]
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": VERSIONS_CURRENT,
+        "code extraction specialist": CODE_FOUND,
+        "behavior analysis specialist": BEHAVIOR_CLEAR,
+        "code execution specialist": "print('hi')",
+        "technical report writer": REPORT,
+    }
+
+    result = _run(ISSUE)
+
+    sandbox_mocks["provision"].assert_called_once_with(
+        ["langchain==1.1.0", "langchain-core"]
+    )
+    assert sandbox_mocks["execute"].call_args.kwargs["handle"] == HANDLE
+    sandbox_mocks["discard"].assert_not_called()
+    assert load_blob(result["execution_output"]) == "boom"
+    assert result["sandbox"] is None
+
+
+def test_provisioned_sandbox_is_discarded_on_early_termination(
+    fake_chat_model: PromptRoutedChatModel, sandbox_mocks: dict[str, MagicMock]
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": VERSIONS_CURRENT,
+        "code extraction specialist": CODE_FOUND,
+        "behavior analysis specialist": BEHAVIOR_MISSING,
+        "technical report writer": REPORT,
+    }
+
+    result = _run(ISSUE)
+
+    assert result["termination_reason"] == "Missing critical information"
+    sandbox_mocks["discard"].assert_called_once_with(HANDLE)
+    sandbox_mocks["execute"].assert_not_called()
+    assert result["sandbox"] is None
+
+
+def test_no_sandbox_is_provisioned_when_enrichment_terminates(
+    fake_chat_model: PromptRoutedChatModel, sandbox_mocks: dict[str, MagicMock]
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": VERSIONS_OUTDATED,
+        "code extraction specialist": CODE_FOUND,
+        "technical report writer": REPORT,
+    }
+
+    _run(ISSUE)
+
+    sandbox_mocks["provision"].assert_not_called()
+
+
+def test_coordinator_runs_natively_async(
+    fake_chat_model: PromptRoutedChatModel,
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": VERSIONS_CURRENT,
+        "code extraction specialist": CODE_FOUND,
+        "behavior analysis specialist": BEHAVIOR_CLEAR,
+        "code execution specialist": "print('hi')",
+        "technical report writer": REPORT,
+    }
+    execution = ExecutionResult(stdout="boom", stderr="", exit_code=0, success=True)
+
+    with (
+        patch("open_mre.coordinator.sandbox_available", return_value=True),
+        patch(
+            "open_mre.coordinator.aprovision_sandbox", AsyncMock(return_value=HANDLE)
+        ) as aprovision,
+        patch("open_mre.coordinator.provision_sandbox") as provision,
+        patch(
+            "open_mre.agents.executor.agent.aexecute_in_sandbox",
+            AsyncMock(return_value=execution),
+        ) as aexecute,
+        patch("open_mre.agents.executor.agent.execute_in_sandbox") as execute,
+    ):
+        coordinator = create_coordinator()
+        config: RunnableConfig = {"configurable": {"thread_id": str(uuid.uuid4())}}
+        result = asyncio.run(
+            coordinator.ainvoke(create_default_state(issue_content=ISSUE), config)
+        )
+
+    aprovision.assert_awaited_once()
+    assert aexecute.await_args is not None
+    assert aexecute.await_args.kwargs["handle"] == HANDLE
+    provision.assert_not_called()
+    execute.assert_not_called()
+    assert load_blob(result["execution_output"]) == "boom"
+    assert load_blob(result["validation_report"]).startswith(REPORT)
+
+
+def test_coordinator_and_models_are_built_once_per_process(
+    fake_chat_model: PromptRoutedChatModel,
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": VERSIONS_CURRENT,
+        "code extraction specialist": CODE_MISSING,
+        "technical report writer": REPORT,
+    }
+
+    with patch(
+        "open_mre.models.init_chat_model", return_value=fake_chat_model
+    ) as init_chat_model:
+        coordinator = get_coordinator()
+        for _ in range(2):
+            config: RunnableConfig = {"configurable": {"thread_id": str(uuid.uuid4())}}
+            result = coordinator.invoke(
+                create_default_state(issue_content="No code here."), config
+            )
+            assert result["termination_reason"] == "No code snippets found"
+
+        assert get_coordinator() is coordinator
+        # One client per distinct model configuration
+        configurations = [
+            tuple(sorted(call.kwargs.items()))
+            for call in init_chat_model.call_args_list
+        ]
+        assert len(configurations) == len(set(configurations))
@@ -0,0 +1,121 @@
+"""Tests for token-budgeted issue digests."""
+
+from langchain_core.messages import SystemMessage
+
+from open_mre.agents.report_generator.agent import (
+    EXECUTION_OUTPUT_TOKEN_BUDGET,
+    _build_messages,
+)
+from open_mre.prompts import (
+    build_messages,
+    digest_issue,
+    estimate_tokens,
+    issue_prefix,
+    render_digest,
+    truncate_tokens,
+)
+
+LOG = "\n".join(f"DEBUG request {i} sent to the server" for i in range(500))
+
+ISSUE = f"""# Agent loops forever
+
+The agent keeps calling the same tool.
+
+### Example Code
+
+```python
+from langchain.agents import create_agent
+
+print(create_agent)
+```
+
+### Error Message and Stack Trace
+
+```
+Traceback (most recent call last):
+  File "main.py", line 3, in <module>
+GraphRecursionError: Recursion limit of 25 reached
+```
+
+### Logs
+
+```
+{LOG}
+```
+
+### System Info
+
+```
+langchain==1.1.0
+```
+"""
+
+
+def test_digest_classifies_parts_by_section() -> None:
+    digest = digest_issue(ISSUE)
+
+    assert [(part.kind, part.section) for part in digest.parts] == [
+        ("text", "Agent loops forever"),
+        ("code", "Example Code"),
+        ("traceback", "Error Message and Stack Trace"),
+        ("log", "Logs"),
+        ("environment", "System Info"),
+    ]
+    assert digest_issue(ISSUE) is digest
+
+
+def test_render_digest_fills_the_budget_by_priority() -> None:
+    excerpt = render_digest(
+        digest_issue(ISSUE), budget=300, priorities=("text", "traceback", "log")
+    )
+
+    assert estimate_tokens(excerpt) < 400
+    assert "The agent keeps calling the same tool." in excerpt
+    assert "GraphRecursionError: Recursion limit of 25 reached" in excerpt
+    # The log is cut in the middle, and unlisted kinds are replaced by markers
+    assert "DEBUG request 0 sent" in excerpt
+    assert "DEBUG request 499 sent" in excerpt
+    assert "lines omitted ..." in excerpt
+    assert "[code omitted, ~" in excerpt
+    assert "[environment omitted, ~" in excerpt
+    # Document order and section headings are kept
+    assert excerpt.index("## Logs") < excerpt.index("## System Info")
+
+
+def test_render_digest_keeps_small_issues_whole() -> None:
+    issue = "The call fails.\n\n```python\nimport os\nprint(os.sep)\n```"
+
+    excerpt = render_digest(
+        digest_issue(issue), budget=1000, priorities=("text", "code")
+    )
+
+    assert excerpt == issue
+
+
+def test_report_prompt_bounds_execution_output() -> None:
+    messages = _build_messages(
+        {"issue_content": ISSUE, "execution_output": LOG}  # type: ignore[typeddict-item]
+    )
+    prompt = str(messages[-1].content)
+
+    assert truncate_tokens(LOG, EXECUTION_OUTPUT_TOKEN_BUDGET, keep="both") in prompt
+    assert estimate_tokens(prompt) < estimate_tokens(LOG)
+
+
+def test_agent_prompts_share_a_cache_marked_prefix() -> None:
+    report_messages = _build_messages(
+        {"issue_content": ISSUE, "execution_output": "ok"}  # type: ignore[typeddict-item]
+    )
+    other_messages = build_messages(ISSUE, "You are another agent.", "Do it.")
+
+    prefixes = []
+    for messages in (report_messages, other_messages):
+        system = messages[0]
+        assert isinstance(system, SystemMessage)
+        assert isinstance(system.content, list)
+        prefix = system.content[0]
+        assert isinstance(prefix, dict)
+        assert prefix["cache_control"] == {"type": "ephemeral"}
+        prefixes.append(prefix["text"])
+    assert prefixes[0] == prefixes[1] == issue_prefix(ISSUE)
+    assert "GraphRecursionError" in prefixes[0]
@@ -0,0 +1,104 @@
+"""Tests for the hydrated script cache."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from open_mre.agents.executor import create_executor_agent
+from open_mre.agents.executor.cache import (
+    HydrationCache,
+    hydration_key,
+    set_hydration_cache,
+)
+from open_mre.blobs import load_blob
+from open_mre.metrics import HYDRATION_CACHE_REQUESTS, collect_metrics
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+SCRIPT = "import foo\n\nprint(foo.bar())"
+
+
+@pytest.fixture
+def hydration_cache(tmp_path: Path) -> Iterator[HydrationCache]:
+    """Enable a hydration cache, and skip sandbox execution."""
+    cache = HydrationCache(tmp_path / "hydration.db")
+    set_hydration_cache(cache)
+    try:
+        with patch("open_mre.agents.executor.agent.DAYTONA_AVAILABLE", new=False):
+            yield cache
+    finally:
+        set_hydration_cache(None)
+        cache.close()
+
+
+def _state(issue: str, code: str) -> dict[str, Any]:
+    return {
+        "issue_content": issue,
+        "code_snippets": [code],
+        "packages": [{"name": "foo", "user_version": "1.0"}],
+        "expected_behavior": "Prints 1",
+        "actual_behavior": "Raises KeyError",
+    }
+
+
+def test_hydration_key_normalizes_formatting() -> None:
+    key = hydration_key(
+        ["foo.bar()\n"], ["foo==1.0", "langchain"], "Prints 1", "Raises", "model"
+    )
+
+    assert key == hydration_key(
+        ["    foo.bar()   \r\n"],
+        ["langchain", "foo==1.0"],
+        "  prints\n1",
+        "Raises ",
+        "model",
+    )
+    assert key != hydration_key(
+        ["foo.baz()"], ["foo==1.0", "langchain"], "Prints 1", "Raises", "model"
+    )
+    assert key != hydration_key(
+        ["foo.bar()"], ["foo==2.0", "langchain"], "Prints 1", "Raises", "model"
+    )
+    assert key != hydration_key(
+        ["foo.bar()"], ["foo==1.0", "langchain"], "Prints 1", "Raises", "other"
+    )
+
+
+def test_cached_scripts_are_reused_across_issues(
+    fake_chat_model: PromptRoutedChatModel, hydration_cache: HydrationCache
+) -> None:
+    fake_chat_model.responses = {"code execution specialist": SCRIPT}
+    agent = create_executor_agent()
+
+    with collect_metrics() as registry:
+        first = agent.invoke(_state("Bug report", "foo.bar()"))
+        # A duplicate report, with the code pasted at a different indentation
+        second = agent.invoke(_state("Same bug, reported again", "  foo.bar()\n"))
+
+    assert fake_chat_model.calls == ["code execution specialist"]
+    assert load_blob(first["hydrated_code"]) == SCRIPT
+    assert load_blob(second["hydrated_code"]) == SCRIPT
+    assert second["execution_notes"][0] == "Hydrated code reused from cache"
+    assert registry.summary()["counters"][HYDRATION_CACHE_REQUESTS] == [
+        {"labels": {"outcome": "hit"}, "value": 1},
+        {"labels": {"outcome": "miss"}, "value": 1},
+    ]
+    assert hydration_cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "entries": 1,
+        "bytes": len(SCRIPT),
+    }
+
+
+def test_unusable_scripts_are_not_cached(
+    fake_chat_model: PromptRoutedChatModel, hydration_cache: HydrationCache
+) -> None:
+    fake_chat_model.responses = {"code execution specialist": "def broken("}
+    agent = create_executor_agent()
+
+    agent.invoke(_state("Bug report", "foo.bar()"))
+
+    assert hydration_cache.size() == (0, 0)
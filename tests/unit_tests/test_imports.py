@@ -0,0 +1,33 @@
+"""Tests that heavy dependencies are imported lazily."""
+
+import subprocess
+import sys
+
+HEAVY_MODULES = ("daytona", "langchain", "langchain_core", "langgraph")
+
+
+def _loaded_heavy_modules(statement: str) -> list[str]:
+    """Run `statement` in a fresh interpreter and list heavy modules it loaded."""
+    code = (
+        f"import sys; {statement}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return [name for name in completed.stdout.strip().split(",") if name]
+
+
+def test_importing_package_and_cli_does_not_load_heavy_dependencies() -> None:
+    assert _loaded_heavy_modules("import open_mre, open_mre.main, open_mre.batch") == []
+
+
+def test_importing_tools_package_does_not_load_heavy_dependencies() -> None:
+    assert _loaded_heavy_modules("import open_mre.tools.daytona_sandbox") == []
+
+
+def test_lazy_exports_resolve_on_access() -> None:
+    loaded = _loaded_heavy_modules("import open_mre; open_mre.create_coordinator")
+
+    assert "langgraph" in loaded
+    assert "daytona" not in loaded
@@ -0,0 +1,83 @@
+"""Tests for incremental `KEY: value` parsing and early stopping."""
+
+import asyncio
+from collections.abc import Mapping
+
+from langchain_core.caches import InMemoryCache
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from open_mre.callbacks import MetricsCallbackHandler
+from open_mre.line_protocol import LineProtocolParser, StopEarly
+from open_mre.metrics import LLM_EARLY_STOPS, collect_metrics
+
+RESPONSE = """ADDITIONAL_CODE: none
+NEEDS_MRE: true
+NOTES: the snippet is incomplete
+I hope this helps!"""
+
+
+def _needs_mre(fields: Mapping[str, str]) -> bool:
+    return fields.get("NEEDS_MRE") == "true"
+
+
+def _parser() -> LineProtocolParser:
+    return LineProtocolParser(("ADDITIONAL_CODE", "NOTES", "NEEDS_MRE"))
+
+
+def test_parser_reads_fields_as_lines_complete() -> None:
+    parser = LineProtocolParser(("A", "B"), stop_when=_needs_mre)
+
+    progress = []
+    for piece in ("A: 1\nB", ": 2", "\n"):
+        parser.feed(piece)
+        progress.append((dict(parser.fields), parser.done))
+
+    assert progress == [
+        ({"A": "1"}, False),
+        ({"A": "1"}, False),
+        ({"A": "1", "B": "2"}, True),
+    ]
+
+    parser = LineProtocolParser(("A", "NEEDS_MRE"), stop_when=_needs_mre)
+    parser.feed("Sure.\n  NEEDS_MRE:   true  \n")
+    assert parser.fields == {"NEEDS_MRE": "true"}
+    assert parser.done
+
+
+def test_stop_early_ends_the_stream_once_the_fields_are_in() -> None:
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=RESPONSE)]))
+    handler = MetricsCallbackHandler()
+
+    with collect_metrics() as registry:
+        response = StopEarly(model, _parser).invoke(
+            "Extract code", {"callbacks": [handler]}
+        )
+
+    assert response.content == RESPONSE.removesuffix("I hope this helps!")
+    (stops,) = registry.summary()["counters"][LLM_EARLY_STOPS]
+    assert stops["value"] == 1
+
+
+def test_stop_early_routes_before_the_remaining_fields() -> None:
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=RESPONSE)]))
+    wrapper = StopEarly(
+        model,
+        lambda: LineProtocolParser(
+            ("ADDITIONAL_CODE", "NOTES", "NEEDS_MRE"), stop_when=_needs_mre
+        ),
+    )
+
+    response = asyncio.run(wrapper.ainvoke("Extract code"))
+
+    assert response.content == "ADDITIONAL_CODE: none\nNEEDS_MRE: true\n"
+
+
+def test_stop_early_requests_the_full_response_with_a_response_cache() -> None:
+    model = GenericFakeChatModel(
+        messages=iter([AIMessage(content=RESPONSE)]), cache=InMemoryCache()
+    )
+
+    response = StopEarly(model, _parser).invoke("Extract code")
+
+    assert response.content == RESPONSE
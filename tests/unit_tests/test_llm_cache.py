@@ -0,0 +1,88 @@
+"""Tests for the persistent LLM response cache."""
+
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration
+
+from open_mre.llm_cache import SQLiteLLMCache
+from open_mre.metrics import LLM_CACHE_REQUESTS, collect_metrics
+from open_mre.models import get_chat_model, set_llm_cache
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+MESSAGES = [SystemMessage(content="You are a report writer"), HumanMessage("Hi")]
+
+
+def _generation(text: str) -> list[ChatGeneration]:
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def test_cached_responses_are_reused_across_processes(tmp_path: Path) -> None:
+    path = tmp_path / "llm_cache.db"
+    model = PromptRoutedChatModel(
+        responses={"report writer": "# Report"}, calls=[], cache=SQLiteLLMCache(path)
+    )
+
+    with collect_metrics() as registry:
+        first = model.invoke(MESSAGES)
+        second = model.invoke(MESSAGES)
+    # A new connection, as another process would open
+    model.cache = SQLiteLLMCache(path)
+    third = model.invoke(MESSAGES)
+
+    assert model.calls == ["report writer"]
+    assert first.content == second.content == third.content == "# Report"
+    assert second.usage_metadata is not None
+    assert first.usage_metadata is not None
+    assert second.usage_metadata["total_tokens"] == first.usage_metadata["total_tokens"]
+    assert registry.summary()["counters"][LLM_CACHE_REQUESTS] == [
+        {"labels": {"outcome": "hit"}, "value": 1},
+        {"labels": {"outcome": "miss"}, "value": 1},
+    ]
+
+
+def test_entries_expire_after_ttl(tmp_path: Path) -> None:
+    cache = SQLiteLLMCache(tmp_path / "llm_cache.db", ttl=timedelta(hours=1))
+    with patch("open_mre.llm_cache.time.time", return_value=1_000_000.0):
+        cache.update("prompt", "model", _generation("cached"))
+
+    with patch("open_mre.llm_cache.time.time", return_value=1_000_000.0 + 1800):
+        assert cache.lookup("prompt", "model") is not None
+    with patch("open_mre.llm_cache.time.time", return_value=1_000_000.0 + 7200):
+        assert cache.lookup("prompt", "model") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    cache = SQLiteLLMCache(tmp_path / "llm_cache.db", ttl=None)
+    for i, prompt in enumerate(["a", "b", "c"]):
+        with patch("open_mre.llm_cache.time.time", return_value=1_000_000.0 + i):
+            cache.update(prompt, "model", _generation("x" * 100))
+    with patch("open_mre.llm_cache.time.time", return_value=1_000_010.0):
+        cache.lookup("a", "model")
+    # Room for about three entries
+    cache.max_bytes = 3 * len(
+        cache._conn.execute("SELECT value FROM llm_cache").fetchone()[0]
+    )
+
+    with patch("open_mre.llm_cache.time.time", return_value=1_000_020.0):
+        cache.update("d", "model", _generation("x" * 100))
+
+    assert cache.lookup("b", "model") is None
+    assert all(cache.lookup(prompt, "model") for prompt in ["a", "c", "d"])
+
+
+def test_chat_models_are_built_with_the_configured_cache(tmp_path: Path) -> None:
+    cache = SQLiteLLMCache(tmp_path / "llm_cache.db")
+    init_chat_model = MagicMock()
+    try:
+        with patch("open_mre.models.init_chat_model", init_chat_model):
+            set_llm_cache(cache)
+            get_chat_model("some-model")
+    finally:
+        set_llm_cache(None)
+
+    init_chat_model.assert_called_once_with(
+        model="some-model", cache=cache, max_retries=0
+    )
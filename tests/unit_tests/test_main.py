@@ -0,0 +1,44 @@
+"""Tests for the CLI driver."""
+
+from typing import Any
+
+import pytest
+
+from open_mre.main import run_validation
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+
+def test_run_validation_streams_progress_and_partial_updates(
+    fake_chat_model: PromptRoutedChatModel, capsys: pytest.CaptureFixture[str]
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": """PYTHON_VERSION: 3.11
+PACKAGES: langchain:0.1.0:1.1.0:true
+NOTES: none
+DRAFT_COMMENT: Please upgrade langchain.
+SHOULD_TERMINATE: true""",
+        "code extraction specialist": """ADDITIONAL_CODE: none
+NOTES: none
+NEEDS_MRE: false""",
+        "technical report writer": "# Report",
+    }
+    updates: list[tuple[str, dict[str, Any]]] = []
+
+    result = run_validation(
+        "No code here.", on_update=lambda node, update: updates.append((node, update))
+    )
+
+    assert result["validation_report"].startswith("# Report")
+    nodes = [node for node, _ in updates]
+    # The enrichment stages run in parallel, so their relative order may vary
+    assert set(nodes[:2]) == {"version_validator", "code_extractor"}
+    assert nodes[2:] == ["review_enrichment", "report_generator"]
+    assert updates[2][1]["draft_comments"] == ["Please upgrade langchain."]
+
+    output = capsys.readouterr().out
+    for node in ("version_validator", "code_extractor", "report_generator"):
+        assert f"[start] {node}" in output
+        assert f"[done] {node} (" in output
+    assert output.index("[done] review_enrichment") < output.index(
+        "[start] report_generator"
+    )
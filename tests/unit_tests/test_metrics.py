@@ -0,0 +1,175 @@
+"""Tests for metrics collection and export."""
+
+import asyncio
+import uuid
+from typing import Any
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.runnables import RunnableConfig
+
+from open_mre.callbacks import MetricsCallbackHandler
+from open_mre.coordinator import create_coordinator, create_default_state
+from open_mre.metrics import (
+    LLM_TOKENS,
+    NODE_DURATION,
+    PYPI_REQUESTS,
+    MetricsRegistry,
+    collect_metrics,
+    format_token_usage,
+    increment,
+    observe,
+    token_usage,
+)
+from open_mre.tools import check_pypi_version
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+ISSUE = """# Bug
+
+```python
+from langchain_openai import ChatOpenAI
+ChatOpenAI().invoke("hi")
+```
+"""
+
+
+def _series(
+    summary: dict[str, Any], kind: str, name: str
+) -> dict[tuple[tuple[str, str], ...], dict[str, Any]]:
+    return {
+        tuple(sorted(series["labels"].items())): series
+        for series in summary[kind].get(name, [])
+    }
+
+
+def test_registry_summarizes_and_exports_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    for value in range(1, 101):
+        registry.observe("latency_seconds", value / 100, stage="a")
+    registry.increment("calls_total", stage='say "hi"')
+    registry.increment("calls_total", 2, stage='say "hi"')
+
+    summary = registry.summary()
+    (latency,) = summary["summaries"]["latency_seconds"]
+    assert latency["count"] == 100
+    assert (latency["p50"], latency["p95"], latency["max"]) == (0.5, 0.95, 1.0)
+    assert summary["counters"]["calls_total"] == [
+        {"labels": {"stage": 'say "hi"'}, "value": 3}
+    ]
+
+    text = registry.to_prometheus()
+    assert "# TYPE latency_seconds summary\n" in text
+    assert 'latency_seconds{stage="a",quantile="0.95"} 0.95\n' in text
+    assert 'latency_seconds_count{stage="a"} 100\n' in text
+    assert 'calls_total{stage="say \\"hi\\""} 3\n' in text
+
+
+def test_collect_metrics_is_scoped_to_the_current_task() -> None:
+    async def run(name: str) -> MetricsRegistry:
+        with collect_metrics() as registry:
+            await asyncio.sleep(0)
+            observe("task_seconds", 1.0, task=name)
+        return registry
+
+    async def main() -> tuple[MetricsRegistry, tuple[MetricsRegistry, ...]]:
+        with collect_metrics() as outer:
+            inner = tuple(await asyncio.gather(run("a"), run("b")))
+        increment("outside_total")
+        return outer, inner
+
+    outer, (a, b) = asyncio.run(main())
+
+    assert [s["labels"] for s in a.summary()["summaries"]["task_seconds"]] == [
+        {"task": "a"}
+    ]
+    assert [s["labels"] for s in b.summary()["summaries"]["task_seconds"]] == [
+        {"task": "b"}
+    ]
+    assert len(outer.summary()["summaries"]["task_seconds"]) == 2
+    assert outer.summary()["counters"] == {}
+
+
+def test_coordinator_records_node_durations_and_token_usage(
+    fake_chat_model: PromptRoutedChatModel,
+) -> None:
+    fake_chat_model.responses = {
+        "version validation specialist": "PYTHON_VERSION: 3.12\n"
+        "PACKAGES: none\nSHOULD_TERMINATE: false"
+    }
+    config: RunnableConfig = {"configurable": {"thread_id": str(uuid.uuid4())}}
+
+    with (
+        patch("open_mre.coordinator.sandbox_available", return_value=False),
+        collect_metrics() as registry,
+    ):
+        create_coordinator().invoke(create_default_state(issue_content=ISSUE), config)
+
+    summary = registry.summary()
+    nodes = _series(summary, "summaries", NODE_DURATION)
+    assert (("node", "version_validator"), ("status", "ok")) in nodes
+    assert (("node", "version_validator/call_model"), ("status", "ok")) in nodes
+    # The run pauses for API key approval
+    assert (("node", "api_key_check"), ("status", "interrupted")) in nodes
+    assert all(series["count"] == 1 for series in nodes.values())
+
+    tokens = _series(summary, "counters", LLM_TOKENS)
+    output_tokens = tokens[
+        (
+            ("model", "PromptRoutedChatModel"),
+            ("node", "version_validator/call_model"),
+            ("type", "output"),
+        )
+    ]
+    assert output_tokens["value"] == 6
+
+
+def test_prompt_cache_tokens_are_counted() -> None:
+    handler = MetricsCallbackHandler()
+    message = AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": 1200,
+            "output_tokens": 10,
+            "total_tokens": 1210,
+            "input_token_details": {
+                "cache_read": 1000,
+                "cache_creation": 0,
+                "ephemeral_5m_input_tokens": 150,
+            },
+        },
+    )
+    run_id = uuid.uuid4()
+
+    with collect_metrics() as registry:
+        handler.on_chat_model_start(
+            {"name": "ChatAnthropic"}, [[]], run_id=run_id, metadata={}
+        )
+        handler.on_llm_end(
+            LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id
+        )
+
+    usage = token_usage(registry)
+    assert usage == {
+        "input": 1200,
+        "output": 10,
+        "cache_read": 1000,
+        "cache_creation": 150,
+    }
+    assert format_token_usage(usage) == (
+        "LLM tokens: 1,200 input (1,000 cache hits, 150 cache writes, 50 uncached), "
+        "10 output"
+    )
+
+
+def test_pypi_lookups_are_counted_by_outcome() -> None:
+    with (
+        patch("open_mre.tools.pypi_checker._get_client") as get_client,
+        collect_metrics() as registry,
+    ):
+        get_client.return_value.get.side_effect = OSError("offline")
+        check_pypi_version.invoke({"package_name": "requests"})
+
+    assert registry.summary()["counters"][PYPI_REQUESTS] == [
+        {"labels": {"outcome": "error"}, "value": 1}
+    ]
@@ -0,0 +1,141 @@
+"""Tests for the agent model registry and escalation."""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+from pydantic import SecretStr
+
+from open_mre.agents.code_extractor import create_code_extractor_agent
+from open_mre.metrics import LLM_ESCALATIONS, collect_metrics
+from open_mre.models import (
+    DEFAULT_MODEL,
+    FAST_MODEL,
+    ModelConfig,
+    clear_model_cache,
+    get_agent_model_config,
+    load_agent_models,
+    messages_for,
+    reset_agent_models,
+    set_agent_models,
+    shares_prompt_cache,
+)
+from open_mre.prompts import build_messages, issue_prefix
+from tests.unit_tests.conftest import PromptRoutedChatModel
+
+ISSUE = "Calling it like this fails:\n\n    foo()\n"
+
+
+@pytest.fixture
+def tiered_models() -> Iterator[dict[str, PromptRoutedChatModel]]:
+    """Serve a separate fake chat model for each model name."""
+    models = {
+        name: PromptRoutedChatModel(responses={}, calls=[])
+        for name in (FAST_MODEL, DEFAULT_MODEL)
+    }
+
+    def init_chat_model(model: str, **_: Any) -> PromptRoutedChatModel:
+        return models[model]
+
+    clear_model_cache()
+    try:
+        with patch("open_mre.models.init_chat_model", side_effect=init_chat_model):
+            yield models
+    finally:
+        clear_model_cache()
+        reset_agent_models()
+
+
+def test_load_agent_models(tmp_path: Path) -> None:
+    path = tmp_path / "models.json"
+    path.write_text(
+        json.dumps(
+            {
+                "executor": "gpt-5-mini",
+                "code_extractor": {"model": "gpt-5-nano", "escalation_model": None},
+            }
+        )
+    )
+
+    models = load_agent_models(path)
+
+    assert models == {
+        "executor": ModelConfig("gpt-5-mini"),
+        "code_extractor": ModelConfig("gpt-5-nano"),
+    }
+    set_agent_models(models)
+    try:
+        assert get_agent_model_config("executor").model == "gpt-5-mini"
+        assert get_agent_model_config("report_generator").model == DEFAULT_MODEL
+    finally:
+        reset_agent_models()
+
+    path.write_text(json.dumps({"planner": "gpt-5-mini"}))
+    with pytest.raises(ValueError, match="unknown agent 'planner'"):
+        load_agent_models(path)
+    path.write_text(json.dumps({"executor": {"name": "gpt-5-mini"}}))
+    with pytest.raises(ValueError, match="invalid settings for 'executor'"):
+        load_agent_models(path)
+
+
+def test_unusable_response_escalates(
+    tiered_models: dict[str, PromptRoutedChatModel],
+) -> None:
+    tiered_models[FAST_MODEL].responses = {"code extraction specialist": "foo()"}
+    tiered_models[DEFAULT_MODEL].responses = {
+        "code extraction specialist": "ADDITIONAL_CODE: foo()\nNEEDS_MRE: false"
+    }
+
+    with collect_metrics() as registry:
+        result = create_code_extractor_agent().invoke({"issue_content": ISSUE})
+
+    assert tiered_models[FAST_MODEL].calls == ["code extraction specialist"]
+    assert tiered_models[DEFAULT_MODEL].calls == ["code extraction specialist"]
+    assert result["code_snippets"] == ["foo()"]
+    (escalations,) = registry.summary()["counters"][LLM_ESCALATIONS]
+    assert escalations == {"labels": {"agent": "code_extractor"}, "value": 1}
+
+
+def test_usable_response_does_not_escalate(
+    tiered_models: dict[str, PromptRoutedChatModel],
+) -> None:
+    tiered_models[FAST_MODEL].responses = {
+        "code extraction specialist": "ADDITIONAL_CODE: none\nNEEDS_MRE: true"
+    }
+
+    result = create_code_extractor_agent().invoke({"issue_content": ISSUE})
+
+    assert tiered_models[DEFAULT_MODEL].calls == []
+    assert result["should_terminate"] is True
+
+
+def test_cache_control_is_only_sent_to_anthropic_models() -> None:
+    messages = build_messages(ISSUE, "You are an agent.", "Do it.")
+    anthropic = ChatAnthropic(model=FAST_MODEL, api_key=SecretStr("test"))
+    other = PromptRoutedChatModel(responses={}, calls=[])
+
+    prefixes = []
+    for model in (anthropic.bind_tools([]), other):
+        system = messages_for(model, messages)[0]
+        assert isinstance(system.content, list)
+        prefix = system.content[0]
+        assert isinstance(prefix, dict)
+        assert prefix["text"] == issue_prefix(ISSUE)
+        prefixes.append(prefix.get("cache_control"))
+    assert prefixes == [{"type": "ephemeral"}, None]
+
+
+def test_prefix_is_cached_only_when_another_agent_shares_the_model() -> None:
+    # The version validator's prompts start with tools, so it shares no prefix
+    assert not shares_prompt_cache("code_extractor")
+    assert shares_prompt_cache("report_generator")
+
+    try:
+        set_agent_models({"code_extractor": ModelConfig(DEFAULT_MODEL)})
+        assert shares_prompt_cache("code_extractor")
+    finally:
+        reset_agent_models()
@@ -0,0 +1,112 @@
+"""Tests for the PyPI metadata cache."""
+
+import asyncio
+from collections.abc import Iterator
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from open_mre.metrics import PYPI_CACHE_REQUESTS, collect_metrics
+from open_mre.tools import check_pypi_version, pypi_checker
+from open_mre.tools.pypi_cache import PyPICache, set_pypi_cache
+
+ETAG = '"abc123"'
+
+
+@pytest.fixture
+def pypi_cache(tmp_path: Path) -> Iterator[PyPICache]:
+    cache = PyPICache(tmp_path / "pypi.db", fresh_for=timedelta(minutes=10))
+    set_pypi_cache(cache)
+    try:
+        yield cache
+    finally:
+        set_pypi_cache(None)
+        cache.close()
+
+
+def _pypi(requests: list[httpx.Request]) -> httpx.Client:
+    """Build a client for a fake PyPI that honors `If-None-Match`."""
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("if-none-match") == ETAG:
+            return httpx.Response(304)
+        return httpx.Response(
+            200, json={"info": {"version": "1.0.4"}}, headers={"ETag": ETAG}
+        )
+
+    return httpx.Client(transport=httpx.MockTransport(handle))
+
+
+def _outcomes(registry_summary: dict[str, Any]) -> dict[str, int]:
+    return {
+        series["labels"]["outcome"]: series["value"]
+        for series in registry_summary["counters"][PYPI_CACHE_REQUESTS]
+    }
+
+
+def test_stale_metadata_is_revalidated_with_etag(pypi_cache: PyPICache) -> None:
+    requests: list[httpx.Request] = []
+    client = _pypi(requests)
+
+    with (
+        patch("open_mre.tools.pypi_checker._get_client", return_value=client),
+        collect_metrics() as registry,
+    ):
+        first = check_pypi_version.invoke({"package_name": "langchain_core"})
+        second = check_pypi_version.invoke({"package_name": "langchain-core"})
+        pypi_cache.fresh_for = timedelta(0)
+        third = check_pypi_version.invoke({"package_name": "langchain-core"})
+
+    assert first["latest_version"] == second["latest_version"] == "1.0.4"
+    assert third["latest_version"] == "1.0.4"
+    assert [str(r.url) for r in requests] == [
+        "https://pypi.org/pypi/langchain-core/json"
+    ] * 2
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == ETAG
+    assert _outcomes(registry.summary()) == {"fresh": 1, "miss": 1, "revalidated": 1}
+
+
+def test_stale_metadata_is_used_when_pypi_is_unreachable(
+    pypi_cache: PyPICache,
+) -> None:
+    with patch("open_mre.tools.pypi_checker._get_client", return_value=_pypi([])):
+        check_pypi_version.invoke({"package_name": "langchain-core"})
+    pypi_cache.fresh_for = timedelta(0)
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        msg = "offline"
+        raise httpx.ConnectError(msg, request=request)
+
+    offline = httpx.AsyncClient(transport=httpx.MockTransport(unreachable))
+    with (
+        patch("open_mre.tools.pypi_checker._get_async_client", return_value=offline),
+        collect_metrics() as registry,
+    ):
+        stale = asyncio.run(
+            check_pypi_version.ainvoke({"package_name": "langchain-core"})
+        )
+        missing = asyncio.run(check_pypi_version.ainvoke({"package_name": "langgraph"}))
+
+    assert stale["latest_version"] == "1.0.4"
+    assert stale["error"] is None
+    assert missing["latest_version"] is None
+    assert missing["error"] == "offline"
+    assert _outcomes(registry.summary()) == {"stale": 1}
+
+
+def test_async_client_is_closed_with_its_event_loop() -> None:
+    async def lookup_and_close() -> tuple[httpx.AsyncClient, httpx.AsyncClient]:
+        client = pypi_checker._get_async_client()
+        await pypi_checker.aclose_pypi_clients()
+        return client, pypi_checker._get_async_client()
+
+    closed, reopened = asyncio.run(lookup_and_close())
+
+    assert closed.is_closed
+    assert reopened is not closed
@@ -0,0 +1,116 @@
+"""Tests for the offline PyPI index."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from open_mre.main import main
+from open_mre.tools import check_pypi_versions
+from open_mre.tools.pypi_index import PyPIIndex, set_pypi_index
+
+RELEASES = {
+    version: [{"upload_time_iso_8601": f"2025-10-{day}T12:00:00Z", "yanked": False}]
+    for day, version in enumerate(["1.0.10", "1.0.2", "1.0.0rc1", "0.9"], start=10)
+}
+
+
+def _pypi(request: httpx.Request) -> httpx.Response:
+    package = request.url.path.split("/")[2]
+    if package != "langchain-core":
+        return httpx.Response(404, json={"message": "Not Found"}, request=request)
+    return httpx.Response(
+        200,
+        json={"info": {"version": "1.0.10"}, "releases": {**RELEASES, "0.1": []}},
+        request=request,
+    )
+
+
+@pytest.fixture
+def offline() -> Iterator[None]:
+    """Fail any PyPI request, and clear the selected index afterwards."""
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        msg = "offline"
+        raise httpx.ConnectError(msg, request=request)
+
+    client = httpx.Client(transport=httpx.MockTransport(unreachable))
+    try:
+        with patch("open_mre.tools.pypi_checker._get_client", return_value=client):
+            yield
+    finally:
+        set_pypi_index(None)
+
+
+@pytest.mark.usefixtures("offline")
+def test_refreshed_index_answers_lookups_offline(tmp_path: Path) -> None:
+    path = tmp_path / "pypi-index.json"
+    client = httpx.Client(transport=httpx.MockTransport(_pypi))
+    with patch("open_mre.tools.pypi_checker._get_client", return_value=client):
+        assert main(["pypi-index", str(path), "langchain_core"]) == 0
+
+    index = PyPIIndex.load(path)
+    metadata = index.get("LangChain-Core")
+    assert metadata is not None
+    assert metadata["releases"] == ["0.9", "1.0.0rc1", "1.0.2", "1.0.10"]
+    assert metadata["latest_release_date"] == "2025-10-10"
+
+    set_pypi_index(index)
+    indexed, missing = check_pypi_versions.invoke(
+        {"package_names": ["langchain-core", "langgraph"]}
+    )
+    assert indexed["latest_version"] == "1.0.10"
+    assert indexed["error"] is None
+    assert missing["error"] == "langgraph is not in the offline PyPI index"
+
+
+@pytest.mark.usefixtures("offline")
+def test_failed_refresh_keeps_indexed_metadata(tmp_path: Path) -> None:
+    path = tmp_path / "pypi-index.json"
+    PyPIIndex(
+        {
+            "langchain-core": {
+                "latest_version": "1.0.2",
+                "latest_release_date": None,
+                "yanked_versions": [],
+                "releases": ["1.0.2"],
+            }
+        },
+        refreshed_at="2025-10-01T00:00:00+00:00",
+    ).save(path)
+
+    # Refreshes the packages already in the index
+    assert main(["pypi-index", str(path)]) == 1
+
+    index = PyPIIndex.load(path)
+    metadata = index.get("langchain-core")
+    assert metadata is not None
+    assert metadata["latest_version"] == "1.0.2"
+    assert index.refreshed_at == "2025-10-01T00:00:00+00:00"
+
+
+def test_unusable_cache_path_is_reported_by_option(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    issue = tmp_path / "issue.md"
+    issue.write_text("Nothing to see")
+    # A cache "directory" that is a file
+    (tmp_path / "caches").write_text("")
+
+    exit_code = main(
+        [
+            str(issue),
+            "--no-execute",
+            "--pypi-cache",
+            str(tmp_path / "caches" / "pypi.db"),
+            "--pypi-index",
+            str(tmp_path / "missing.json"),
+        ]
+    )
+
+    assert exit_code == 1
+    error = capsys.readouterr().err
+    assert f"Cannot use --pypi-cache {tmp_path / 'caches' / 'pypi.db'}" in error
+    assert "--pypi-index" not in error
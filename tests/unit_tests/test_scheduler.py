@@ -0,0 +1,102 @@
+"""Tests for the chat model request scheduler."""
+
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage
+
+from open_mre.llm_cache import CACHE_HIT_METADATA_KEY
+from open_mre.metrics import LLM_RETRIES, collect_metrics
+from open_mre.scheduler import LLMScheduler, Priority, llm_priority
+
+
+def _rate_limited() -> httpx.HTTPStatusError:
+    return httpx.HTTPStatusError(
+        "rate limited",
+        request=httpx.Request("POST", "https://api.example.com/v1/messages"),
+        response=httpx.Response(429, headers={"retry-after": "0"}),
+    )
+
+
+def test_transient_errors_are_retried() -> None:
+    scheduler = LLMScheduler(base_delay=0.01)
+    errors: list[Exception] = [_rate_limited(), httpx.ConnectError("reset")]
+
+    def call() -> BaseMessage:
+        if errors:
+            raise errors.pop(0)
+        return AIMessage(content="ok")
+
+    with collect_metrics() as registry:
+        response = scheduler.call(call, tokens=10)
+
+    assert response.content == "ok"
+    retries = {
+        series["labels"]["reason"]: series["value"]
+        for series in registry.summary()["counters"][LLM_RETRIES]
+    }
+    assert retries == {"429": 1, "connection": 1}
+
+
+def test_other_errors_and_exhausted_retries_are_raised() -> None:
+    scheduler = LLMScheduler(max_retries=2, base_delay=0.01)
+    calls = 0
+
+    def call() -> BaseMessage:
+        nonlocal calls
+        calls += 1
+        raise _rate_limited()
+
+    with pytest.raises(httpx.HTTPStatusError):
+        scheduler.call(call, tokens=10)
+    assert calls == 3
+
+    def invalid() -> BaseMessage:
+        raise ValueError
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        scheduler.call(invalid, tokens=10)
+
+
+def test_interactive_calls_are_admitted_before_backlog() -> None:
+    # Two requests per second, once the burst allowance is used up
+    scheduler = LLMScheduler(requests_per_minute=120)
+    order: list[str] = []
+
+    async def call(priority: Priority) -> None:
+        async def respond() -> BaseMessage:
+            order.append(priority)
+            return AIMessage(content="")
+
+        with llm_priority(priority):
+            await scheduler.acall(respond, tokens=10)
+
+    async def main() -> None:
+        for _ in range(120):
+            await scheduler.aacquire(1)
+        backlog = asyncio.create_task(call("backlog"))
+        await asyncio.sleep(0.01)
+        await asyncio.gather(call("interactive"), backlog)
+
+    asyncio.run(main())
+
+    assert order == ["interactive", "backlog"]
+
+
+def test_cached_responses_give_their_budget_back() -> None:
+    scheduler = LLMScheduler(requests_per_minute=1, tokens_per_minute=100)
+    cached = AIMessage(
+        content="ok",
+        response_metadata={CACHE_HIT_METADATA_KEY: True},
+        usage_metadata={"input_tokens": 90, "output_tokens": 5, "total_tokens": 95},
+    )
+
+    # Without the refunds, the second call would wait for a minute's refill
+    for _ in range(2):
+        scheduler.call(lambda: cached, tokens=60)
+
+    assert scheduler.requests is not None
+    assert scheduler.requests.level == pytest.approx(1, abs=0.01)
+    assert scheduler.tokens is not None
+    assert scheduler.tokens.level == pytest.approx(100, abs=0.1)
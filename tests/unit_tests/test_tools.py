@@ -1,17 +1,33 @@
 """Tests for custom tools."""
 
+import asyncio
 from unittest.mock import MagicMock, patch
 
-from open_mre.tools import check_pypi_version
+import httpx
+
+from open_mre.state import SandboxHandle
+from open_mre.tools import check_pypi_version, check_pypi_versions, execute_in_sandbox
+
+RELEASES = {
+    "1.0.0": [
+        {"upload_time_iso_8601": "2025-10-17T19:04:15.123Z", "yanked": False},
+        {"upload_time_iso_8601": "2025-10-17T19:03:58.456Z", "yanked": False},
+    ],
+    "1.0.1": [{"upload_time_iso_8601": "2025-10-20T08:00:00.000Z", "yanked": True}],
+    "1.0.2": [{"upload_time_iso_8601": "2025-10-24T12:30:00.000Z", "yanked": False}],
+}
 
 
 def test_check_pypi_version_success() -> None:
     """Test successful PyPI version check."""
-    mock_response = MagicMock()
-    mock_response.json.return_value = {"info": {"version": "2.31.0"}}
-    mock_response.raise_for_status.return_value = None
+    response = httpx.Response(
+        200,
+        json={"info": {"version": "2.31.0"}},
+        request=httpx.Request("GET", "https://pypi.org/pypi/requests/json"),
+    )
 
-    with patch("open_mre.tools.pypi_checker.httpx.get", return_value=mock_response):
+    with patch("open_mre.tools.pypi_checker._get_client") as get_client:
+        get_client.return_value.get.return_value = response
         result = check_pypi_version.invoke({"package_name": "requests"})
 
     assert result["package"] == "requests"
@@ -21,10 +37,14 @@ def test_check_pypi_version_success() -> None:
 
 def test_check_pypi_version_not_found() -> None:
     """Test PyPI version check for non-existent package."""
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = Exception("404 Not Found")
+    response = httpx.Response(
+        404,
+        json={"message": "Not Found"},
+        request=httpx.Request("GET", "https://pypi.org/pypi/xyz123/json"),
+    )
 
-    with patch("open_mre.tools.pypi_checker.httpx.get", return_value=mock_response):
+    with patch("open_mre.tools.pypi_checker._get_client") as get_client:
+        get_client.return_value.get.return_value = response
         result = check_pypi_version.invoke(
             {"package_name": "this-package-does-not-exist-xyz123"}
         )
@@ -32,3 +52,99 @@ def test_check_pypi_version_not_found() -> None:
     assert result["package"] == "this-package-does-not-exist-xyz123"
     assert result["latest_version"] is None
     assert result["error"] is not None
+
+
+def _pypi(request: httpx.Request) -> httpx.Response:
+    package = request.url.path.split("/")[2]
+    if package != "langchain-openai":
+        return httpx.Response(404, json={"message": "Not Found"})
+    return httpx.Response(
+        200, json={"info": {"version": "1.0.2"}, "releases": RELEASES}
+    )
+
+
+def test_check_pypi_versions_looks_up_packages_concurrently() -> None:
+    """Test the batch lookup, with release dates and yanked versions."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_pypi))
+
+    with patch("open_mre.tools.pypi_checker._get_async_client", return_value=client):
+        results = asyncio.run(
+            check_pypi_versions.ainvoke(
+                {"package_names": ["langchain_openai", "not-a-package"]}
+            )
+        )
+
+    assert results[0] == {
+        "package": "langchain_openai",
+        "latest_version": "1.0.2",
+        "latest_release_date": "2025-10-24",
+        "yanked_versions": ["1.0.1"],
+        "error": None,
+    }
+    assert results[1]["package"] == "not-a-package"
+    assert results[1]["error"] is not None
+
+
+def test_execute_in_sandbox_reuses_provisioned_sandbox() -> None:
+    """Test that a provisioned sandbox is reattached instead of created."""
+    handle = SandboxHandle(
+        sandbox_id="sandbox-123",
+        packages=["langchain"],
+        install_command_id="cmd-1",
+    )
+    remote = MagicMock()
+    remote.id = "sandbox-123"
+    remote.state = "started"
+    remote.process.get_session_command.return_value = MagicMock(exit_code=0)
+    remote.process.get_session_command_logs.return_value = MagicMock(
+        stdout="Successfully installed langchain", stderr=""
+    )
+    remote.process.exec.return_value = MagicMock(result="hello")
+    client = MagicMock()
+    client.get.return_value = remote
+
+    with patch("daytona.Daytona", return_value=client):
+        result = execute_in_sandbox(
+            "print('hello')",
+            packages=["langchain", "numpy"],
+            api_key="test-key",
+            handle=handle,
+        )
+
+    assert result.success
+    assert result.stdout == "hello"
+    client.create.assert_not_called()
+    client.get.assert_called_once_with("sandbox-123")
+    # Only the package missing from the background install is installed again
+    remote.process.exec.assert_any_call("pip install numpy")
+    remote.delete.assert_called_once()
+
+
+def test_execute_in_sandbox_reinstalls_after_a_restart() -> None:
+    """Test that packages are installed again if the background install was lost."""
+    handle = SandboxHandle(
+        sandbox_id="sandbox-123",
+        packages=["langchain"],
+        install_command_id="cmd-1",
+    )
+    remote = MagicMock()
+    remote.id = "sandbox-123"
+    # Auto-stopped during the human-in-the-loop wait
+    remote.state = "stopped"
+    remote.process.get_session_command.side_effect = RuntimeError("session not found")
+    remote.process.exec.return_value = MagicMock(result="hello")
+    client = MagicMock()
+    client.get.return_value = remote
+
+    with patch("daytona.Daytona", return_value=client):
+        result = execute_in_sandbox(
+            "print('hello')",
+            packages=["langchain", "numpy"],
+            api_key="test-key",
+            handle=handle,
+        )
+
+    assert result.success
+    remote.start.assert_called_once()
+    client.create.assert_not_called()
+    remote.process.exec.assert_any_call("pip install langchain numpy")
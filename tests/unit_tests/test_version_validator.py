@@ -0,0 +1,216 @@
+"""Tests for the version validator agent."""
+
+from collections.abc import Iterator, Sequence
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+
+from open_mre.agents.version_validator import create_version_validator_agent
+from open_mre.agents.version_validator.agent import LOOKUP_RESULTS_HEADER, REPORT_TOOL
+from open_mre.agents.version_validator.parsing import (
+    parse_package_versions,
+    parse_python_version,
+)
+from open_mre.models import clear_model_cache
+
+# Versions in prose are left to the model
+ISSUE = "Using langchain 0.1.0 and an older langchain-core on Python 3.11"
+
+SYS_INFO_ISSUE = """### System Info
+
+System Information
+------------------
+> OS:  Linux
+> Python Version:  3.11.7 (main, Dec  8 2023, 14:21:55) [GCC 11.4.0]
+
+Package Information
+-------------------
+> langchain_core: 1.1.0
+> langchain: 0.1.0
+> numpy: 2.0.0
+
+Also tried `pip install langgraph==1.0.1`.
+"""
+
+
+def _lookups(*packages: str) -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {
+                "name": "check_pypi_versions",
+                "args": {"package_names": list(packages)},
+                "id": "lookups",
+            }
+        ],
+    )
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Fake chat model that returns scripted replies and records its inputs."""
+
+    replies: list[AIMessage]
+    inputs: list[list[BaseMessage]] = []
+    tool_choices: list[str | None] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.inputs.append(messages)
+        reply = self.replies.pop(0) if self.replies else _lookups("langchain")
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def bind_tools(
+        self,
+        tools: Sequence[Any],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: Any,
+    ) -> Runnable[Any, Any]:
+        self.tool_choices.append(tool_choice)
+        return self
+
+
+@pytest.fixture
+def pypi() -> Iterator[MagicMock]:
+    response = httpx.Response(
+        200,
+        json={"info": {"version": "1.1.0"}},
+        request=httpx.Request("GET", "https://pypi.org/pypi/langchain/json"),
+    )
+    with patch("open_mre.tools.pypi_checker._get_client") as get_client:
+        get_client.return_value.get.return_value = response
+        yield get_client.return_value.get
+
+
+def _run(model: ScriptedChatModel, issue: str = ISSUE, **kwargs: Any) -> dict[str, Any]:
+    clear_model_cache()
+    try:
+        with patch("open_mre.models.init_chat_model", return_value=model):
+            agent = create_version_validator_agent(**kwargs)
+            return agent.invoke({"issue_content": issue})
+    finally:
+        clear_model_cache()
+
+
+def test_single_pass_looks_up_in_parallel_and_reports(pypi: MagicMock) -> None:
+    report = {
+        "python_version": "3.11",
+        "packages": [
+            {"name": "langchain", "user_version": "0.1.0"},
+        ],
+        "version_notes": [],
+    }
+    model = ScriptedChatModel(
+        replies=[
+            _lookups("langchain", "langchain-core"),
+            AIMessage(
+                content="",
+                tool_calls=[{"name": REPORT_TOOL, "args": report, "id": "report"}],
+            ),
+        ],
+        inputs=[],
+        tool_choices=[],
+    )
+
+    result = _run(model)
+
+    assert pypi.call_count == 2
+    assert len(model.inputs) == 2
+    # Lookups are passed back as one message instead of the tool call history
+    follow_up = model.inputs[1]
+    assert len(follow_up) == 3
+    assert not any(isinstance(m, ToolMessage) for m in follow_up)
+    assert str(follow_up[-1].content).startswith(LOOKUP_RESULTS_HEADER)
+    assert '"latest_version":"1.1.0"' in str(follow_up[-1].content)
+    assert result["python_version"] == "3.11"
+    assert result["packages"][0]["latest_version"] == "1.1.0"
+    assert result["packages"][0]["is_outdated"] is True
+    assert "`langchain` (you indicated version `0.1.0`" in result["draft_comment"]
+    assert result["should_terminate"] is True
+
+
+def test_model_claims_are_checked_against_pypi(pypi: MagicMock) -> None:
+    # The model wrongly claims that a newer version exists
+    summary = AIMessage(
+        content="PYTHON_VERSION: 3.11\nPACKAGES: langchain:1.1.0:1.2.0:true\n"
+        "NOTES: none\nDRAFT_COMMENT: Please upgrade langchain\n"
+        "SHOULD_TERMINATE: true"
+    )
+    model = ScriptedChatModel(
+        replies=[_lookups("langchain"), summary], inputs=[], tool_choices=[]
+    )
+
+    result = _run(model)
+
+    assert pypi.call_count == 1
+    assert result["packages"][0]["latest_version"] == "1.1.0"
+    assert result["packages"][0]["is_outdated"] is False
+    assert result["draft_comment"] is None
+    assert result["should_terminate"] is False
+
+
+def test_single_pass_stops_after_max_tool_rounds(pypi: MagicMock) -> None:
+    # Keeps requesting lookups, even when the report is forced
+    model = ScriptedChatModel(replies=[], inputs=[], tool_choices=[])
+
+    result = _run(model, max_tool_rounds=2)
+
+    assert len(model.inputs) == 3
+    assert pypi.call_count == 2
+    assert REPORT_TOOL in model.tool_choices
+    assert result["packages"] == []
+    assert result["should_terminate"] is False
+
+
+def test_parse_versions_from_sys_info_and_requirements() -> None:
+    assert parse_package_versions(SYS_INFO_ISSUE) == {
+        "langchain-core": "1.1.0",
+        "langchain": "0.1.0",
+        "langgraph": "1.0.1",
+    }
+    assert parse_python_version(SYS_INFO_ISSUE) == "3.11.7"
+    assert parse_package_versions("langchain_openai==1.0.2\nlangchain-openai==9") == {
+        "langchain-openai": "1.0.2"
+    }
+    assert parse_package_versions(ISSUE) == {}
+    # Pins in prose are not what is installed
+    assert parse_package_versions("I tried langchain-core==0.2.0 before") == {}
+    assert parse_package_versions(
+        "`pip install -U langchain-core==0.2.0` didn't help\n\n> langchain_core: 1.1.0"
+    ) == {"langchain-core": "1.1.0"}
+
+
+def test_parsed_versions_are_checked_without_the_model(pypi: MagicMock) -> None:
+    model = ScriptedChatModel(replies=[], inputs=[], tool_choices=[])
+
+    result = _run(model, SYS_INFO_ISSUE)
+
+    assert model.inputs == []
+    assert pypi.call_count == 3
+    assert result["python_version"] == "3.11.7"
+    assert [(p["name"], p["is_outdated"]) for p in result["packages"]] == [
+        ("langchain-core", False),
+        ("langchain", True),
+        ("langgraph", True),
+    ]
+    assert result["should_terminate"] is True
+    assert (
+        "outdated versions of `langchain` (you indicated version `0.1.0`, while the "
+        "latest is `1.1.0`) and `langgraph`" in result["draft_comment"]
+    )
@@ -0,0 +1,49 @@
+"""Tests for comparing reported versions with release histories."""
+
+from open_mre.agents.version_validator.versions import version_lag
+from open_mre.tools.pypi_cache import PyPIMetadata
+
+METADATA = PyPIMetadata(
+    latest_version="1.1.0",
+    latest_release_date=None,
+    yanked_versions=["1.0.1"],
+    releases=["0.9", "1.0.0", "1.0.1", "1.0.2", "1.1.0rc1", "1.1.0", "1.2.0a1"],
+)
+
+
+def test_releases_behind_skip_yanked_releases_and_prereleases() -> None:
+    assert version_lag("1.0.0", "1.1.0", METADATA) == {
+        "is_outdated": True,
+        "releases_behind": 2,
+        "yanked": False,
+    }
+    assert version_lag("1.0.1", "1.1.0", METADATA) == {
+        "is_outdated": True,
+        "releases_behind": 2,
+        "yanked": True,
+    }
+    # Versions are compared in PEP 440 order, not as strings
+    lag = version_lag("1.1", "1.1.0", METADATA)
+    assert lag is not None
+    assert lag["is_outdated"] is False
+    assert lag["releases_behind"] == 0
+
+
+def test_prereleases_count_for_users_on_a_prerelease() -> None:
+    lag = version_lag("1.1.0rc1", "1.1.0", METADATA)
+    assert lag is not None
+    assert lag["releases_behind"] == 2
+    # Newer than the latest final release, but a newer pre-release exists
+    lag = version_lag("1.2.0.dev0", "1.1.0", METADATA)
+    assert lag is not None
+    assert lag["is_outdated"] is True
+
+
+def test_without_release_history_versions_are_compared_with_latest() -> None:
+    assert version_lag("0.1.0", "1.1.0") == {
+        "is_outdated": True,
+        "releases_behind": None,
+        "yanked": False,
+    }
+    assert version_lag("not-a-version", "1.1.0", METADATA) is None
+    assert version_lag("1.0.0", None) is None